@@ -0,0 +1,64 @@
+"""
+Walker's alias method for sampling from a fixed discrete distribution.
+
+Building the table is O(V), after that every draw is O(1): pick a column uniformly,
+then keep it or take its alias with one biased coin flip.  Bulk draws do both steps for the whole
+array at once, so drawing negatives for a batch is a couple of numpy calls no matter how big the vocab is.
+"""
+from __future__ import print_function
+import random
+import numpy as np
+
+class AliasSampler(object):
+    """Sampler over the indices of a (not necessarily normalized) array of probabilities
+
+    Args:
+        distribution: non negative weights, one per index
+    """
+    def __init__(self, distribution):
+        probs = np.asarray(distribution, dtype=np.float64)
+        assert probs.ndim == 1 and len(probs), "Need a non empty 1-D distribution"
+        assert (probs >= 0).all() and probs.sum() > 0, "Distribution needs non negative weights with some mass"
+        n = len(probs)
+        # scale so the average column holds exactly 1
+        scaled = probs * (n / probs.sum())
+        self._prob = np.ones(n, dtype=np.float64)
+        self._alias = np.arange(n, dtype=np.int32)
+        small = list(np.nonzero(scaled < 1.0)[0])
+        large = list(np.nonzero(scaled >= 1.0)[0])
+        # top up every under full column with mass from an over full one
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # whatever is left is full up to rounding error, so it keeps prob 1 and aliases itself
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def sample(self, size=None, rng=None):
+        """One draw as an int if `size` is None, otherwise an int32 array of `size` draws
+
+        `rng` is a np.random.RandomState to draw with, the global numpy state by default
+        """
+        if size is None:
+            column = int(random.random() * self._n) if rng is None else rng.randint(self._n)
+            coin = random.random() if rng is None else rng.random_sample()
+            return column if coin < self._prob[column] else int(self._alias[column])
+        rng = np.random if rng is None else rng
+        columns = rng.randint(0, self._n, size=size)
+        keep = rng.random_sample(size) < self._prob[columns]
+        return np.where(keep, columns, self._alias[columns]).astype(np.int32)
+
+    def probabilities(self):
+        """The distribution the table encodes, normalized (for checking the table)"""
+        probs = self._prob / self._n
+        np.add.at(probs, self._alias, (1.0 - self._prob) / self._n)
+        return probs
@@ -0,0 +1,159 @@
+"""
+Background batch prefetching.
+
+`BatchPrefetcher` builds batches on worker threads while the consumer (the TF training loop) is busy,
+so the next batch is usually ready the moment it's asked for.  Threads rather than processes:
+batch building is mostly numpy and session.run releases the GIL, and threads can share the DataHandler's
+(possibly memory mapped) data without pickling it.
+
+Steps are claimed in order and at most `num_ready` batches are ever built but not yet consumed
+(waiting in the queue, in the reorder buffer, or being built), so memory stays bounded.
+Batches always come out in step order.  With a seed, step i's negatives are drawn from
+RandomState([seed, i]), so the batches are the same whatever the number of workers or their timing.
+
+The workers stop when the steps run out.  A loop that may stop early should use it as a context manager
+(or call `close`), otherwise the workers stay blocked holding their batches:
+
+    with DH.prefetch_batches(batch_size, seed=0) as batches:
+        for batch in batches:
+            if drnn.partial_unsup_fit(*batch) < target_loss:
+                break
+"""
+from __future__ import print_function
+import threading
+import weakref
+import numpy as np
+from time import time
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+class BatchPrefetcher(object):
+    """Iterate over `make_batch(step, rng)` for every step in `steps`, built ahead by background threads
+
+    Args:
+        make_batch: callable taking a step and a np.random.RandomState (or None) and returning a batch
+        steps: the steps to build, yielded in this order
+        num_ready (opt): how many batches may be built ahead of the consumer
+        num_workers (opt): number of threads building batches
+        seed (opt): seed for the per step random states. None draws from the global numpy state,
+                    which is not reproducible with more than one worker
+    """
+    def __init__(self, make_batch, steps, num_ready=4, num_workers=1, seed=None):
+        assert num_ready > 0 and num_workers > 0, "Need at least one worker and one ready batch"
+        self._make_batch = make_batch
+        self._steps = list(steps)
+        self._seed = seed
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(num_ready)
+        self._lock = threading.Lock()
+        self._next_claim = 0
+        self._next_yield = 0
+        self._reorder = {}
+        self._stopped = False
+        # starvation stats
+        self.batches = 0
+        self.starved = 0
+        self.wait_time = 0.
+        # the workers only hold a weak reference while waiting for a slot, so an abandoned prefetcher is collected
+        self._workers = [ threading.Thread(target=_work, args=(weakref.ref(self), self._slots))
+                          for _ in range(num_workers) ]
+        for worker in self._workers:
+            worker.daemon = True
+            worker.start()
+
+    def _claim(self):
+        """The next step's index, or None if stopped or out of steps"""
+        with self._lock:
+            if self._stopped or self._next_claim >= len(self._steps):
+                return None
+            i = self._next_claim
+            self._next_claim += 1
+            return i
+
+    def _build(self, i):
+        step = self._steps[i]
+        rng = np.random.RandomState([self._seed, step]) if self._seed is not None else None
+        try:
+            self._queue.put((i, self._make_batch(step, rng), None))
+        except Exception as e:
+            self._queue.put((i, None, e))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._next_yield >= len(self._steps):
+            self.close()
+            raise StopIteration
+        if self._next_yield not in self._reorder:
+            start = time()
+            waited = False
+            while self._next_yield not in self._reorder:
+                try:
+                    i, batch, error = self._queue.get_nowait()
+                except queue.Empty:
+                    waited = True
+                    i, batch, error = self._queue.get()
+                if error is not None:
+                    self.close()
+                    raise error
+                self._reorder[i] = batch
+            if waited:
+                self.starved += 1
+                self.wait_time += time() - start
+        batch = self._reorder.pop(self._next_yield)
+        self._next_yield += 1
+        self.batches += 1
+        self._slots.release()
+        return batch
+
+    next = __next__ # python 2
+
+    def __len__(self):
+        return len(self._steps)
+
+    def close(self):
+        """Stop the workers and drop the batches built ahead, safe to call more than once"""
+        with self._lock:
+            self._stopped = True
+        self._slots.release() # wake a worker blocked on a slot, it wakes the next one on its way out
+        self._reorder.clear()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def stats(self):
+        """How often the consumer had to wait for a batch and for how long"""
+        return {'batches': self.batches,
+                'starved': self.starved,
+                'starved_fraction': self.starved / float(max(self.batches, 1)),
+                'wait_time': self.wait_time}
+
+    def report(self):
+        stats = self.stats()
+        print("Prefetcher: %(batches)i batches, starved on %(starved)i (%(starved_fraction)0.2f), "
+              "waited %(wait_time)0.3fs" % stats)
+
+def _work(prefetcher_ref, slots):
+    while True:
+        slots.acquire()
+        prefetcher = prefetcher_ref()
+        i = prefetcher._claim() if prefetcher is not None else None
+        if i is None:
+            slots.release() # wake the next worker on the way out
+            return
+        prefetcher._build(i)
+        del prefetcher
@@ -0,0 +1,94 @@
+"""
+Benchmark length bucketed batching against padding everything to max_seq_len.
+
+Always reports how many RNN steps (examples x padded length) an epoch of each costs.
+Unless --no_train, it also trains a RelEmbed model on both for a number of steps and reports examples/sec.
+
+Summaries are fetched every 100 steps in both, so the gradient histograms don't hide the RNN steps saved.
+No throughput on the wiki SDP dump has been recorded, run it on data/shuffled_wiki_sdp_100000 for that.
+"""
+from __future__ import print_function
+import click
+import numpy as np
+from time import time
+
+from data_handler import DataHandler
+
+def padded_steps(batches):
+    """Total examples and examples x padded length over some batches"""
+    examples, steps = 0, 0
+    for batch in batches:
+        examples += batch[0].shape[0]
+        steps += batch[0].shape[0] * batch[0].shape[1]
+    return examples, steps
+
+def train_rate(drnn, batches, num_steps):
+    """Examples/sec of partial_unsup_fit over the first `num_steps` batches, after one warm up batch"""
+    batches = iter(batches)
+    batch = next(batches)
+    drnn.partial_unsup_fit(*batch[:4])
+    examples = 0
+    start = time()
+    for step, batch in enumerate(batches):
+        if step >= num_steps:
+            break
+        drnn.partial_unsup_fit(*batch[:4])
+        examples += batch[0].shape[0]
+    return examples / (time() - start)
+
+def make_model(DH, buckets, name):
+    import tensorflow as tf
+    import relembed as nn
+    tf.reset_default_graph()
+    config = {
+        'max_num_steps':DH.max_seq_len,
+        'buckets':buckets,
+        'word_embed_size':100,
+        'dep_embed_size':25,
+        'pos_embed_size':25,
+        'bidirectional':False,
+        'supervised':False,
+        'interactive':False,
+        'hidden_layer_size':1000,
+        'vocab_size':DH.vocab_size,
+        'dep_vocab_size':DH.dep_size,
+        'pos_vocab_size':DH.pos_size,
+        'num_predict_classes':19,
+        'pretrained_word_embeddings':None,
+        'max_grad_norm':3.,
+        'model_name':name,
+        'max_to_keep':1,
+        'checkpoint_prefix':'checkpoints/',
+        'summary_prefix':'tensor_summaries/',
+        'summary_every_steps':100 # so the summaries don't swamp the RNN steps being compared
+    }
+    return nn.RelEmbed(config)
+
+@click.command()
+@click.option('-d', '--data_prefix', default='data/shuffled_wiki_sdp_100000', help="SDP dataset to batch")
+@click.option('--packed', default=False, is_flag=True, help="Load the dataset from its packed binary files")
+@click.option('-b', '--batch_size', default=50, help="Paths per batch before negatives")
+@click.option('--neg_per', default=15, help="Negatives per path")
+@click.option('--buckets', default='3,4,5,7', help="Comma separated bucket lengths (max_seq_len is always added)")
+@click.option('--train_steps', default=200, help="Training steps to time for each way of batching")
+@click.option('--no_train', default=False, is_flag=True, help="Only count padded steps, don't build a model")
+def main(data_prefix, packed, batch_size, neg_per, buckets, train_steps, no_train):
+    DH = DataHandler(data_prefix, packed=packed)
+    DH.scale_vocab_dist(.75)
+    buckets = [ int(b) for b in buckets.split(',') ]
+    examples, full_steps = padded_steps(DH.batches(batch_size, neg_per=neg_per, seed=0))
+    _, bucket_steps = padded_steps(DH.bucket_batches(batch_size, buckets, neg_per=neg_per, seed=0))
+    print("%i examples, max_seq_len %i" % (examples, DH.max_seq_len))
+    print("Padded to max_seq_len: %i RNN steps" % full_steps)
+    print("Bucketed %r: %i RNN steps (%0.2fx fewer)" % (buckets, bucket_steps, full_steps / float(bucket_steps)))
+    if no_train:
+        return
+    full_rate = train_rate(make_model(DH, None, 'bench_full'),
+                           DH.batches(batch_size, neg_per=neg_per, seed=0), train_steps)
+    bucket_rate = train_rate(make_model(DH, buckets, 'bench_bucketed'),
+                             DH.bucket_batches(batch_size, buckets, neg_per=neg_per, seed=0), train_steps)
+    print("Padded to max_seq_len: %0.1f examples/sec" % full_rate)
+    print("Bucketed:              %0.1f examples/sec %0.2fx" % (bucket_rate, bucket_rate / full_rate))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark the cluster pair output layers of relembed_clustered (config 'cluster_softmax') as num_clusters grows.
+
+For each num_clusters it builds a model with the full, sampled and two level softmax and reports the ms per
+partial_unsup_fit step on random batches, the MB of the output layer's weights (Adam keeps two more copies of them),
+and the MB of the output layer's per batch activations: batch x num_clusters**2 logits for the full softmax,
+batch x (num_sampled + 1) for the sampled one, and batch x 2 num_clusters logits plus the batch x hidden x num_clusters
+Y cluster weights gathered for each example's X cluster for the two level one.
+
+    python bench_cluster_softmax.py --num_clusters 10,50,100,200 -b 500
+"""
+from __future__ import print_function
+import click
+import numpy as np
+from time import time
+
+from bench_dynamic_rnn import random_batches
+
+MODES = ('full', 'sampled', 'two_level')
+
+def make_model(num_clusters, cluster_softmax, num_sampled, max_num_steps, vocab_size, hidden_size):
+    import tensorflow as tf
+    import relembed_clustered as nn
+    tf.reset_default_graph()
+    config = {
+        'max_num_steps':max_num_steps,
+        'word_embed_size':hidden_size,
+        'dep_embed_size':25,
+        'pos_embed_size':25,
+        'hidden_size':hidden_size,
+        'num_clusters':num_clusters,
+        'cluster_softmax':cluster_softmax,
+        'num_sampled':num_sampled,
+        'bidirectional':False,
+        'supervised':False,
+        'interactive':False,
+        'hidden_layer_size':1000,
+        'vocab_size':vocab_size,
+        'dep_vocab_size':50,
+        'pos_vocab_size':20,
+        'num_predict_classes':19,
+        'pretrained_word_embeddings':None,
+        'max_grad_norm':3.,
+        'model_name':'bench_%s_%i' % (cluster_softmax, num_clusters),
+        'max_to_keep':1,
+        'checkpoint_prefix':'checkpoints/',
+        'summary_prefix':'tensor_summaries/',
+        'summary_every_steps':1000000 # time the train op, not the summaries
+    }
+    return nn.RelEmbed(config)
+
+def output_layer_mb(drnn, batch_size):
+    """MB of the output layer's weights and of its activations for one batch"""
+    weights = sum( np.prod(w.get_shape().as_list()) for w in drnn._cluster_weights )
+    if drnn.cluster_softmax == 'full':
+        activations = batch_size * drnn.num_clusters**2
+    elif drnn.cluster_softmax == 'sampled':
+        activations = batch_size * (drnn.num_sampled + 1)
+    else:
+        activations = batch_size * (2 * drnn.num_clusters + drnn.hidden_size * drnn.num_clusters)
+    return 4. * weights / 2**20, 4. * activations / 2**20
+
+def step_ms(drnn, batches):
+    """ms per partial_unsup_fit over the batches, after one warm up batch"""
+    drnn.partial_unsup_fit(*batches[0])
+    start = time()
+    for batch in batches[1:]:
+        drnn.partial_unsup_fit(*batch)
+    return 1000. * (time() - start) / (len(batches) - 1)
+
+@click.command()
+@click.option('--num_clusters', default='10,50,100,200', help="Comma separated num_clusters to build the models for")
+@click.option('--num_sampled', default=100, help="Negative cluster pairs per batch for the sampled softmax")
+@click.option('-b', '--batch_size', default=500, help="Examples per batch")
+@click.option('--train_steps', default=50, help="Training steps to time for each model")
+@click.option('--max_num_steps', default=10, help="max_num_steps of the models")
+@click.option('--vocab_size', default=20000, help="Vocab size of the models")
+@click.option('--hidden_size', default=100, help="Word embedding and hidden size")
+def main(num_clusters, num_sampled, batch_size, train_steps, max_num_steps, vocab_size, hidden_size):
+    print("%8s %10s %10s %12s %14s" % ('clusters', 'softmax', 'ms/step', 'weights MB', 'activations MB'))
+    for clusters in [ int(n) for n in num_clusters.split(',') ]:
+        batches = random_batches(train_steps + 1, batch_size, max_num_steps, 4., vocab_size)
+        rng = np.random.RandomState(0)
+        batches = [ (phrases, targets, rng.randint(clusters**2, size=[batch_size, 1]).astype(np.int32), lengths)
+                    for phrases, targets, _, lengths in batches ]
+        times = {}
+        for mode in MODES:
+            drnn = make_model(clusters, mode, num_sampled, max_num_steps, vocab_size, hidden_size)
+            times[mode] = step_ms(drnn, batches)
+            weights_mb, activations_mb = output_layer_mb(drnn, batch_size)
+            drnn.session.close()
+            print("%8i %10s %10.1f %12.1f %14.1f" % (clusters, mode, times[mode], weights_mb, activations_mb))
+        print("%8i sampled %0.2fx, two_level %0.2fx the speed of full"
+              % (clusters, times['full'] / times['sampled'], times['full'] / times['two_level']))
+
+if __name__ == '__main__':
+    main()
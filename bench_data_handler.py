@@ -0,0 +1,72 @@
+"""
+Benchmark DataHandler batch assembly.
+
+Compares the vectorized `sequences_to_tensor` against the old row by row, column by column fill
+(float64 zeros, then astype int32 like the callers used to do) on batches of paths.
+By default the paths are synthetic, pass --data_prefix to use the paths of a real SDP dataset.
+"""
+from __future__ import print_function
+import random
+import click
+import numpy as np
+from time import time
+
+from data_handler import DataHandler, sequences_to_tensor
+
+def loop_sequences_to_tensor(list_of_lists, max_len):
+    """The old per element fill, kept here as the baseline"""
+    lengths = np.array([len(list_) for list_ in list_of_lists]).reshape([-1, 1])
+    k = len(list_of_lists[0][0])
+    tensor = np.zeros([len(list_of_lists), max_len, k])
+    for i, list_ in enumerate(list_of_lists):
+        for j in range(k):
+            tensor[i, :len(list_), j] = [ x[j] for x in list_ ]
+    return tensor.astype(np.int32), lengths.astype(np.int32)
+
+def random_paths(num_paths, max_len, rng):
+    """Random (token, dep, pos) paths of 2 to `max_len` elements"""
+    return [ [ [rng.randint(0, 50000), rng.randint(0, 50), rng.randint(0, 20)]
+               for _ in range(rng.randint(2, max_len)) ]
+             for _ in range(num_paths) ]
+
+def batches_per_sec(assemble, batches, max_len, repeats):
+    """Best of `repeats` rates of assembling every batch, and the assembled batches"""
+    best = None
+    for _ in range(repeats):
+        start = time()
+        results = [ assemble(batch, max_len) for batch in batches ]
+        took = time() - start
+        best = took if best is None else min(best, took)
+    return len(batches) / best, results
+
+@click.command()
+@click.option('-d', '--data_prefix', default=None, help="SDP dataset to take paths from instead of synthetic ones")
+@click.option('--packed', default=False, is_flag=True, help="Load the dataset from its packed binary files")
+@click.option('-b', '--batch_size', default=500, help="Paths per batch (training batch times neg_per+1 is realistic)")
+@click.option('--num_batches', default=200, help="Number of batches to assemble")
+@click.option('--maxlen', default=12, help="Maximum length of synthetic paths")
+@click.option('--repeats', default=3, help="Number of timing runs, best is reported")
+def main(data_prefix, packed, batch_size, num_batches, maxlen, repeats):
+    if data_prefix:
+        dh = DataHandler(data_prefix, valid_percent=0, packed=packed)
+        paths = list(dh._paths)
+        max_len = dh.max_seq_len
+    else:
+        paths = random_paths(batch_size*num_batches, maxlen, random.Random(0))
+        max_len = maxlen
+    batches = [ paths[i:i+batch_size] for i in range(0, len(paths), batch_size) ][:num_batches]
+
+    old_rate, old_results = batches_per_sec(loop_sequences_to_tensor, batches, max_len, repeats)
+    new_rate, new_results = batches_per_sec(sequences_to_tensor, batches, max_len, repeats)
+    for (old_mat, old_len), (new_mat, new_len) in zip(old_results, new_results):
+        assert (old_mat == new_mat).all() and (old_len == new_len).all(), "Vectorized assembly disagrees"
+    print("%i batches of %i paths" % (len(batches), batch_size))
+    print("Per element fill: %0.1f batches/sec" % old_rate)
+    print("Vectorized:       %0.1f batches/sec %0.2fx" % (new_rate, new_rate / old_rate))
+    if data_prefix and packed:
+        packed_batches = [ dh._paths[i:i+batch_size] for i in range(0, len(dh._paths), batch_size) ][:num_batches]
+        packed_rate, _ = batches_per_sec(sequences_to_tensor, packed_batches, max_len, repeats)
+        print("Memmap gather:    %0.1f batches/sec %0.2fx" % (packed_rate, packed_rate / old_rate))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark RelEmbed with the RNN unrolled over max_num_steps against the dynamic loop (config 'rnn_mode').
+
+For each max_num_steps it builds both models and reports how long building took, how many ops the graph has,
+and the examples/sec of partial_unsup_fit on random batches.  The paths in the batches are short like real SDPs
+(lengths geometric around --mean_len) however large max_num_steps is, and they're padded to max_num_steps,
+so the unrolled graph pays for the padding and the dynamic one doesn't.
+
+    python bench_dynamic_rnn.py --max_steps 10,20,40 --mean_len 4
+
+With the defaults on TF 0.12.1 on one CPU core:
+
+       steps       mode  build sec      ops   examples/sec
+          10   unrolled       1.97     5276         1324.2
+          10    dynamic       0.94     2284         1239.6
+          20   unrolled       3.33     9056         1007.8
+          20    dynamic       0.88     2284          824.4
+          40   unrolled       6.02    16616          843.6
+          40    dynamic       1.13     2284          622.1
+
+The dynamic graph stays the same size and builds 2-5x faster, but it trains at only 0.94x, 0.82x and 0.74x
+the examples/sec.  With 800 geometric lengths a batch's longest path is close to max_num_steps, so the loop
+runs nearly as many steps as the unrolled graph.  Each loop step (and its gradient) costs more than an
+unrolled one, so on a CPU 'dynamic' buys graph size and build time, not training speed.
+It doesn't meet the goal of faster training steps, keep 'unrolled' (the default) for training throughput.
+"""
+from __future__ import print_function
+import click
+import numpy as np
+from time import time
+
+def make_model(max_num_steps, rnn_mode, vocab_size, word_embed_size, **extra_config):
+    import tensorflow as tf
+    import relembed as nn
+    tf.reset_default_graph()
+    config = {
+        'max_num_steps':max_num_steps,
+        'rnn_mode':rnn_mode,
+        'word_embed_size':word_embed_size,
+        'dep_embed_size':25,
+        'pos_embed_size':25,
+        'bidirectional':False,
+        'supervised':False,
+        'interactive':False,
+        'hidden_layer_size':1000,
+        'vocab_size':vocab_size,
+        'dep_vocab_size':50,
+        'pos_vocab_size':20,
+        'num_predict_classes':19,
+        'pretrained_word_embeddings':None,
+        'max_grad_norm':3.,
+        'model_name':'bench_%s_%i' % (rnn_mode, max_num_steps),
+        'max_to_keep':1,
+        'checkpoint_prefix':'checkpoints/',
+        'summary_prefix':'tensor_summaries/'
+    }
+    config.update(extra_config)
+    start = time()
+    drnn = nn.RelEmbed(config)
+    build_time = time() - start
+    return drnn, build_time, len(tf.get_default_graph().get_operations())
+
+def random_batches(num_batches, batch_size, max_num_steps, mean_len, vocab_size, seed=0):
+    """Batches of random paths padded to max_num_steps, with lengths geometric around mean_len"""
+    rng = np.random.RandomState(seed)
+    batches = []
+    for _ in range(num_batches):
+        lengths = np.minimum(rng.geometric(1. / mean_len, size=batch_size), max_num_steps)
+        phrases = np.zeros([batch_size, max_num_steps, 3], dtype=np.int32)
+        for i, length in enumerate(lengths):
+            phrases[i, :length, 0] = rng.randint(vocab_size, size=length)
+            phrases[i, :length, 1] = rng.randint(50, size=length)
+            phrases[i, :length, 2] = rng.randint(20, size=length)
+        targets = rng.randint(vocab_size, size=[batch_size, 2]).astype(np.int32)
+        labels = rng.randint(2, size=[batch_size, 1]).astype(np.int32)
+        batches.append((phrases, targets, labels, lengths.reshape([-1, 1]).astype(np.int32)))
+    return batches
+
+def train_rate(drnn, batches):
+    """Examples/sec of partial_unsup_fit over the batches, after one warm up batch"""
+    drnn.partial_unsup_fit(*batches[0])
+    examples = 0
+    start = time()
+    for batch in batches[1:]:
+        drnn.partial_unsup_fit(*batch)
+        examples += batch[0].shape[0]
+    return examples / (time() - start)
+
+@click.command()
+@click.option('--max_steps', default='10,20,40', help="Comma separated max_num_steps to build the models for")
+@click.option('--mean_len', default=4., help="Mean path length of the random batches")
+@click.option('-b', '--batch_size', default=800, help="Examples per batch (paths plus negatives)")
+@click.option('--train_steps', default=100, help="Training steps to time for each model")
+@click.option('--vocab_size', default=20000, help="Vocab size of the models")
+@click.option('--word_embed_size', default=100, help="Word embedding (and hidden) size")
+def main(max_steps, mean_len, batch_size, train_steps, vocab_size, word_embed_size):
+    print("%8s %10s %10s %8s %14s" % ('steps', 'mode', 'build sec', 'ops', 'examples/sec'))
+    for max_num_steps in [ int(n) for n in max_steps.split(',') ]:
+        batches = random_batches(train_steps + 1, batch_size, max_num_steps, mean_len, vocab_size)
+        rates = {}
+        for rnn_mode in ['unrolled', 'dynamic']:
+            drnn, build_time, num_ops = make_model(max_num_steps, rnn_mode, vocab_size, word_embed_size)
+            rates[rnn_mode] = train_rate(drnn, batches)
+            drnn.session.close()
+            print("%8i %10s %10.2f %8i %14.1f" % (max_num_steps, rnn_mode, build_time, num_ops, rates[rnn_mode]))
+        print("%8i dynamic is %0.2fx the examples/sec" % (max_num_steps, rates['dynamic'] / rates['unrolled']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark the head array SDP engines (sdp_arrays) against walking spacy tokens (wiki_and_semeval2sdp).
+
+By default it builds dense synthetic sentences with many noun chunks, which is where the token walking
+is slowest.  Pass --infile to parse real sentences with spacy instead.
+All the engines must produce identical records, the script checks that before reporting times.
+"""
+from __future__ import print_function
+import random
+import click
+from time import time
+
+import sdp_arrays
+import wiki_and_semeval2sdp as w2sdp
+from parse_cache import CachedDoc, compact_parse
+
+def random_parse(num_tokens, num_chunks, rng):
+    """A random dependency tree over `num_tokens` tokens with about `num_chunks` noun chunks, as a compact parse"""
+    words = [ u'w%i' % rng.randint(0, 5000) for _ in range(num_tokens) ]
+    root = rng.randint(0, num_tokens-1)
+    order = list(range(num_tokens))
+    rng.shuffle(order)
+    order.remove(root)
+    heads = [0]*num_tokens
+    heads[root] = root
+    placed = [root]
+    for i in order: # attach every token to something already in the tree
+        heads[i] = rng.choice(placed)
+        placed.append(i)
+    # contiguous chunks of 1-3 tokens separated by at least one token, kept off the root so they have a head noun
+    chunks = []
+    starts = sorted(rng.sample(range(0, num_tokens, 4), min(num_chunks, len(range(0, num_tokens, 4)))))
+    for start in starts:
+        end = min(num_tokens, start + rng.randint(1, 3))
+        if not start <= root < end:
+            chunks.append([start, end])
+    return {'text': u' '.join(words),
+            'words': words,
+            'deps': [ rng.choice([u'nsubj', u'dobj', u'prep', u'pobj', u'amod', u'compound']) for _ in words ],
+            'pos': [ rng.choice([u'NOUN', u'VERB', u'ADP', u'ADJ']) for _ in words ],
+            'heads': heads,
+            'idx': [ sum(len(w)+1 for w in words[:i]) for i in range(num_tokens) ],
+            'chunks': chunks,
+            'like_num': [0]*num_tokens,
+            'is_punct': [0]*num_tokens,
+            'is_oov': [0]*num_tokens}
+
+def time_engine(extract, sentences, repeats):
+    """Best of `repeats` wall times for extracting every SDP in `sentences`, and the SDPs"""
+    best = None
+    for _ in range(repeats):
+        start = time()
+        sdps = [ sdp for sentence in sentences for sdp in extract(sentence) ]
+        took = time() - start
+        best = took if best is None else min(best, took)
+    return best, sdps
+
+@click.command()
+@click.option('-n', '--num_sentences', default=2000, help="Number of sentences to benchmark on")
+@click.option('--tokens', default=40, help="Tokens per synthetic sentence")
+@click.option('--chunks', default=10, help="Noun chunks per synthetic sentence")
+@click.option('-i', '--infile', default=None, help="Raw sentences to parse with spacy instead of synthetic ones")
+@click.option('--maxlen', default=7, help="Maximum length of the dependency path")
+@click.option('--repeats', default=3, help="Number of timing runs, best is reported")
+def main(num_sentences, tokens, chunks, infile, maxlen, repeats):
+    if infile:
+        docs = []
+        for i, line in enumerate(open(infile, 'r')):
+            if i >= num_sentences:
+                break
+            docs.append(w2sdp.nlp(unicode(line.strip())))
+        start = time()
+        parses = [ compact_parse(doc) for doc in docs ]
+        print("Converting %i spacy docs to compact parses took %0.3fs" % (len(docs), time()-start))
+    else:
+        rng = random.Random(0)
+        parses = [ random_parse(tokens, chunks, rng) for _ in range(num_sentences) ]
+        docs = [ CachedDoc(parse) for parse in parses ]
+
+    old_time, old_sdps = time_engine(lambda doc: w2sdp.sentence_to_sdps(doc, min_len=0, max_len=maxlen),
+                                     docs, repeats)
+    new_time, new_sdps = time_engine(lambda parse: sdp_arrays.sentence_to_sdps(parse, min_len=0, max_len=maxlen,
+                                                                               sent=True),
+                                     parses, repeats)
+    batch_time, batch_sdps = time_engine(lambda parse: sdp_arrays.sentence_to_sdps_batched(parse, min_len=0, 
+                                                                                           max_len=maxlen,
+                                                                                           sent=True),
+                                         parses, repeats)
+    assert old_sdps == new_sdps, "The head array engine disagrees"
+    assert old_sdps == batch_sdps, "The batched engine disagrees"
+    print("%i sentences, %i SDPs" % (len(parses), len(new_sdps)))
+    print("Token walking: %0.3fs (%0.0f SDPs/sec)" % (old_time, len(old_sdps) / old_time))
+    print("Head arrays:   %0.3fs (%0.0f SDPs/sec) %0.2fx" % (new_time, len(new_sdps) / new_time, old_time / new_time))
+    print("Batched pairs: %0.3fs (%0.0f SDPs/sec) %0.2fx" % (batch_time, len(batch_sdps) / batch_time, 
+                                                           old_time / batch_time))
+
+if __name__ == '__main__':
+    main()
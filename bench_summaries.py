@@ -0,0 +1,36 @@
+"""
+Benchmark RelEmbed training with its summaries on every step against a summary cadence (see summary_cadence).
+
+Trains the same model on the same random batches once per cadence and reports examples/sec of partial_unsup_fit,
+so the difference is what fetching the merged gradient histograms, penalty and cost summaries costs.
+
+    python bench_summaries.py --every 1,10,100 --vocab_size 20000 --word_embed_size 300
+"""
+from __future__ import print_function
+import click
+
+from bench_dynamic_rnn import make_model, random_batches, train_rate
+
+@click.command()
+@click.option('--every', default='1,10,100', help="Comma separated summary_every_steps to time, 1 is every step")
+@click.option('--max_num_steps', default=10, help="max_num_steps of the model")
+@click.option('--rnn_mode', default='unrolled', help="rnn_mode of the model")
+@click.option('--mean_len', default=4., help="Mean path length of the random batches")
+@click.option('-b', '--batch_size', default=800, help="Examples per batch (paths plus negatives)")
+@click.option('--train_steps', default=200, help="Training steps to time for each cadence")
+@click.option('--vocab_size', default=20000, help="Vocab size of the model")
+@click.option('--word_embed_size', default=300, help="Word embedding (and hidden) size")
+def main(every, max_num_steps, rnn_mode, mean_len, batch_size, train_steps, vocab_size, word_embed_size):
+    batches = random_batches(train_steps + 1, batch_size, max_num_steps, mean_len, vocab_size)
+    rates = []
+    print("%8s %14s" % ('every', 'examples/sec'))
+    for every_steps in [ int(n) for n in every.split(',') ]:
+        drnn, _, _ = make_model(max_num_steps, rnn_mode, vocab_size, word_embed_size,
+                                summary_every_steps=every_steps,
+                                model_name='bench_summaries_%i' % every_steps)
+        rates.append(train_rate(drnn, batches))
+        drnn.session.close()
+        print("%8i %14.1f %0.2fx" % (every_steps, rates[-1], rates[-1] / rates[0]))
+
+if __name__ == '__main__':
+    main()
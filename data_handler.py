@@ -3,14 +3,55 @@ A DataHandler class to read in our data, and generate batches for us
 """
 from __future__ import print_function
 import json
+import itertools
 import numpy as np
 import random
 
+from indexed_view import IndexedView, take
+from packed_sdp import PackedSDPData, PackedPaths, PackedTargets
+from alias_sampler import AliasSampler
+from batch_prefetcher import BatchPrefetcher
+
+def sequences_to_tensor(list_of_lists, max_len):
+    """ Convert list of lists of either single elements or tuples into int32 matrix/tensor padded to max_len
+
+    All the elements are flattened into one array and scattered into place with fancy indexing,
+    so there's no python work per element, just per sequence to get the lengths.
+    Returns the matrix (or tensor) and a column vector of lengths"""
+    if isinstance(list_of_lists, PackedPaths): # gathered straight out of the memmap
+        flat, lengths = list_of_lists.gather()
+    else:
+        lengths = np.fromiter((len(list_) for list_ in list_of_lists), dtype=np.int32, count=len(list_of_lists))
+        elements = itertools.chain.from_iterable(list_of_lists)
+        first = list_of_lists[0][0] if len(list_of_lists) and len(list_of_lists[0]) else 0
+        if isinstance(first, (tuple, list)): # we asserted before that all of them were the same len
+            k = len(first)
+            flat = np.fromiter(itertools.chain.from_iterable(elements), dtype=np.int32,
+                               count=k*np.sum(lengths)).reshape([-1, k])
+        else:
+            flat = np.fromiter(elements, dtype=np.int32, count=np.sum(lengths))
+    # row and column of every flat element
+    rows = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(len(flat), dtype=np.int32) - np.repeat(starts, lengths)
+    if flat.ndim == 1: #matrix case
+        matrix = np.zeros([len(lengths), max_len], dtype=np.int32)
+    else: #tensor case
+        matrix = np.zeros([len(lengths), max_len, flat.shape[1]], dtype=np.int32)
+    matrix[rows, cols] = flat
+    return matrix, lengths.reshape([-1, 1])
+
 class DataHandler(object):
-    """Handler to read in data and generate data and batches for model training and evaluation"""
-    def __init__(self, data_prefix, valid_percent=10, max_sequence_len=None, shuffle_seed=42):
+    """Handler to read in data and generate data and batches for model training and evaluation
+
+    With `packed=True` the paths and targets are memory mapped from the binary files packed_sdp writes
+    next to the json data (<data_prefix>_packed_*) instead of being read into lists
+    """
+    def __init__(self, data_prefix, valid_percent=10, max_sequence_len=None, shuffle_seed=42, packed=False):
         self._data_prefix = data_prefix
         self._valid_percent = valid_percent / 100.0
+        self._packed = packed
+        self._class_orders = {} # classification_batch's permutation for the current epoch, by dataset
         self.read_data(shuffle_seed=shuffle_seed)
         if max_sequence_len:
             assert max_sequence_len >= self._max_seq_len, "Cannot for sequence length shorter than the data yields"
@@ -24,41 +65,72 @@ class DataHandler(object):
 
     def read_data(self, shuffle_seed=42):
         print("Creating Data objects...")
+        if self._packed:
+            self._read_packed_data(shuffle_seed=shuffle_seed)
+        else:
+            self._read_json_data(shuffle_seed=shuffle_seed)
+
+        # now chop off a validation set. Make it 
+        self._valid_split_idx = int((1-self._valid_percent)*len(self._paths))
+        self._valid_paths = self._paths[self._valid_split_idx:]
+        self._valid_targets = self._targets[self._valid_split_idx:]
+        self._paths = self._paths[:self._valid_split_idx]
+        self._targets = self._targets[:self._valid_split_idx]
+        # print(self._paths)
+        self._read_vocabs()
+        print("Done creating Data objects")
+
+    def _read_json_data(self, shuffle_seed=42):
         # read in sdp data
         data = []
         with open(self._data_prefix, 'r') as f:
             for line in f:
                 data.append(json.loads(line))
+        paths = [ datum['path'] for datum in data ]
+        targets = [ datum['target'] for datum in data] # targets get doubly wrapped in lists
+        del data
+        index = None
         if shuffle_seed:
+            # start off in random order before we do validation split 
+            # (shuffling the index moves things exactly like shuffling the data used to)
+            index = np.arange(len(paths), dtype=np.int32)
             random.seed(shuffle_seed)
-            random.shuffle(data) # start off in random order before we do validation split 
-        self._paths = [ datum['path'] for datum in data ]
-        self._max_seq_len = max([ len(path) for path in self._paths ])
-        self._targets = [ datum['target'] for datum in data] # targets get doubly wrapped in lists
+            random.shuffle(index)
+        self._paths = IndexedView(paths, index)
+        self._targets = IndexedView(targets, index)
+        self._max_seq_len = max([ len(path) for path in paths ])
         # print(self._targets)
         # create a distribution of targets for target_neg in batch generatiom
         # FOR NOW: just make a set and we'll sample uniform
         #   but since it's not aggregated, it's still sampleing unigram
-        self._target_list = [t for target in self._targets for t in target]
-        targets_dist = {}
-        for target in self._target_list:
-            if target in targets_dist:
-                targets_dist[target] += 1
-            else:
-                targets_dist[target] = 1
-        self._true_target_dist = list(np.array(targets_dist.values()) / np.sum(targets_dist.values(), dtype=np.float32))
+        self._target_list = np.array([t for target in targets for t in target], dtype=np.int32)
+        # indexed by target id, so a sample from it is a target
+        target_counts = np.bincount(self._target_list)
+        self._true_target_dist = list(target_counts / np.sum(target_counts, dtype=np.float32))
         self._target_dist = self._true_target_dist[:]
         #make sure all of the paths have same depth
-        assert len(set(len(p) for path in self._paths for p in path)) == 1, "Not all path tuples have same len"
-        self._target_len = len(self._targets[0])
+        assert len(set(len(p) for path in paths for p in path)) == 1, "Not all path tuples have same len"
+        self._target_len = len(targets[0])
 
-        # now chop off a validation set. Make it 
-        self._valid_split_idx = int((1-self._valid_percent)*len(self._paths))
-        self._valid_paths = self._paths[self._valid_split_idx:]
-        self._valid_targets = self._targets[self._valid_split_idx:]
-        self._paths = self._paths[:self._valid_split_idx]
-        self._targets = self._targets[:self._valid_split_idx]
-        # print(self._paths)
+    def _read_packed_data(self, shuffle_seed=42):
+        # memory map the packed sdp data, a shuffle only reorders an index into it
+        data = PackedSDPData(self._data_prefix)
+        index = None
+        if shuffle_seed:
+            index = np.random.RandomState(shuffle_seed).permutation(data.num_paths)
+            if data.num_paths < 2**31:
+                index = index.astype(np.int32)
+        self._paths = PackedPaths(data, index)
+        self._targets = PackedTargets(data, index)
+        self._max_seq_len = data.max_len
+        # the flat memmap stands in for the list of every target we sample from
+        self._target_list = data.targets.reshape(-1)
+        target_counts = data.target_counts()
+        self._true_target_dist = list(target_counts / np.sum(target_counts, dtype=np.float32))
+        self._target_dist = self._true_target_dist[:]
+        self._target_len = data.target_len
+
+    def _read_vocabs(self):
         # read in vocab and distribution
         vocab_and_dist = []
         with open(self._data_prefix+"_vocab", 'r') as f:
@@ -94,39 +166,30 @@ class DataHandler(object):
         self._pos2int = {v:i for (i,v) in enumerate(self._pos_vocab)}
         self._int2pos = {i:v for (v,i) in self._pos2int.items()}
         self._pos_size = len(self._pos_vocab)
-        print("Done creating Data objects")
+        # alias tables to sample negatives from, rebuilt only when a distribution is rescaled
+        self._vocab_sampler = AliasSampler(self._vocab_dist)
+        self._dep_sampler = AliasSampler(self._dep_dist)
+        self._target_sampler = AliasSampler(self._target_dist)
 
     def shuffle_data(self):
-        """ Shuffle shit around to help SGD convergence"""
-        paths_and_targets = zip(self._paths, self._targets)
-        random.shuffle(paths_and_targets)
-        self._paths = [d[0] for d in paths_and_targets]
-        self._targets = [d[1] for d in paths_and_targets]
+        """ Shuffle shit around to help SGD convergence
+
+        Only the index the paths and targets are viewed through gets permuted"""
+        order = np.random.permutation(len(self._paths))
+        self._paths = self._paths.take(order)
+        self._targets = self._targets.take(order)
     
     def _sequences_to_tensor(self, list_of_lists):
-        """ Convert list of lists of either single elements or tuples into matrix of appropriate dim"""
-        lengths = np.array([len(list_) for list_ in list_of_lists]).reshape([-1, 1])
-        
-        #matrix case
-        if isinstance(list_of_lists[0][0], (int, float)):
-            matrix = np.zeros([len(list_of_lists), self._max_seq_len])
-            for i, list_ in enumerate(list_of_lists):
-                matrix[i, :len(list_)] = list_
-            return matrix, lengths
-        
-        #tensor case
-        if isinstance(list_of_lists[0][0], (tuple, list)):
-            k = len(list_of_lists[0][0]) # we asserted before that all of them were the same len
-            tensor = np.zeros([len(list_of_lists), self._max_seq_len, k])
-            for i, list_ in enumerate(list_of_lists):
-                for j in range(k):
-                    tensor[i, :len(list_), j] = [ x[j] for x in list_ ]
-            return tensor, lengths
+        """ Convert list of lists of either single elements or tuples into int32 matrix of appropriate dim"""
+        return sequences_to_tensor(list_of_lists, self._max_seq_len)
     
-    def _generate_batch(self, offset, batch_size, inputs, targets, target_neg=False, neg_per=None, neg_level=1):
+    def _generate_batch(self, offset, batch_size, inputs, targets, target_neg=False, neg_per=None, neg_level=1, rng=None,
+                        pad_len=None):
         """Expects the data as list of lists of indices
 
-        Converts them to matrices of indices, lang model labels, and lengths"""
+        Converts them to matrices of indices, lang model labels, and lengths.
+        Negatives are drawn with `rng` (a np.random.RandomState) if given, else the global numpy state.
+        Sequences are padded to `pad_len` if given, else max_seq_len"""
         assert neg_level > 0, "Cannot have negative examples with no corruption"
         start = offset*batch_size
         end = start + batch_size
@@ -135,106 +198,78 @@ class DataHandler(object):
 #             print("Not full batch")
         inputs = inputs[start:end]
 
-        # create a list of if the target being predicted is X|Y or not
+        targets = np.array(targets[start:end]).astype(np.int32).reshape([-1, self._target_len])
+        input_mat, len_vec = sequences_to_tensor(inputs, pad_len or self._max_seq_len)
+        labels = np.ones_like(len_vec)
+        # create a column of if the target being predicted is X|Y or not
         # this is used to pick which RNN will look at the sequence
         x_tag = self._vocab2int['<X>']
-        predict_x = [ 1 if input_[-1][0] == x_tag else 0 for input_ in inputs]
-        # print("Input targets: ", targets )
-        targets = np.array(targets[start:end])
-        # print("Batch targets: ", targets)
-        labels = np.ones(targets.shape[0]).reshape((-1, 1))
-        input_mat, len_vec = self._sequences_to_tensor(inputs)
+        last = np.maximum(len_vec[:, 0] - 1, 0)
+        predict_x = (input_mat[np.arange(len(len_vec)), last, 0] == x_tag).astype(np.int32).reshape((-1, 1))
         # generate the negative samples
-        # randomly choose one index for each negative sample 
-        # TODO: option to replace more than one phrase element
-        # and replace that with a random word drawn from the scaled unigram distribution
         if neg_per:
-            # neg level can't be higher than 2 if neg_target:
-            if target_neg:
-                neg_level = min(2, neg_level)
-            negatives = []
-            neg_targets = []
-            neg_pred_x = []
-            
-            for i, seq in enumerate(inputs): # for each true sequence
-                # seq = np.array(seq)
-                # print("*"*80)
-                # print("Original sequence, target: ", i, seq, targets[i])
-                for neg in range(neg_per): # create neg_per extra negative examples
-                    neg_seq = seq[:]
-                    neg_target = list(targets[i, :])
-                    # print('og neg target, neg_sequence: ', neg_target, neg_seq)
-                    if target_neg:
-                        # single tarets is the simpler case.  Just sample unigram target
-                        if self._target_len == 1:
-                            neg_target[0] = self._sample_distribution(self._target_dist)
-                        else: # double targets requires some care
-                            # always make the first negative example the reversed targets
-                            if neg == 0:
-                                temp = neg_target[:]
-                                neg_target[0] = temp[1]
-                                neg_target[1] = temp[0]
-                                # print("Reversed target negatives: ", neg_target, temp)
-                                del temp
-                            else:
-                                # just one, pick a random target to flip
-                                if neg_level == 1:
-                                    neg_idx = int(random.uniform(0,2)) # random 0,1 w/ 50% each
-                                    # neg_target[neg_idx] = np.random.choice(range(len(self._target_list)), 
-                                    #                        size=1)[0]
-                                    neg_target[neg_idx] = self._target_list[int(random.uniform(0,len(self._target_list)))]
-                                if neg_level == 2:
-                                    neg_target = [self._target_list[int(random.uniform(0,len(self._target_list)))],
-                                                  self._target_list[int(random.uniform(0,len(self._target_list)))]]
-
-                    else: # otherwise we're corrupting the sequences, not the targets
-                        # break sticks to split up noise into vocab and deps
-                        # pick an int that's less that seq - <X> - <Y>
-                        # but make sure that's not more than we asked for
-                        # num_v = min(int(random.uniform(0, max(len(seq)-2, 1))), neg_level)
-                        # num_d = neg_level - num_v
-
-                        # simpler way,  just only replace words
-                        num_v = min(neg_level, len(seq)-2)
-                        num_d = 0
-                        if num_v: # choice breaks if zero
-                            v_rand_idx = np.random.choice(range(1, len(seq)-1), size=num_v)
-                            v_noise = np.random.choice(range(len(self._vocab)), 
-                                                       size=num_v, p=self._vocab_dist)
-                            for j, v in zip(v_rand_idx, v_noise):
-                                neg_seq[j][0] = v
-                        if num_d:
-                            d_rand_idx = np.random.choice(range(0, len(seq)), size=num_d)
-                            d_noise = np.random.choice(range(len(self._dep_vocab)), 
-                                                       size=num_d, p=self._dep_dist)
-                            # do the replacements
-                            for j, d in zip(d_rand_idx, d_noise):
-                                neg_seq[j][1] = d
-                    # print("Negative sample ", neg, neg_seq, neg_target)
-                    negatives.append(neg_seq)
-                    neg_targets.append(neg_target)
-                    neg_pred_x.append(predict_x[i])
-            neg_mat, neg_len = self._sequences_to_tensor(negatives)
+            neg_mat, neg_targets, neg_len, neg_pred_x = self._generate_negatives(input_mat, targets, len_vec, predict_x,
+                                                                                 neg_per, target_neg, neg_level, rng=rng)
             neg_labels = np.zeros_like(neg_len)
-            neg_pred_x = np.array(neg_pred_x).astype(np.int32).reshape((-1,1))
-            predict_x = np.array(predict_x).reshape((-1, 1))
-            # print(predict_x.shape, neg_pred_x.shape)
-            all_inputs = np.vstack((input_mat, neg_mat)).astype(np.int32)
-            all_targets = np.vstack((targets, np.array(neg_targets))).astype(np.int32).reshape([-1, self._target_len])
-            all_labels = np.vstack((labels, neg_labels)).astype(np.int32)
-            # print(zip(list(all_targets.reshape((-1))), list(all_labels.reshape((-1)))))
-            # print(input_mat[:,:, 0])
-            # print(neg_mat[:,:,0])
-            all_lengths = np.vstack((len_vec, neg_len)).astype(np.int32)
-            all_pred_x = np.vstack((predict_x, neg_pred_x)).astype(np.int32)
+            all_inputs = np.vstack((input_mat, neg_mat))
+            all_targets = np.vstack((targets, neg_targets))
+            all_labels = np.vstack((labels, neg_labels))
+            all_lengths = np.vstack((len_vec, neg_len))
+            all_pred_x = np.vstack((predict_x, neg_pred_x))
         else:
-            all_inputs = input_mat.astype(np.int32)
-            all_targets = targets.astype(np.int32).reshape([-1, self._target_len])
-            all_labels = labels.astype(np.int32)
-            all_lengths = len_vec.astype(np.int32)
-            all_pred_x = np.array(predict_x).reshape((-1,1)).astype(np.int32)
+            all_inputs = input_mat
+            all_targets = targets
+            all_labels = labels
+            all_lengths = len_vec
+            all_pred_x = predict_x
         return all_inputs, all_targets, all_labels, all_lengths, all_pred_x
 
+    def _generate_negatives(self, input_mat, targets, len_vec, predict_x, neg_per, target_neg, neg_level, rng=None):
+        """Build all `neg_per` negatives of every example in a batch at once
+
+        Each example is repeated neg_per times (keeping the old order: all of an example's negatives together)
+        and then corrupted in place with draws made for the whole batch in one go.
+        Corrupting targets: single targets are resampled from the target distribution.
+        Double targets get the reversed pair as the first negative, and 1 (or 2 for neg_level 2) targets
+        replaced with ones drawn uniformly from the data for the rest.
+        Corrupting sequences: neg_level words (at most all but <X> and <Y>) are replaced with draws from the vocab
+        distribution, at positions picked with replacement.
+        """
+        # neg level can't be higher than 2 if neg_target:
+        if target_neg:
+            neg_level = min(2, neg_level)
+        rng = np.random if rng is None else rng
+        neg_mat = np.repeat(input_mat, neg_per, axis=0)
+        neg_targets = np.repeat(targets, neg_per, axis=0)
+        neg_len = np.repeat(len_vec, neg_per, axis=0)
+        neg_pred_x = np.repeat(predict_x, neg_per, axis=0)
+        num_neg = len(neg_len)
+        if target_neg:
+            # single tarets is the simpler case.  Just sample unigram target
+            if self._target_len == 1:
+                neg_targets[:, 0] = self._target_sampler.sample(num_neg, rng=rng)
+            else: # double targets requires some care
+                # always make the first negative example the reversed targets
+                first = np.arange(0, num_neg, neg_per)
+                neg_targets[first] = neg_targets[first, ::-1]
+                rest = np.setdiff1d(np.arange(num_neg), first)
+                if neg_level == 1: # just one, pick a random target to flip
+                    neg_idx = rng.randint(0, 2, size=len(rest))
+                    neg_targets[rest, neg_idx] = self._target_list[rng.randint(0, len(self._target_list),
+                                                                               size=len(rest))]
+                if neg_level == 2:
+                    neg_targets[rest] = self._target_list[rng.randint(0, len(self._target_list),
+                                                                      size=(len(rest), 2))]
+        else: # otherwise we're corrupting the sequences, not the targets
+            # simpler way,  just only replace words
+            num_v = np.minimum(neg_level, neg_len[:, 0] - 2)
+            for level in range(neg_level):
+                rows = np.nonzero(num_v > level)[0]
+                # a position between <X> and <Y>, and a word from the scaled unigram distribution
+                positions = 1 + (rng.random_sample(len(rows)) * (neg_len[rows, 0] - 2)).astype(np.int32)
+                neg_mat[rows, positions, 0] = self._vocab_sampler.sample(len(rows), rng=rng)
+        return neg_mat, neg_targets, neg_len, neg_pred_x
+
     def _generate_class_batch(self, offset, batch_size, inputs, targets, labels, singles=False):
         """Expects the data as list of lists of indices
 
@@ -261,26 +296,77 @@ class DataHandler(object):
             x_targets, y_targets = np.split(targets, [1], axis=1)
             x_inputs, lens = self._sequences_to_tensor(x_inputs)
             y_inputs, _ = self._sequences_to_tensor(y_inputs)
-            x_inputs = x_inputs.astype(np.int32)
-            y_inputs = y_inputs.astype(np.int32)
-            lens = lens.astype(np.int32)
             return x_inputs, y_inputs, x_targets, y_targets, labels, lens
             
         else:
             inputs, lens = self._sequences_to_tensor(inputs)
-            inputs = inputs.astype(np.int32)
-            lens = lens.astype(np.int32)
             return inputs, targets, labels, lens
     
-    def batches(self, batch_size, target_neg=False, neg_per=5, neg_level=1, offset=0):
+    def batches(self, batch_size, target_neg=False, neg_per=5, neg_level=1, offset=0, seed=None):
+        """Generate the training batches in order
+
+        With a seed, step i's negatives are drawn from RandomState([seed, i]) like `prefetch_batches` does"""
         num_steps = len(self._paths) // batch_size
         if num_steps == 0:
             num_steps = 1
         for step in range(offset, num_steps):
+            rng = np.random.RandomState([seed, step]) if seed is not None else None
             yield self._generate_batch(step, batch_size, 
                                        self._paths, self._targets, 
                                        target_neg=target_neg,
-                                       neg_per=neg_per, neg_level=neg_level)
+                                       neg_per=neg_per, neg_level=neg_level, rng=rng)
+
+    def prefetch_batches(self, batch_size, target_neg=False, neg_per=5, neg_level=1, offset=0, seed=None,
+                         num_ready=4, num_workers=1):
+        """Same batches as `batches`, built ahead on background threads while the model trains
+
+        Returns a BatchPrefetcher, iterate over it like `batches` and call its `report` for starvation stats.
+        Pass a seed to get exactly the batches `batches` gives with that seed.
+        Use it in a with block so the workers are stopped if the loop breaks early:
+
+            with DH.prefetch_batches(batch_size, seed=0) as batches:
+                for batch in batches:
+                    ...
+        """
+        num_steps = len(self._paths) // batch_size
+        if num_steps == 0:
+            num_steps = 1
+        paths, targets = self._paths, self._targets # don't let a shuffle_data swap them out mid epoch
+        def make_batch(step, rng):
+            return self._generate_batch(step, batch_size, paths, targets,
+                                        target_neg=target_neg,
+                                        neg_per=neg_per, neg_level=neg_level, rng=rng)
+        return BatchPrefetcher(make_batch, range(offset, num_steps), 
+                               num_ready=num_ready, num_workers=num_workers, seed=seed)
+
+    def bucket_batches(self, batch_size, buckets, target_neg=False, neg_per=5, neg_level=1, seed=None):
+        """Generate training batches of paths with similar lengths, each padded only to its bucket
+
+        Every path goes in the shortest bucket (a length) it fits in, then each bucket is cut into batches
+        and the batches of all the buckets are visited in a random order.  Every path is used once, so the last
+        batch of a bucket can be short.  With a seed both that order and the negatives are reproducible.
+        The batches look like the ones from `batches`, RelEmbed picks the graph to run from their padding
+        """
+        buckets = sorted(set([ b for b in buckets if b < self._max_seq_len ] + [self._max_seq_len]))
+        if self._packed:
+            lengths = self._paths.lengths()
+        else:
+            lengths = np.fromiter((len(path) for path in self._paths), dtype=np.int32, count=len(self._paths))
+        which = np.searchsorted(buckets, lengths) # shortest bucket with length >= path length
+        bucket_paths, bucket_targets, schedule = [], [], []
+        for b in range(len(buckets)):
+            members = np.nonzero(which == b)[0]
+            bucket_paths.append(self._paths.take(members))
+            bucket_targets.append(self._targets.take(members))
+            schedule.extend((b, offset) for offset in range((len(members) + batch_size - 1) // batch_size))
+        shuffler = np.random.RandomState(seed) if seed is not None else np.random
+        for step, i in enumerate(shuffler.permutation(len(schedule))):
+            b, offset = schedule[i]
+            rng = np.random.RandomState([seed, step]) if seed is not None else None
+            yield self._generate_batch(offset, batch_size, 
+                                       bucket_paths[b], bucket_targets[b],
+                                       target_neg=target_neg, neg_per=neg_per, neg_level=neg_level,
+                                       rng=rng, pad_len=buckets[b])
 
     def validation_batch(self):
         return  self._generate_batch(0,    
@@ -292,20 +378,33 @@ class DataHandler(object):
         # return valid_inputs, valid_targets, valid_labels, valid_lens, val
 
     def classification_batch(self, batch_size, inputs, targets, labels, offset=0, shuffle=False, singles=False):
+        """The `offset`th batch of the classification data
+
+        With shuffle the batches of an epoch come from one permutation, drawn at offset 0 and reused
+        for the later offsets, so an epoch sees every example once"""
         if shuffle:
-            data = zip(inputs, targets, labels)
-            random.shuffle(data)
-            inputs, targets, labels = zip(*data)
+            # gather just this batch through the epoch's permuted index instead of shuffling copies of everything
+            # kept per dataset (by identity, a train and a valid set can be the same size)
+            # so interleaved train and valid epochs don't reshuffle each other
+            order = self._class_orders.get(id(inputs))
+            if order is None or offset == 0 or len(order) != len(inputs):
+                order = self._class_orders[id(inputs)] = np.random.permutation(len(inputs))
+            positions = order[offset*batch_size:(offset+1)*batch_size]
+            inputs, targets, labels = take(inputs, positions), take(targets, positions), take(labels, positions)
+            offset = 0
         return self._generate_class_batch(offset, batch_size, inputs, targets, labels, singles=singles)
     
     def scale_vocab_dist(self, power):
         self._vocab_dist = self._distribution_to_power(self._true_vocab_dist, power)
+        self._vocab_sampler = AliasSampler(self._vocab_dist)
         
     def scale_dep_dist(self, power):
         self._dep_dist = self._distribution_to_power(self._true_dep_dist, power)
+        self._dep_sampler = AliasSampler(self._dep_dist)
 
     def scale_target_dist(self, power):
         self._target_dist = self._distribution_to_power(self._true_target_dist, power)
+        self._target_sampler = AliasSampler(self._target_dist)
 
 
     def _int_to_vocab(self, index, int2vocab):
@@ -384,24 +483,29 @@ class DataHandler(object):
                     for sequence in sequences ]
 
     def sentence_to_sequence(self, sentence, len_=10e5):
+        # same as _vocab_to_int on every token, with the lookups bound once per sentence
+        vocab_get, vocab_oov = self._vocab2int.get, self._vocab2int['<OOV>']
         try:
             if isinstance(sentence[0], (unicode, str)): # this is just a sinlg elist not list of lists
-                return [ self._vocab_to_int(x, self._vocab2int) 
+                return [ vocab_get(x, vocab_oov) 
                                        for (i, x) in enumerate(sentence) 
                                        if i < len_ ]
             elif set([len(d) for d in sentence]) == set([3]): # list of lists of pairs of ints
-                return [ [self._vocab_to_int(x[0], self._vocab2int),
-                        self._vocab_to_int(x[1], self._dep2int),
-                        self._vocab_to_int(x[2], self._pos2int)]
+                dep_get, dep_oov = self._dep2int.get, self._dep2int['<OOV>']
+                pos_get, pos_oov = self._pos2int.get, self._pos2int['<OOV>']
+                return [ [vocab_get(x[0], vocab_oov),
+                        dep_get(x[1], dep_oov),
+                        pos_get(x[2], pos_oov)]
                         for i, x in enumerate(sentence) ]
 
             elif set([len(d) for d in sentence]) == set([2]): # list of lists of pairs of ints
-                return [ [self._vocab_to_int(x[0], self._vocab2int),
-                        self._vocab_to_int(x[1], self._dep2int)]
+                dep_get, dep_oov = self._dep2int.get, self._dep2int['<OOV>']
+                return [ [vocab_get(x[0], vocab_oov),
+                        dep_get(x[1], dep_oov)]
                         for i, x in enumerate(sentence) ]
 
             elif set([len(d) for d in sentence]) == set([1]): # list of list of ints
-                return [ self._vocab_to_int(x, self._vocab2int) 
+                return [ vocab_get(x, vocab_oov) 
                                  for i, x in enumerate(sentence) 
                                  if i < len_ ]
             else:
@@ -435,18 +539,6 @@ class DataHandler(object):
         dist /= np.sum(dist)
         return dist
     
-    def _sample_distribution(self, distribution):
-        """Sample one element from a distribution assumed to be an array of normalized
-        probabilities.
-        """
-        r = random.uniform(0, 1)
-        s = 0
-        for i in range(len(distribution)):
-            s += distribution[i]
-            if s >= r:
-                return i
-        return len(distribution) - 1
-    
     def num_steps(self, batch_size):
         return len(self._paths) // batch_size
 
@@ -4,10 +4,10 @@ import numpy as np
 import re
 import collections
 import random
-from spacy import English
+import vocab_builder as vb
+from nlp_loader import parse as nlp
 
 """Constant defs"""
-nlp = English()
 split_delims = [' ', '.',';',':', '%', '"', '$', '^', ',']
 label2int = dict() # keep running dictionary of labels
 
@@ -119,32 +119,9 @@ def create_vocab_from_data(sentences, vocab_limit=5000, dep=False, filter_oov=Tr
     """Create a vocab index, inverse index, and multinomial distribution over tokens from a list of spacy sentences
     
     if `dep`=True, return the dependencies instead of the tokens"""
-    counts = collections.Counter()
-    for sentence in sentences:
-        for token in sentence:
-            if dep:
-                counts[token.dep_] += 1
-            else:
-                if filter_oov and not token.is_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text] += 1
-                elif not filter_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text] += 1
-                elif print_oov:
-                    print("Token %r is oov" % token.text)
-                
-    # make sure we didn't aim too high
-    if vocab_limit > len(counts):
-        vocab_limit = len(counts)
-    # create the vocab in most common order
-    vocab = [ x[0] for x in counts.most_common() ][:vocab_limit]
-    counts_ordered = [ x[1] for x in counts.most_common() ][:vocab_limit]
-    # calculate the empirical distribution
-    unigram_distribution = list(np.array(counts_ordered) / np.sum(counts_ordered, dtype=np.float32))
-    # create index and inverted index
-    vocab2int = { token:i for (i, token) in enumerate(vocab) }
-    int2vocab = { i:token for (token, i) in vocab2int.items() }
-
-    return vocab, vocab2int, int2vocab, unigram_distribution
+    counts = vb.count_vocab_from_data(sentences, dep=dep, lower=False, filter_oov=filter_oov, print_oov=print_oov)
+    # no min count or special tokens here, just the most common `vocab_limit` types
+    return vb.create_vocab_from_counts(counts, vocab_limit=vocab_limit, special_tokens=[])
 
 def dependency_path_to_root(token):
     """Traverse up the dependency tree. Include the token we are tracing"""
@@ -0,0 +1,106 @@
+"""
+RNN encoders that only loop as far as the longest path in the batch.
+
+tf.nn.rnn takes a python list with one input per step, so the RelEmbed graphs split their inputs into max_num_steps
+tensors and unroll max_num_steps copies of the cell, once for training and twice more for the similarity graph.
+Graph building time grows with max_num_steps, and so does the work of every step whatever the batch's paths look like.
+
+Here the cell runs in a control flow loop over a [batch, time, input size] tensor that stops after the longest of the
+batch's sequence lengths, so there's one copy of the cell in the graph however long max_num_steps is.
+A sequence that's run out keeps its state, so the final state is the state after each sequence's last element,
+the same as tf.nn.rnn with sequence_length.  Variables are named the same as with tf.nn.rnn in the same scope.
+
+The unrolled graphs don't all use that final state.  Some take tf.nn.rnn's or tf.nn.bidirectional_rnn's output at the
+last of max_num_steps, which is zeros for a path shorter than that.  `full_length` and `bidirectional_last_output`
+give the dynamic graphs the same quantity, so switching rnn_mode doesn't change what a model computes.
+A config with 'path_end_state': True uses the state at each path's own end in both modes instead, taking it from
+the unrolled outputs with `bidirectional_outputs_final_state`.
+
+The RelEmbed models use these when their config has 'rnn_mode': 'dynamic', see bench_dynamic_rnn.py.
+"""
+import tensorflow as tf
+from tensorflow.python.ops import control_flow_ops
+
+RNN_MODES = ('unrolled', 'dynamic')
+
+# While is called while_loop in later versions
+_while_loop = getattr(control_flow_ops, 'while_loop', None) or control_flow_ops.While
+
+def step_inputs(word_embeds, dep_embeds, pos_embeds):
+    """The [batch, time, input size] RNN inputs from the [batch, time, 1, embed size] embedding lookups"""
+    return tf.squeeze(tf.concat(3, [word_embeds, dep_embeds, pos_embeds]), [2])
+
+def _masked_step(cell, inputs, state, time, sequence_length):
+    """Run `cell` on the inputs at `time`, sequences that have already ended keep their state"""
+    step_input = tf.squeeze(tf.slice(inputs, tf.pack([0, time, 0]), [-1, 1, -1]), [1])
+    step_input.set_shape([None, inputs.get_shape()[2]]) # the cell needs to know its input size
+    _, new_state = cell(step_input, state)
+    running = tf.expand_dims(tf.to_float(tf.less(time, sequence_length)), 1)
+    return running * new_state + (1. - running) * state
+
+def rnn_final_state(cell, inputs, sequence_length, scope=None):
+    """Final state of `cell` over `inputs` [batch, time, input size], up to each of `sequence_length` [batch]
+
+    Only loops to the longest of `sequence_length`, however many steps `inputs` is padded to.
+    """
+    with tf.variable_scope(scope or "RNN"):
+        sequence_length = tf.to_int32(sequence_length)
+        state = cell.zero_state(tf.shape(inputs)[0], tf.float32)
+        # the first step is outside the loop so the cell's variables are created outside of it
+        state = _masked_step(cell, inputs, state, tf.constant(0), sequence_length)
+        tf.get_variable_scope().reuse_variables()
+        max_length = tf.reduce_max(sequence_length)
+        _, state = _while_loop(lambda time, state: tf.less(time, max_length),
+                               lambda time, state: [time + 1, _masked_step(cell, inputs, state, time, sequence_length)],
+                               [tf.constant(1), state])
+    return state
+
+def bidirectional_final_states(fw_cell, bw_cell, inputs, sequence_length, scope=None):
+    """Final forward and backward states
+
+    The backward cell reads each sequence reversed within its own length, so its final state is after the first element.
+    """
+    name = scope or "BiRNN"
+    fw_state = rnn_final_state(fw_cell, inputs, sequence_length, scope=name + "_FW")
+    reversed_inputs = tf.reverse_sequence(inputs, tf.to_int64(sequence_length), seq_dim=1, batch_dim=0)
+    bw_state = rnn_final_state(bw_cell, reversed_inputs, sequence_length, scope=name + "_BW")
+    return fw_state, bw_state
+
+def full_length(sequence_length, num_steps):
+    """[batch, 1] of 1. for the sequences that run all `num_steps` and 0. for the shorter ones
+
+    With sequence_length, tf.nn.rnn's output at the last of `num_steps` is the final state times this.
+    """
+    return tf.expand_dims(tf.to_float(tf.greater_equal(tf.to_int32(sequence_length), num_steps)), 1)
+
+def bidirectional_last_output(fw_cell, bw_cell, inputs, sequence_length, num_steps, scope=None):
+    """tf.nn.bidirectional_rnn's output at the last of `num_steps`, without unrolling them
+
+    Zeros for a sequence shorter than `num_steps`.  For one that runs all of them it's the forward final state and
+    the backward state after reading only the last element, where the backward cell starts.
+    """
+    name = scope or "BiRNN"
+    sequence_length = tf.to_int32(sequence_length)
+    fw_state = rnn_final_state(fw_cell, inputs, sequence_length, scope=name + "_FW")
+    with tf.variable_scope(name + "_BW"):
+        batch_size, time = tf.shape(inputs)[0], tf.shape(inputs)[1]
+        last = tf.gather(tf.reshape(inputs, tf.pack([-1, tf.shape(inputs)[2]])),
+                         tf.range(batch_size) * time + tf.maximum(sequence_length - 1, 0))
+        last.set_shape([None, inputs.get_shape()[2]]) # the cell needs to know its input size
+        _, bw_state = bw_cell(last, bw_cell.zero_state(batch_size, tf.float32))
+    return tf.concat(1, [fw_state, bw_state]) * full_length(sequence_length, num_steps)
+
+def bidirectional_outputs_final_state(outputs, sequence_length):
+    """Final forward and backward states, concatenated, from tf.nn.bidirectional_rnn's per step outputs
+
+    The forward half at each sequence's last element and the backward half at its first, which for cells whose
+    output is their state (the GRU) is what `bidirectional_final_states` gives.
+    """
+    if isinstance(outputs, tuple): # later versions return (outputs, fw_state, bw_state)
+        outputs = outputs[0]
+    half = outputs[0].get_shape()[1].value // 2
+    last = tf.to_int32(sequence_length) - 1
+    fw_state = tf.add_n([ tf.expand_dims(tf.to_float(tf.equal(last, t)), 1) * tf.slice(output, [0, 0], [-1, half])
+                          for t, output in enumerate(outputs) ])
+    bw_state = tf.slice(outputs[0], [0, half], [-1, -1])
+    return tf.concat(1, [fw_state, bw_state])
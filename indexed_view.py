@@ -0,0 +1,80 @@
+"""
+Index views over datasets.
+
+An `IndexedView` reads like a list of the rows of some base sequence, in the order of an int array of row ids.
+Shuffling, splitting off a validation set or picking out a batch only makes a new (smaller) index,
+the rows themselves are never copied.  packed_sdp's memory mapped views are built on it too.
+"""
+from __future__ import print_function
+import numpy as np
+
+class IndexedView(object):
+    """Rows of `base` in some order
+
+    `index` is an array of row ids, or None for the rows from `start` to `stop` in base order
+    """
+    def __init__(self, base, index=None, start=0, stop=None):
+        self._base = base
+        self._index = index
+        self._start = start
+        self._stop = len(base) if stop is None else stop
+
+    def __len__(self):
+        if self._index is None:
+            return self._stop - self._start
+        return len(self._index)
+
+    def rows(self):
+        """Row ids of the whole view"""
+        if self._index is None:
+            return np.arange(self._start, self._stop)
+        return self._index
+
+    def _row(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("View index out of range")
+        if self._index is None:
+            return self._start + i
+        return self._index[i]
+
+    def _get(self, row):
+        return self._base[row]
+
+    def _view(self, index=None, start=0, stop=None):
+        return self.__class__(self._base, index=index, start=start, stop=stop)
+
+    def take(self, positions):
+        """A new view of the rows at `positions` of this one"""
+        return self._view(index=self.rows()[positions])
+
+    def shuffled(self, rng=None):
+        """A new view of the same rows in a random order, drawn from `rng` or the global numpy state"""
+        rng = np.random if rng is None else rng
+        return self.take(rng.permutation(len(self)))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if self._index is None and key.step in (None, 1):
+                start, stop, _ = key.indices(len(self))
+                return self._view(start=self._start + start, stop=self._start + max(start, stop))
+            return self._view(index=self.rows()[key])
+        return self._get(self._row(key))
+
+    def __iter__(self):
+        for row in self.rows():
+            yield self._get(row)
+
+    def __array__(self, dtype=None):
+        return np.array([ self._get(row) for row in self.rows() ], dtype=dtype)
+
+def take(sequence, positions):
+    """The items of a list, view or array at `positions`, without copying a view's rows
+
+    An array's items are its rows, ndarray.take without an axis would pick from the flattened array"""
+    if isinstance(sequence, IndexedView):
+        return sequence.take(positions)
+    if isinstance(sequence, np.ndarray):
+        return sequence[np.asarray(positions)]
+    return [ sequence[i] for i in positions ]
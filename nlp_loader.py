@@ -0,0 +1,30 @@
+"""
+The spacy pipeline, one per process and only loaded the first time something is parsed.
+
+Loading English() takes a long time and a lot of memory, so the modules that parse import `parse` from here
+instead of building their own pipeline at import time.  Importing them for their helpers, or running a script
+with --help, never touches spacy, and however many of them a script imports the pipeline is loaded once.
+"""
+from __future__ import print_function
+from time import time
+
+_nlp = None
+load_time = None # seconds the pipeline took to load, None until it's loaded
+
+def get_nlp():
+    """The process wide spacy pipeline, loading it on the first call"""
+    global _nlp, load_time
+    if _nlp is None:
+        start = time()
+        from spacy.en import English
+        _nlp = English()
+        load_time = time() - start
+    return _nlp
+
+def parse(text):
+    """Parse a unicode string with the process wide pipeline"""
+    return get_nlp()(text)
+
+def report():
+    if load_time is not None:
+        print("Loading spacy took %0.1f sec" % load_time)
@@ -0,0 +1,172 @@
+"""
+Packed binary SDP datasets.
+
+The json lines written by the *2sdp scripts take a long time to parse and a lot of memory to hold as python lists.
+The packed format keeps the same data in flat binary arrays that can be memory mapped:
+
+    <prefix>_packed_paths    int32 [num elements, width]    (token, dep[, pos]) of every path element, path after path
+    <prefix>_packed_offsets  int64 [num paths + 1]          where each path starts in _packed_paths
+    <prefix>_packed_targets  int32 [num paths, target len]  the targets of each path
+    <prefix>_packed_source   int8  [num paths]              index into SOURCES of where the path came from
+    <prefix>_packed_meta     json                           the shapes above plus the longest path length
+
+`PackedSDPWriter` writes them as the scripts stream out SDPs, `PackedSDPData` opens them with np.memmap,
+and `PackedPaths` / `PackedTargets` are (optionally reordered) IndexedViews that read like lists of lists
+of ints, without ever loading the whole dataset.
+"""
+from __future__ import print_function
+import json
+import numpy as np
+
+from indexed_view import IndexedView
+
+SOURCES = ['WIKI', 'SEMEVAL']
+
+class PackedSDPWriter(object):
+    """Append SDP records (with integer paths and targets) to a packed dataset
+
+    Records are buffered and flushed `buffer_size` at a time, `close` writes the meta file
+    """
+    def __init__(self, prefix, buffer_size=100000):
+        self._prefix = prefix
+        self._buffer_size = buffer_size
+        self._paths_file = open(prefix + '_packed_paths', 'wb')
+        self._offsets_file = open(prefix + '_packed_offsets', 'wb')
+        self._targets_file = open(prefix + '_packed_targets', 'wb')
+        self._source_file = open(prefix + '_packed_source', 'wb')
+        self._paths = []
+        self._offsets = []
+        self._targets = []
+        self._sources = []
+        self._num_paths = 0
+        self._num_elements = 0
+        self._width = None
+        self._target_len = None
+        self._max_len = 0
+        np.array([0], dtype=np.int64).tofile(self._offsets_file)
+
+    def write(self, sdp, source=None):
+        """Add one record, `source` defaults to the record's own 'source' field or WIKI"""
+        path, target = sdp['path'], sdp['target']
+        if self._width is None:
+            self._width = len(path[0])
+            self._target_len = len(target)
+        assert all(len(p) == self._width for p in path), "Not all path tuples have same len"
+        assert len(target) == self._target_len, "Not all targets have same len"
+        if source is None:
+            source = sdp.get('source', 'WIKI')
+        self._paths.extend(path)
+        self._num_elements += len(path)
+        self._offsets.append(self._num_elements)
+        self._targets.append(target)
+        self._sources.append(SOURCES.index(source))
+        self._num_paths += 1
+        self._max_len = max(self._max_len, len(path))
+        if len(self._offsets) >= self._buffer_size:
+            self.flush()
+
+    def write_arrays(self, paths, lengths, targets, sources):
+        """Add a block of records that is already packed: the [num elements, width] path elements,
+        the length of each path, its [num paths, target len] targets and int8 source indices"""
+        paths, lengths = np.asarray(paths, dtype=np.int32), np.asarray(lengths, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int32)
+        if not len(lengths):
+            return
+        if self._width is None:
+            self._width = paths.shape[1]
+            self._target_len = targets.shape[1]
+        assert paths.shape[1] == self._width and targets.shape[1] == self._target_len, "Records don't match the dataset"
+        self.flush()
+        paths.tofile(self._paths_file)
+        (self._num_elements + np.cumsum(lengths)).tofile(self._offsets_file)
+        targets.tofile(self._targets_file)
+        np.asarray(sources, dtype=np.int8).tofile(self._source_file)
+        self._num_elements += len(paths)
+        self._num_paths += len(lengths)
+        self._max_len = max(self._max_len, int(lengths.max()))
+
+    def flush(self):
+        if not self._offsets:
+            return
+        np.array(self._paths, dtype=np.int32).tofile(self._paths_file)
+        np.array(self._offsets, dtype=np.int64).tofile(self._offsets_file)
+        np.array(self._targets, dtype=np.int32).tofile(self._targets_file)
+        np.array(self._sources, dtype=np.int8).tofile(self._source_file)
+        self._paths, self._offsets, self._targets, self._sources = [], [], [], []
+
+    def close(self):
+        self.flush()
+        for f in [self._paths_file, self._offsets_file, self._targets_file, self._source_file]:
+            f.close()
+        meta = {'num_paths': self._num_paths,
+                'num_elements': self._num_elements,
+                'width': self._width,
+                'target_len': self._target_len,
+                'max_len': self._max_len}
+        with open(self._prefix + '_packed_meta', 'w') as f:
+            f.write(json.dumps(meta) + '\n')
+
+class PackedSDPData(object):
+    """The memory mapped arrays of a packed dataset"""
+    def __init__(self, prefix):
+        with open(prefix + '_packed_meta', 'r') as f:
+            meta = json.loads(f.read())
+        assert meta['num_paths'], "Packed dataset %s is empty" % prefix
+        self.num_paths = meta['num_paths']
+        self.width = meta['width']
+        self.target_len = meta['target_len']
+        self.max_len = meta['max_len']
+        self.paths = np.memmap(prefix + '_packed_paths', dtype=np.int32, mode='r',
+                               shape=(meta['num_elements'], self.width))
+        self.offsets = np.memmap(prefix + '_packed_offsets', dtype=np.int64, mode='r',
+                                 shape=(self.num_paths + 1,))
+        self.targets = np.memmap(prefix + '_packed_targets', dtype=np.int32, mode='r',
+                                 shape=(self.num_paths, self.target_len))
+        self.source = np.memmap(prefix + '_packed_source', dtype=np.int8, mode='r',
+                                shape=(self.num_paths,))
+
+    def __len__(self):
+        return self.num_paths
+
+    def target_counts(self, chunk_size=1000000):
+        """Count every target id, a chunk at a time so the targets never all come into memory"""
+        flat = self.targets.reshape(-1)
+        counts = np.zeros(0, dtype=np.int64)
+        for start in range(0, len(flat), chunk_size):
+            chunk_counts = np.bincount(flat[start:start+chunk_size])
+            if len(chunk_counts) > len(counts):
+                chunk_counts[:len(counts)] += counts
+                counts = chunk_counts
+            else:
+                counts[:len(chunk_counts)] += chunk_counts
+        return counts
+
+class PackedPaths(IndexedView):
+    """Paths of a packed dataset, each one reads as a list of [token, dep(, pos)] lists"""
+    def _get(self, row):
+        offsets = self._base.offsets
+        return self._base.paths[offsets[row]:offsets[row+1]].tolist()
+
+    def lengths(self):
+        """Lengths of all the paths in the view"""
+        rows = self.rows()
+        return self._base.offsets[rows+1] - self._base.offsets[rows]
+
+    def gather(self):
+        """All the path elements of the view as one [num elements, width] array, and the path lengths"""
+        rows = self.rows()
+        starts = self._base.offsets[rows]
+        lengths = (self._base.offsets[rows+1] - starts).astype(np.int32)
+        # position of every element in the flat paths array
+        shift = starts - (np.cumsum(lengths) - lengths)
+        flat_index = np.repeat(shift, lengths) + np.arange(np.sum(lengths))
+        return np.asarray(self._base.paths[flat_index]), lengths
+
+class PackedTargets(IndexedView):
+    """Targets of a packed dataset, each one reads as a list of target ids"""
+    def _get(self, row):
+        return self._base.targets[row].tolist()
+
+    def __array__(self, dtype=None):
+        targets = np.asarray(self._base.targets[self.rows()])
+        return targets if dtype is None else targets.astype(dtype)
@@ -0,0 +1,155 @@
+"""
+Persistent parse cache.  Keeps a compact form of every spacy parse on disk keyed by a hash of the sentence text,
+so rerunning the *2sdp scripts with different filters doesn't have to reparse the corpus.
+
+The compact form holds just what SDP extraction and vocab counting look at:
+token text, dependency label, POS tag, head index, character offset, noun chunk spans and the
+like_num / is_punct / is_oov flags.  `CachedDoc` wraps it back up with the same attributes as a spacy Doc,
+so the existing extraction code runs on it unchanged and spacy never has to be loaded on a cache hit.
+"""
+from __future__ import print_function
+import hashlib
+import json
+try:
+    import anydbm as dbm
+except ImportError:
+    import dbm
+
+# bump this if the compact format changes so old entries stop matching
+CACHE_VERSION = u'1'
+
+def sentence_key(text):
+    """Content address of a sentence in the cache"""
+    return hashlib.sha1((CACHE_VERSION + u'\t' + text).encode('utf-8')).hexdigest()
+
+def compact_parse(doc, text=None):
+    """Strip a spacy Doc down to the plain lists we need to redo SDP extraction
+
+    `text` is the string the doc was parsed from (defaults to `doc.text`), it's what the parse is keyed on"""
+    return {'text': text if text is not None else doc.text,
+            'words': [ token.text for token in doc ],
+            'deps': [ token.dep_ for token in doc ],
+            'pos': [ token.pos_ for token in doc ],
+            'heads': [ token.head.i for token in doc ],
+            'idx': [ token.idx for token in doc ],
+            'chunks': [ [chunk.start, chunk.end] for chunk in doc.noun_chunks ],
+            'like_num': [ int(token.like_num) for token in doc ],
+            'is_punct': [ int(token.is_punct) for token in doc ],
+            'is_oov': [ int(token.is_oov) for token in doc ]}
+
+class CachedToken(object):
+    """Stand in for a spacy Token backed by a compact parse"""
+    __slots__ = ['doc', 'i', 'text', 'dep_', 'pos_', 'idx', 'like_num', 'is_punct', 'is_oov']
+
+    def __init__(self, doc, i, parse):
+        self.doc = doc
+        self.i = i
+        self.text = parse['words'][i]
+        self.dep_ = parse['deps'][i]
+        self.pos_ = parse['pos'][i]
+        self.idx = parse['idx'][i]
+        self.like_num = bool(parse['like_num'][i])
+        self.is_punct = bool(parse['is_punct'][i])
+        self.is_oov = bool(parse['is_oov'][i])
+
+    @property
+    def head(self):
+        return self.doc[self.doc.heads[self.i]]
+
+    def __repr__(self):
+        return self.text
+
+    def __unicode__(self):
+        return self.text
+
+class CachedSpan(object):
+    """Stand in for a spacy Span (noun chunk) over a CachedDoc"""
+    def __init__(self, doc, start, end):
+        self.doc = doc
+        self.start = start
+        self.end = end
+
+    def __iter__(self):
+        return iter(self.doc.tokens[self.start:self.end])
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def text(self):
+        return u' '.join(token.text for token in self)
+
+    def __repr__(self):
+        return self.text
+
+class CachedDoc(object):
+    """Stand in for a spacy Doc backed by a compact parse"""
+    def __init__(self, parse):
+        self.parse = parse
+        self.text = parse['text']
+        self.heads = parse['heads']
+        self.tokens = [ CachedToken(self, i, parse) for i in range(len(parse['words'])) ]
+
+    def __getitem__(self, i):
+        return self.tokens[i]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @property
+    def noun_chunks(self):
+        for start, end in self.parse['chunks']:
+            yield CachedSpan(self, start, end)
+
+    def __repr__(self):
+        return self.text
+
+    def __unicode__(self):
+        return self.text
+
+class ParseCache(object):
+    """On disk, content addressed store of compact parses
+
+    Args:
+        cache_path: the dbm file to keep parses in (created if it doesn't exist)
+        parser: a callable taking unicode text and returning a spacy Doc, only called on misses.
+                If None, a miss raises a KeyError
+
+    `parse` always returns a CachedDoc so a run behaves the same whether the cache was warm or cold
+    """
+    def __init__(self, cache_path, parser=None):
+        self._cache_path = cache_path
+        self._parser = parser
+        self._db = dbm.open(cache_path, 'c')
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text):
+        """Return the compact parse of `text` or None if we haven't seen it"""
+        key = sentence_key(text)
+        if key in self._db:
+            self.hits += 1
+            return json.loads(self._db[key])
+        self.misses += 1
+        return None
+
+    def put(self, parse):
+        """Store a compact parse under its own text"""
+        self._db[sentence_key(parse['text'])] = json.dumps(parse)
+
+    def parse(self, text):
+        """Look up the parse of `text`, parsing and storing it if it's missing"""
+        parse = self.get(text)
+        if parse is None:
+            if self._parser is None:
+                raise KeyError("No cached parse for %r and no parser to make one" % text)
+            parse = compact_parse(self._parser(text), text=text)
+            self.put(parse)
+        return CachedDoc(parse)
+
+    def close(self):
+        print("Parse cache %s: %i hits, %i misses" % (self._cache_path, self.hits, self.misses))
+        self._db.close()
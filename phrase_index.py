@@ -0,0 +1,251 @@
+"""
+Nearest neighbour index over the phrase embeddings of an SDP corpus.
+
+validation_phrase_nearby runs the whole similarity set through the RNN again for every query.  Here a corpus is
+embedded once, a batch at a time with the model's embed_similarity_vectors, the very unit vectors the similarity graph
+scores (<x target * state, y target> for relembed, the RNN state for the others), and appended to flat binary files
+that are memory mapped to answer queries.  Queries are embedded the same way, so an exact query gives the neighbours
+validation_phrase_nearby would, `check_nearby` compares the two on a small corpus:
+
+    <prefix>_index_vectors    float32 [num phrases, dim]   the normalized vectors
+    <prefix>_index_ids        int64   [num phrases]        corpus position of each vector, once the lists are built
+    <prefix>_index_centroids  float32 [num lists, dim]     the lists' centroids
+    <prefix>_index_offsets    int64   [num lists + 1]      where each list starts in _index_vectors
+    <prefix>_index_meta       json                         num phrases, dim and num lists
+
+`PhraseIndex.nearby` is exact: a matmul with a block of rows at a time, keeping the best k of each block, so memory
+stays at block_size x num queries however big the corpus is.  That reads the whole matrix for every batch of queries.
+`build_lists` makes it approximate: spherical k-means on a sample puts every vector in the list of its nearest centroid,
+and the vectors are rewritten list after list.  A query then only scans the `probes` lists with the nearest centroids,
+which with ~sqrt(num phrases) lists is a few thousand rows out of millions, so it takes milliseconds.
+
+    python phrase_index.py -i data/wiki_phrases --lists 1000 --probes 8   # build the lists and time queries
+"""
+from __future__ import print_function
+import json
+import os
+import click
+import numpy as np
+from time import time
+
+from data_handler import sequences_to_tensor
+
+def embed_paths(model, paths, targets, batch_size=1000):
+    """Yield the similarity vectors of `paths` a batch at a time
+
+    `paths` and `targets` are lists of int paths and targets, or a DataHandler's (packed) views of them,
+    with no path longer than model.max_num_steps."""
+    for offset in range(0, len(paths), batch_size):
+        phrases, lengths = sequences_to_tensor(paths[offset:offset+batch_size], model.max_num_steps)
+        batch_targets = np.asarray(targets[offset:offset+batch_size], dtype=np.int32)
+        yield model.embed_similarity_vectors(phrases, batch_targets, lengths)
+
+class PhraseIndexWriter(object):
+    """Append phrase embeddings to an index, `close` writes the meta file"""
+    def __init__(self, prefix):
+        self._prefix = prefix
+        self._vectors_file = open(prefix + '_index_vectors', 'wb')
+        self._num_phrases = 0
+        self._dim = None
+
+    def write(self, vectors):
+        """Add a batch of the model's similarity vectors"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+        assert vectors.shape[1] == self._dim, "Phrase vectors don't match the index"
+        vectors.tofile(self._vectors_file)
+        self._num_phrases += len(vectors)
+
+    def close(self):
+        self._vectors_file.close()
+        for suffix in ['_index_ids', '_index_centroids', '_index_offsets']: # stale lists of an older index
+            if os.path.exists(self._prefix + suffix):
+                os.remove(self._prefix + suffix)
+        write_meta(self._prefix, {'num_phrases': self._num_phrases,
+                                  'dim': self._dim,
+                                  'num_lists': 0})
+
+def write_meta(prefix, meta):
+    with open(prefix + '_index_meta', 'w') as f:
+        f.write(json.dumps(meta) + '\n')
+
+def read_meta(prefix):
+    with open(prefix + '_index_meta', 'r') as f:
+        return json.loads(f.read())
+
+def build_index(model, paths, targets, prefix, batch_size=1000, verbose=True):
+    """Embed every path of a corpus (see `embed_paths`) with `model` into the index at `prefix`"""
+    writer = PhraseIndexWriter(prefix)
+    start = time()
+    for step, vectors in enumerate(embed_paths(model, paths, targets, batch_size)):
+        writer.write(vectors)
+        if verbose and step % 100 == 0:
+            print("\rEmbedded %i of %i phrases" % (min((step + 1) * batch_size, len(paths)), len(paths)), end="")
+    writer.close()
+    if verbose:
+        print("\rEmbedded %i phrases in %0.1f sec" % (len(paths), time() - start))
+
+def _top_k(sims, k):
+    """Values and columns of the k biggest of each row, biggest first"""
+    if k < sims.shape[1]:
+        cols = np.argpartition(-sims, k-1, axis=1)[:, :k]
+    else:
+        cols = np.tile(np.arange(sims.shape[1]), (sims.shape[0], 1))
+    vals = sims[np.arange(sims.shape[0])[:, None], cols]
+    order = np.argsort(-vals, axis=1)
+    return vals[np.arange(sims.shape[0])[:, None], order], cols[np.arange(sims.shape[0])[:, None], order]
+
+def _kmeans(vectors, num_lists, iterations, rng):
+    """Spherical k-means: unit centroids, each vector goes to the one with the biggest dot product"""
+    centroids = vectors[rng.choice(len(vectors), num_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(np.dot(vectors, centroids.T), axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = ~np.any(sums, axis=1)
+        sums[empty] = vectors[rng.choice(len(vectors), np.sum(empty), replace=False)] # restart empty lists
+        centroids = sums / np.sqrt(np.sum(sums**2, axis=1, keepdims=True))
+    return centroids.astype(np.float32)
+
+def build_lists(prefix, num_lists=None, sample_size=100000, iterations=10, block_size=65536, seed=0):
+    """Cluster the index at `prefix` into `num_lists` lists (default ~sqrt(num phrases)) for approximate queries
+
+    The vectors are rewritten list after list, _index_ids keeps the corpus position of each one."""
+    meta = read_meta(prefix)
+    num_phrases, dim = meta['num_phrases'], meta['dim']
+    vectors = np.memmap(prefix + '_index_vectors', dtype=np.float32, mode='r', shape=(num_phrases, dim))
+    ids = (np.memmap(prefix + '_index_ids', dtype=np.int64, mode='r', shape=(num_phrases,))
+           if meta['num_lists'] else np.arange(num_phrases, dtype=np.int64))
+    num_lists = num_lists or max(1, int(np.sqrt(num_phrases)))
+    rng = np.random.RandomState(seed)
+    sample = np.asarray(vectors[np.sort(rng.choice(num_phrases, min(sample_size, num_phrases), replace=False))])
+    centroids = _kmeans(sample, min(num_lists, len(sample)), iterations, rng)
+    assignments = np.concatenate([ np.argmax(np.dot(vectors[start:start+block_size], centroids.T), axis=1)
+                                   for start in range(0, num_phrases, block_size) ])
+    order = np.argsort(assignments, kind='mergesort')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))]).astype(np.int64)
+    with open(prefix + '_index_vectors.tmp', 'wb') as f:
+        for start in range(0, num_phrases, block_size):
+            rows = order[start:start+block_size]
+            sorted_rows = np.sort(rows) # read the memmap in order
+            np.asarray(vectors[sorted_rows])[np.searchsorted(sorted_rows, rows)].tofile(f)
+    np.asarray(ids[order], dtype=np.int64).tofile(prefix + '_index_ids.tmp')
+    del vectors, ids
+    os.rename(prefix + '_index_vectors.tmp', prefix + '_index_vectors')
+    os.rename(prefix + '_index_ids.tmp', prefix + '_index_ids')
+    centroids.tofile(prefix + '_index_centroids')
+    offsets.tofile(prefix + '_index_offsets')
+    meta['num_lists'] = len(centroids)
+    write_meta(prefix, meta)
+
+class PhraseIndex(object):
+    """The memory mapped vectors of an index, answering nearest phrase queries by cosine similarity"""
+    def __init__(self, prefix):
+        meta = read_meta(prefix)
+        self.num_phrases = meta['num_phrases']
+        self.dim = meta['dim']
+        self.num_lists = meta['num_lists']
+        self.vectors = np.memmap(prefix + '_index_vectors', dtype=np.float32, mode='r',
+                                 shape=(self.num_phrases, self.dim))
+        self.ids = None
+        if self.num_lists:
+            self.ids = np.memmap(prefix + '_index_ids', dtype=np.int64, mode='r', shape=(self.num_phrases,))
+            self.centroids = np.fromfile(prefix + '_index_centroids', dtype=np.float32).reshape([-1, self.dim])
+            self.offsets = np.fromfile(prefix + '_index_offsets', dtype=np.int64)
+
+    def __len__(self):
+        return self.num_phrases
+
+    def query_vectors(self, model, paths, targets):
+        """Vectors to search with for some query paths and targets, embedded like the index's phrases"""
+        return np.concatenate(list(embed_paths(model, paths, targets)))
+
+    def nearby(self, queries, k=10, probes=None, block_size=65536):
+        """Similarities and corpus positions of the k nearest phrases to each query vector, nearest first
+
+        Exact over every phrase if `probes` is None (or the index has no lists),
+        else only over the `probes` lists with the nearest centroids to each query."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if probes is None or not self.num_lists:
+            return self._exact_nearby(queries, k, block_size)
+        vals, idx = zip(*[ self._list_nearby(query, k, probes) for query in queries ])
+        return np.array(vals), np.array(idx)
+
+    def _exact_nearby(self, queries, k, block_size):
+        best_vals = np.full([len(queries), 0], -np.inf, dtype=np.float32)
+        best_rows = np.zeros([len(queries), 0], dtype=np.int64)
+        for start in range(0, self.num_phrases, block_size):
+            sims = np.dot(queries, self.vectors[start:start+block_size].T)
+            vals, cols = _top_k(sims, min(k, sims.shape[1]))
+            # merge with the best so far
+            vals = np.concatenate([best_vals, vals], axis=1)
+            rows = np.concatenate([best_rows, cols + start], axis=1)
+            best_vals, keep = _top_k(vals, min(k, vals.shape[1]))
+            best_rows = rows[np.arange(len(queries))[:, None], keep]
+        return best_vals, self._positions(best_rows)
+
+    def _list_nearby(self, query, k, probes):
+        lists = np.argsort(-np.dot(self.centroids, query))[:probes]
+        rows = np.concatenate([ np.arange(self.offsets[l], self.offsets[l+1]) for l in lists ])
+        # each list is one contiguous block of rows
+        sims = np.concatenate([ np.dot(self.vectors[self.offsets[l]:self.offsets[l+1]], query) for l in lists ])
+        order = np.argsort(-sims)[:k]
+        vals = np.full(k, -np.inf, dtype=np.float32)
+        positions = np.full(k, -1, dtype=np.int64)
+        vals[:len(order)] = sims[order]
+        positions[:len(order)] = self._positions(rows[order])
+        return vals, positions
+
+    def _positions(self, rows):
+        return rows if self.ids is None else np.asarray(self.ids[rows])
+
+def check_nearby(model, paths, targets, prefix, num_queries=5, k=10, seed=0):
+    """Compare the exact neighbours from the index at `prefix` (built from `paths` and `targets` with `model`)
+    with validation_phrase_nearby's, with a sample of the corpus's own paths as queries
+
+    validation_phrase_nearby takes the whole corpus as its similarity set in one batch, so keep it small.
+    Returns the fraction of top k positions that agree and the biggest difference between their similarities,
+    ties in similarity can swap positions."""
+    index = PhraseIndex(prefix)
+    sim_phrases, sim_lengths = sequences_to_tensor(paths, model.max_num_steps)
+    sim_targets = np.asarray(targets, dtype=np.int32)
+    rng = np.random.RandomState(seed)
+    queries = rng.choice(len(paths), min(num_queries, len(paths)), replace=False)
+    vals, idx = index.nearby(index.query_vectors(model, [ paths[q] for q in queries ], sim_targets[queries]), k=k)
+    agree, max_diff = [], 0.
+    for q, q_vals, q_idx in zip(queries, vals, idx):
+        graph_vals, graph_idx = model.validation_phrase_nearby(sim_phrases[q], sim_lengths[q], sim_targets[q:q+1],
+                                                               sim_phrases, sim_lengths, sim_targets)
+        agree.append(np.mean(q_idx == graph_idx[:k]))
+        max_diff = max(max_diff, np.abs(q_vals - graph_vals[:k]).max())
+    return np.mean(agree), max_diff
+
+@click.command()
+@click.option('-i', '--index_prefix', required=True, help="Index to query (built with build_index)")
+@click.option('--lists', default=None, type=int, help="Build this many lists for approximate queries first")
+@click.option('--probes', default=8, help="Lists each approximate query scans")
+@click.option('-k', default=10, help="Nearest phrases per query")
+@click.option('--num_queries', default=100, help="Queries to time, drawn from the index itself")
+def main(index_prefix, lists, probes, k, num_queries):
+    if lists is not None:
+        start = time()
+        build_lists(index_prefix, num_lists=lists)
+        print("Built %i lists in %0.1f sec" % (lists, time() - start))
+    index = PhraseIndex(index_prefix)
+    rng = np.random.RandomState(0)
+    queries = np.asarray(index.vectors[np.sort(rng.choice(len(index), num_queries, replace=False))])
+    start = time()
+    exact_vals, exact_idx = index.nearby(queries, k=k)
+    exact_time = time() - start
+    print("%i phrases, exact: %0.1f ms/query" % (len(index), 1000. * exact_time / num_queries))
+    if index.num_lists:
+        start = time()
+        vals, idx = index.nearby(queries, k=k, probes=probes)
+        list_time = time() - start
+        recall = np.mean([ len(set(a) & set(e)) / float(k) for a, e in zip(idx, exact_idx) ])
+        print("%i lists, %i probes: %0.2f ms/query, recall@%i %0.3f"
+              % (index.num_lists, probes, 1000. * list_time / num_queries, k, recall))
+
+if __name__ == '__main__':
+    main()
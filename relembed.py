@@ -5,6 +5,11 @@ from __future__ import print_function
 import numpy as np
 import tensorflow as tf
 
+from dynamic_rnn import (RNN_MODES, step_inputs, rnn_final_state, bidirectional_final_states, full_length,
+                         bidirectional_last_output, bidirectional_outputs_final_state)
+from summary_cadence import config_cadence
+from triple_product import CLASSIFIERS, triple_product_head, batch_triple_inner
+
 # class Config(object):
 #     """ A configuration object for the RelEmbed model
 
@@ -25,23 +30,6 @@ import tensorflow as tf
                  
 
 #                  ):
-def batch_triple_inner(W, x, y, z):
-    """ Computes the inner product of 3 vectors and a tensor
-
-    Args:
-        W: a 3D tensor with shape[x_len, y_len, z_len]
-        x: a 2D tensor with shape[batch_size, x_len]
-        y: a 2D tensor with shape[batch_size, y_len]
-        y: a 2D tensor with shape[batch_size, z_len]
-
-    NOTE: Literally as naive as is possible"""
-    val = tf.zeros(tf.pack([tf.shape(x)[0], 1])) # get zeros to work with unknown size
-    for i in xrange(x.get_shape()[1]):
-        for j in xrange(y.get_shape()[1]):
-            for k in xrange(z.get_shape()[1]):
-                val += W[i,j,k]*x[:,i]*y[:,j]*z[:,k]
-    return val
-
 class RelEmbed(object):
     """ Encapsulation of the dependency RNN lang model
     
@@ -79,6 +67,17 @@ class RelEmbed(object):
     def __init__(self, config):
         self.config = config
         self.max_num_steps = config['max_num_steps']
+        # 'unrolled' builds the RNN for every one of max_num_steps, 'dynamic' loops to the longest path in the batch
+        self.rnn_mode = config.get('rnn_mode', 'unrolled')
+        assert self.rnn_mode in RNN_MODES, "rnn_mode must be one of %r" % (RNN_MODES,)
+        # use the RNN state at each path's own end, not the output at the last of max_num_steps (zeros for shorter paths)
+        self.path_end_state = config.get('path_end_state', False)
+        # unrolled lengths to build the unsupervised graph for, a batch runs the one its padding matches
+        # (see DataHandler.bucket_batches).  The full max_num_steps graph is always the last bucket
+        self.buckets = sorted(set([ b for b in config.get('buckets', None) or [] if b < self.max_num_steps ] 
+                                  + [self.max_num_steps]))
+        if self.rnn_mode == 'dynamic': # the loop already stops at the batch's longest path
+            self.buckets = [self.max_num_steps]
         self.word_embed_size = config['word_embed_size']
         self.dep_embed_size = config['dep_embed_size']
         self.pos_embed_size = config['pos_embed_size']
@@ -90,6 +89,10 @@ class RelEmbed(object):
         if np.any(self.pretrained_word_embeddings):
             assert self.word_embed_size == self.pretrained_word_embeddings.shape[1]
         self.num_classes = config['num_predict_classes']
+        # 'softmax' over the state and targets, or 'triple' for a tensor triple product of them (see triple_product)
+        self.classifier = config.get('classifier', 'softmax')
+        assert self.classifier in CLASSIFIERS, "classifier must be one of %r" % (CLASSIFIERS,)
+        self.triple_rank = config.get('triple_rank', None) # None for a full tensor per class
         self.max_grad_norm = config['max_grad_norm']
         
         self.vocab_size = config['vocab_size']
@@ -98,6 +101,9 @@ class RelEmbed(object):
         self.name = config['model_name']
         self.checkpoint_prefix = config['checkpoint_prefix'] + self.name
         self.summary_prefix = config['summary_prefix'] + self.name
+        # which training steps also fetch summaries, see summary_cadence
+        self._unsup_cadence = config_cadence(config)
+        self._class_cadence = config_cadence(config)
         
         self.initializer = tf.random_uniform_initializer(-.1, .1)
         self.word_initializer = tf.truncated_normal_initializer(mean=0.0, stddev=1./(self.word_embed_size))
@@ -134,12 +140,15 @@ class RelEmbed(object):
         # input tensor of zero padded indices to get to max_num_steps
         # None allows for variable batch sizes
         with tf.name_scope("Inputs"):
-            self._input_phrases = tf.placeholder(tf.int32, [None, self.max_num_steps, 3]) # [batch_size, w_{1:N}, 2]
+            # the time dimension is left open so a batch can be padded to its bucket instead of max_num_steps
+            self._input_phrases = tf.placeholder(tf.int32, [None, None, 3]) # [batch_size, w_{1:N}, 2]
             self._input_targets = tf.placeholder(tf.int32, [None, 2]) # [batch_size, w_x]
             self._input_labels = tf.placeholder(tf.int32, [None, 1]) # [batch_size, from true data?] \in {0,1}
             self._input_lengths = tf.placeholder(tf.int32, [None, 1]) # [batch_size, N] (len of each sequence)
             batch_size = tf.shape(self._input_lengths)[0]
             self._keep_prob = tf.placeholder(tf.float32)
+            # which of self.buckets to run, feed it with a batch padded to a shorter bucket
+            self._bucket = tf.constant(len(self.buckets) - 1, name="bucket")
         
         with tf.name_scope("Embeddings"):
             if np.any(self.pretrained_word_embeddings):
@@ -218,35 +227,20 @@ class RelEmbed(object):
             # TODO: Make it multilevel
 #             self._initial_state = self.cell.zero_state(batch_size, tf.float32)
 #             print(self._initial_state.get_shape())
-            input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, input_embeds)]
-            input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, dep_embeds)]
-            input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, pos_embeds)]
-            inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
-                       for (input_word, input_dep, input_pos_) in zip(input_words, input_deps, input_pos)]
-
-            # inputs = input_words # just use words
-
             # start off with a basic configuration
             if self.bidirectional:
                 self.fwcell = tf.nn.rnn_cell.GRUCell(self.hidden_size/2, 
                                                 input_size=self.input_size)
                 self.bwcell = tf.nn.rnn_cell.GRUCell(self.hidden_size/2, 
                                                 input_size=self.input_size)
-                outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, inputs, 
-                                        sequence_length=tf.to_int64(tf.squeeze(self._input_lengths, [1])),
-                                        dtype=tf.float32)
-                # splice out the final forward and backward hidden states since apparently the documentation lies
-                # fw_state = tf.split(1, 2, outs[-1])[0]
-                # bw_state = tf.split(1, 2, outs[0])[1]
-                # state = tf.concat(1, [fw_state, bw_state])
-                state = outs[-1]
             else:
                 self.cell = tf.nn.rnn_cell.GRUCell(self.hidden_size, 
                                                 input_size=self.input_size)
-                _, state = tf.nn.rnn(self.cell, inputs, 
-                                     sequence_length=tf.squeeze(self._input_lengths, [1]),
-                                     dtype=tf.float32)
-#                                  initial_state=self._initial_state)
+            if self.rnn_mode == 'dynamic':
+                state = self._dynamic_rnn(step_inputs(input_embeds, dep_embeds, pos_embeds), 
+                                          tf.squeeze(self._input_lengths, [1]))
+            else:
+                state = self._bucketed_rnn(input_embeds, dep_embeds, pos_embeds)
             self._final_state = tf.nn.dropout(tf.nn.l2_normalize(state, 1), keep_prob= self._keep_prob)
             # self._final_state = tf.nn.dropout(state, keep_prob=self._keep_prob)
 
@@ -297,6 +291,66 @@ class RelEmbed(object):
             self._penalty_summary = tf.merge_summary([logit_mag, l2, xent, target_embed_mag, state_mag])
             self._train_cost_summary = tf.merge_summary([tf.scalar_summary("Train_NEG_Loss", self._loss)])
             self._valid_cost_summary = tf.merge_summary([tf.scalar_summary("Validation_NEG_Loss", self._loss)])
+
+    def _bucketed_rnn(self, input_embeds, dep_embeds, pos_embeds, bucket=0):
+        """Final state of the RNN unrolled to the bucket self._bucket picks
+
+        Every bucket's RNN is in the graph, sharing the same cell variables, but they sit in the branches
+        of a tf.cond so only the one picked runs, forwards and backwards.  Everything after the final state,
+        the loss, optimizer and summaries, is built once for all of them.
+        """
+        with tf.variable_scope(tf.get_variable_scope(), reuse=True if bucket else None):
+            if bucket == len(self.buckets) - 1:
+                return self._unrolled_rnn(self.buckets[bucket], input_embeds, dep_embeds, pos_embeds)
+            return tf.cond(tf.equal(self._bucket, bucket),
+                           lambda: self._unrolled_rnn(self.buckets[bucket], input_embeds, dep_embeds, pos_embeds),
+                           lambda: self._bucketed_rnn(input_embeds, dep_embeds, pos_embeds, bucket + 1))
+
+    def _unrolled_rnn(self, num_steps, input_embeds, dep_embeds, pos_embeds):
+        """Final state of the RNN unrolled over the first `num_steps` of the embedded inputs"""
+        input_words = [ tf.squeeze(input_, [1, 2]) 
+                        for input_ in tf.split(1, num_steps, tf.slice(input_embeds, [0,0,0,0], [-1, num_steps, -1, -1]))]
+        input_deps = [ tf.squeeze(input_, [1, 2]) 
+                       for input_ in tf.split(1, num_steps, tf.slice(dep_embeds, [0,0,0,0], [-1, num_steps, -1, -1]))]
+        input_pos = [ tf.squeeze(input_, [1, 2]) 
+                      for input_ in tf.split(1, num_steps, tf.slice(pos_embeds, [0,0,0,0], [-1, num_steps, -1, -1]))]
+        inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
+                   for (input_word, input_dep, input_pos_) in zip(input_words, input_deps, input_pos)]
+
+        # inputs = input_words # just use words
+        if self.bidirectional:
+            outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, inputs, 
+                                    sequence_length=tf.to_int64(tf.squeeze(self._input_lengths, [1])),
+                                    dtype=tf.float32)
+            # splice out the final forward and backward hidden states since apparently the documentation lies
+            # fw_state = tf.split(1, 2, outs[-1])[0]
+            # bw_state = tf.split(1, 2, outs[0])[1]
+            # state = tf.concat(1, [fw_state, bw_state])
+            state = outs[-1]
+            if self.path_end_state: # outs[-1] is zeros for a path shorter than the unrolled steps
+                state = bidirectional_outputs_final_state(outs, tf.squeeze(self._input_lengths, [1]))
+        else:
+            _, state = tf.nn.rnn(self.cell, inputs, 
+                                 sequence_length=tf.squeeze(self._input_lengths, [1]),
+                                 dtype=tf.float32)
+#                                  initial_state=self._initial_state)
+        return state
+
+    def _dynamic_rnn(self, inputs, lengths, spliced=False):
+        """Final state of the RNN looped over [batch, time, input] `inputs` only as far as the longest of `lengths`
+
+        Bidirectional, it's what the unrolled graph takes from the outputs: the last output, or with `spliced`
+        the forward half of the last output and the backward half of the first.  With path_end_state it's the
+        forward and backward states at each path's ends.
+        """
+        if self.bidirectional:
+            if self.path_end_state:
+                return tf.concat(1, bidirectional_final_states(self.fwcell, self.bwcell, inputs, lengths))
+            if not spliced:
+                return bidirectional_last_output(self.fwcell, self.bwcell, inputs, lengths, self.max_num_steps)
+            fw_state, bw_state = bidirectional_final_states(self.fwcell, self.bwcell, inputs, lengths)
+            return tf.concat(1, [fw_state * full_length(lengths, self.max_num_steps), bw_state])
+        return rnn_final_state(self.cell, inputs, lengths)
         
     def _build_classification_graph(self):
         with tf.name_scope("Classifier"):
@@ -320,11 +374,19 @@ class RelEmbed(object):
             # self._predictions = tf.argmax(class_logits, 1, name="predict")
             # self._predict_probs = tf.nn.softmax(class_logits, name="predict_probabilities")
 
-            ### just softmax
-            self.score_w = tf.get_variable("score_w", [self._softmax_input.get_shape()[1], self.num_classes])
             self.score_bias = tf.Variable(tf.zeros([self.num_classes], dtype=tf.float32), name="score_bias")
-
-            scores = tf.matmul(self._softmax_input, self.score_w) + self.score_bias
+            if self.classifier == 'triple':
+                ### TENSOR TRIPLE PRODUCT ###
+                # score(class c) = sum_ijk W_c[i,j,k] h_i x_j y_k
+                left_target, right_target = tf.split(1, 2, self._target_embeds)
+                scores, self._class_weights = triple_product_head(self._final_state, left_target, right_target,
+                                                                  self.num_classes, rank=self.triple_rank)
+                scores += self.score_bias
+            else:
+                ### just softmax
+                self.score_w = tf.get_variable("score_w", [self._softmax_input.get_shape()[1], self.num_classes])
+                self._class_weights = [self.score_w]
+                scores = tf.matmul(self._softmax_input, self.score_w) + self.score_bias
             self._predictions = tf.argmax(scores, 1, name="predict")
             self._predict_probs = tf.nn.softmax(scores, name="predict_probabilities")
 
@@ -422,7 +484,7 @@ class RelEmbed(object):
 
             ### MARGIN RANKING BASED ###
 
-            self._class_l2 = self._class_lambda*(tf.nn.l2_loss(self.score_w)
+            self._class_l2 = self._class_lambda*(tf.add_n([ tf.nn.l2_loss(w) for w in self._class_weights ])
                                                 + tf.nn.l2_loss(self.score_bias))
 
             # self._class_l2 = self._class_lambda*(tf.nn.l2_loss(self._scoring_w)
@@ -538,50 +600,63 @@ class RelEmbed(object):
             # sim_target_embeds = tf.squeeze(tf.concat(2, [sim_left_target_embeds, sim_right_target_embeds]), [1])
         
         with tf.name_scope("RNN"):
-            # compute rep of a query phrase
-            query_phrase = [tf.squeeze(qw, [1]) for qw in tf.split(0, self.max_num_steps, query_phrase_embed)]
-            query_dep = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_dep_embed)]
-            query_pos = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_pos_embed)]
-
-#             print(query_phrase[0].get_shape(), query_dep[0].get_shape())
-            query_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(query_phrase, query_dep, query_pos)]
-
-            # just words
-            # query_input = query_phrase
-            if self.bidirectional:
-                outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, query_input, 
-                                        sequence_length=tf.to_int64(self._query_length),
-                                        dtype=tf.float32)
-                # splice out the final forward and backward hidden states since apparently the documentation lies
-                fw_state = tf.split(1, 2, outs[-1])[0]
-                bw_state = tf.split(1, 2, outs[0])[1]
-                query_phrase_state = tf.concat(1, [fw_state, bw_state])
+            if self.rnn_mode == 'dynamic':
+                query_phrase_state = self._dynamic_rnn(step_inputs(tf.expand_dims(query_phrase_embed, 0),
+                                                                   tf.expand_dims(query_dep_embed, 0),
+                                                                   tf.expand_dims(query_pos_embed, 0)),
+                                                       self._query_length, spliced=True)
+                sim_phrase_states = self._dynamic_rnn(step_inputs(sim_phrase_embed, sim_dep_embed, sim_pos_embed),
+                                                      tf.squeeze(self._sim_lengths, [1]), spliced=True)
             else:
-                _, query_phrase_state = tf.nn.rnn(self.cell, query_input, 
-                                              sequence_length=tf.to_int64(self._query_length), 
-                                              dtype=tf.float32)
-
-            # compute reps of similarity phrases
-            sim_phrases = [tf.squeeze(qw, [1,2]) for qw in tf.split(1, self.max_num_steps, sim_phrase_embed)]
-            sim_deps = [tf.squeeze(qd, [1,2]) for qd in tf.split(1, self.max_num_steps, sim_dep_embed)]
-            sim_pos = [tf.squeeze(qp, [1,2]) for qp in tf.split(1, self.max_num_steps, sim_pos_embed)]
+                # compute rep of a query phrase
+                query_phrase = [tf.squeeze(qw, [1]) for qw in tf.split(0, self.max_num_steps, query_phrase_embed)]
+                query_dep = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_dep_embed)]
+                query_pos = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_pos_embed)]
 
-            sim_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(sim_phrases, sim_deps, sim_pos)]
-
-            #jsut words
-            # sim_input = sim_phrases
-            if self.bidirectional:
-                outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, sim_input, 
-                                        sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])),
-                                        dtype=tf.float32)
-                # splice out the final forward and backward hidden states since apparently the documentation lies
-                fw_state = tf.split(1, 2, outs[-1])[0]
-                bw_state = tf.split(1, 2, outs[0])[1]
-                sim_phrase_states = tf.concat(1, [fw_state, bw_state])
-            else:
-                _, sim_phrase_states = tf.nn.rnn(self.cell, sim_input, 
-                                             sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])), 
-                                             dtype=tf.float32)
+#             print(query_phrase[0].get_shape(), query_dep[0].get_shape())
+                query_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(query_phrase, query_dep, query_pos)]
+
+                # just words
+                # query_input = query_phrase
+                if self.bidirectional:
+                    outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, query_input, 
+                                            sequence_length=tf.to_int64(self._query_length),
+                                            dtype=tf.float32)
+                    # splice out the final forward and backward hidden states since apparently the documentation lies
+                    fw_state = tf.split(1, 2, outs[-1])[0]
+                    bw_state = tf.split(1, 2, outs[0])[1]
+                    query_phrase_state = tf.concat(1, [fw_state, bw_state])
+                    if self.path_end_state: # fw_state is zeros for a path shorter than max_num_steps
+                        query_phrase_state = bidirectional_outputs_final_state(outs, self._query_length)
+                else:
+                    _, query_phrase_state = tf.nn.rnn(self.cell, query_input, 
+                                                  sequence_length=tf.to_int64(self._query_length), 
+                                                  dtype=tf.float32)
+
+                # compute reps of similarity phrases
+                sim_phrases = [tf.squeeze(qw, [1,2]) for qw in tf.split(1, self.max_num_steps, sim_phrase_embed)]
+                sim_deps = [tf.squeeze(qd, [1,2]) for qd in tf.split(1, self.max_num_steps, sim_dep_embed)]
+                sim_pos = [tf.squeeze(qp, [1,2]) for qp in tf.split(1, self.max_num_steps, sim_pos_embed)]
+
+                sim_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(sim_phrases, sim_deps, sim_pos)]
+
+                #jsut words
+                # sim_input = sim_phrases
+                if self.bidirectional:
+                    outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, sim_input, 
+                                            sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])),
+                                            dtype=tf.float32)
+                    # splice out the final forward and backward hidden states since apparently the documentation lies
+                    fw_state = tf.split(1, 2, outs[-1])[0]
+                    bw_state = tf.split(1, 2, outs[0])[1]
+                    sim_phrase_states = tf.concat(1, [fw_state, bw_state])
+                    if self.path_end_state:
+                        sim_phrase_states = bidirectional_outputs_final_state(outs, 
+                                                                              tf.squeeze(self._sim_lengths, [1]))
+                else:
+                    _, sim_phrase_states = tf.nn.rnn(self.cell, sim_input, 
+                                                 sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])), 
+                                                 dtype=tf.float32)
             
         with tf.name_scope("Similarities"):
             with tf.name_scope("Normalize"):
@@ -605,6 +680,7 @@ class RelEmbed(object):
                 sim_phrases = tf.concat(1, [tf.mul(tf.squeeze(sim_left_target_embeds, [1]), sim_phrase_states),
                                              tf.squeeze(sim_right_target_embeds, [1])])
                 sim_phrases = tf.nn.l2_normalize(sim_phrases, 1)
+                self._sim_vectors = sim_phrases # the rows the queries are scored against
 
 
             with tf.name_scope("Calc_distances"):
@@ -633,41 +709,65 @@ class RelEmbed(object):
                   
         Returns average batch perplexity
         """
+        feed = {self._input_phrases:input_phrases,
+                self._input_targets:input_targets,
+                self._class_labels:class_labels,
+                self._input_lengths:input_lengths,
+                self._keep_prob:keep_prob}
+        step = self._class_cadence.step
+        if not self._class_cadence.due():
+            loss, _ = self.session.run([self._class_loss, self._class_train_op], feed)
+            return loss
         loss, _, g_summaries, c_summary, p_summary = self.session.run([self._class_loss, self._class_train_op, 
                                                             self._class_grad_summaries,
                                                             self._train_class_loss_summary,
                                                             self._class_penalty_summary],
-                                                           {self._input_phrases:input_phrases,
-                                                            self._input_targets:input_targets,
-                                                            self._class_labels:class_labels,
-                                                            self._input_lengths:input_lengths,
-                                                            self._keep_prob:keep_prob})
-        self.summary_writer.add_summary(g_summaries)
-        self.summary_writer.add_summary(c_summary)
-        self.summary_writer.add_summary(p_summary)
+                                                           feed)
+        self.summary_writer.add_summary(g_summaries, step)
+        self.summary_writer.add_summary(c_summary, step)
+        self.summary_writer.add_summary(p_summary, step)
         return loss
     
+    def _bucket_for(self, input_phrases):
+        """Index of the bucket a batch padded to input_phrases.shape[1] steps runs in"""
+        for i, num_steps in enumerate(self.buckets):
+            if input_phrases.shape[1] <= num_steps:
+                return i
+        raise ValueError("Batch padded to %i steps, longer than max_num_steps %i" 
+                         % (input_phrases.shape[1], self.max_num_steps))
+
     def partial_unsup_fit(self, input_phrases, input_targets, input_labels, input_lengths, keep_prob=.5):
         """Fit a mini-batch
         
         Expects a batch_x: [self.batch_size, self.max_num_steps]
                   batch_y: the same
                   batch_seq_lens: [self.batch_size]
+        batch_x can also be padded to one of self.buckets, then only that many RNN steps are run
                   
         Returns average batch perplexity
         """
+        bucket = self._bucket_for(input_phrases)
+        if input_phrases.shape[1] < self.buckets[bucket] and self.rnn_mode != 'dynamic': # pad up to the bucket
+            input_phrases = np.pad(input_phrases, [(0, 0), (0, self.buckets[bucket] - input_phrases.shape[1]), (0, 0)],
+                                   mode='constant')
+        feed = {self._input_phrases:input_phrases,
+                self._input_targets:input_targets,
+                self._input_labels:input_labels,
+                self._input_lengths:input_lengths,
+                self._keep_prob:keep_prob,
+                self._bucket:bucket}
+        step = self._unsup_cadence.step
+        if not self._unsup_cadence.due():
+            loss, _ = self.session.run([self._loss, self._train_op], feed)
+            return loss
         loss, _, g_summaries, c_summary, p_summary = self.session.run([self._loss, self._train_op, 
                                                             self._grad_summaries,
                                                             self._train_cost_summary,
                                                             self._penalty_summary],
-                                                           {self._input_phrases:input_phrases,
-                                                            self._input_targets:input_targets,
-                                                            self._input_labels:input_labels,
-                                                            self._input_lengths:input_lengths,
-                                                            self._keep_prob:keep_prob})
-        self.summary_writer.add_summary(g_summaries)
-        self.summary_writer.add_summary(c_summary)
-        self.summary_writer.add_summary(p_summary)
+                                                           feed)
+        self.summary_writer.add_summary(g_summaries, step)
+        self.summary_writer.add_summary(c_summary, step)
+        self.summary_writer.add_summary(p_summary, step)
         return loss
     
     def validation_loss(self, valid_phrases, valid_targets, valid_labels, valid_lengths):
@@ -706,6 +806,15 @@ class RelEmbed(object):
 #         print("Sanity check: %r" % sanity)
         return nearby_vals, nearby_idx
     
+    def embed_similarity_vectors(self, phrases, targets, lengths):
+        """The unit vectors the similarity graph compares phrases by, <x target * state, y target> normalized
+
+        The rows validation_phrase_nearby scores its similarity set with, see phrase_index"""
+        return self.session.run(self._sim_vectors, {self._sim_phrases:phrases,
+                                                    self._sim_targets:targets,
+                                                    self._sim_lengths:lengths,
+                                                    self._keep_prob:1.0})
+    
     def embed_phrases_and_targets(self, phrases, targets, lengths):
         phrase_reps, target_reps = self.session.run([self._final_state, self._target_embeds],
                                                     { self._input_phrases:phrases,
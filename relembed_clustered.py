@@ -5,6 +5,13 @@ from __future__ import print_function
 import numpy as np
 import tensorflow as tf
 
+from dynamic_rnn import (RNN_MODES, step_inputs, rnn_final_state, bidirectional_final_states, full_length,
+                         bidirectional_last_output, bidirectional_outputs_final_state)
+from summary_cadence import config_cadence
+from triple_product import CLASSIFIERS, triple_product_head, batch_triple_inner
+
+CLUSTER_SOFTMAXES = ('full', 'sampled', 'two_level')
+
 # class Config(object):
 #     """ A configuration object for the RelEmbed model
 
@@ -25,23 +32,6 @@ import tensorflow as tf
                  
 
 #                  ):
-def batch_triple_inner(W, x, y, z):
-    """ Computes the inner product of 3 vectors and a tensor
-
-    Args:
-        W: a 3D tensor with shape[x_len, y_len, z_len]
-        x: a 2D tensor with shape[batch_size, x_len]
-        y: a 2D tensor with shape[batch_size, y_len]
-        y: a 2D tensor with shape[batch_size, z_len]
-
-    NOTE: Literally as naive as is possible"""
-    val = tf.zeros(tf.pack([tf.shape(x)[0], 1])) # get zeros to work with unknown size
-    for i in xrange(x.get_shape()[1]):
-        for j in xrange(y.get_shape()[1]):
-            for k in xrange(z.get_shape()[1]):
-                val += W[i,j,k]*x[:,i]*y[:,j]*z[:,k]
-    return val
-
 class RelEmbed(object):
     """ Encapsulation of the dependency RNN lang model
     
@@ -79,10 +69,20 @@ class RelEmbed(object):
     def __init__(self, config):
         self.config = config
         self.max_num_steps = config['max_num_steps']
+        # 'unrolled' builds the RNN for every one of max_num_steps, 'dynamic' loops to the longest path in the batch
+        self.rnn_mode = config.get('rnn_mode', 'unrolled')
+        assert self.rnn_mode in RNN_MODES, "rnn_mode must be one of %r" % (RNN_MODES,)
+        # use the RNN state at each path's own end, not the output at the last of max_num_steps (zeros for shorter paths)
+        self.path_end_state = config.get('path_end_state', False)
         self.word_embed_size = config['word_embed_size']
         self.dep_embed_size = config['dep_embed_size']
         self.pos_embed_size = config['pos_embed_size']
         self.num_clusters = config['num_clusters']
+        # output layer over the num_clusters**2 cluster pairs: the 'full' softmax, a 'sampled' softmax while training
+        # or a 'two_level' softmax of the X cluster then the Y cluster given X
+        self.cluster_softmax = config.get('cluster_softmax', 'full')
+        assert self.cluster_softmax in CLUSTER_SOFTMAXES, "cluster_softmax must be one of %r" % (CLUSTER_SOFTMAXES,)
+        self.num_sampled = config.get('num_sampled', 100) # negative cluster pairs per batch for the sampled softmax
         # self.hidden_layer_size = config['hidden_layer_size']
         self.input_size = self.word_embed_size + self.dep_embed_size + self.pos_embed_size
         self.bidirectional = config['bidirectional']
@@ -92,6 +92,10 @@ class RelEmbed(object):
         if np.any(self.pretrained_word_embeddings):
             assert self.word_embed_size == self.pretrained_word_embeddings.shape[1]
         self.num_classes = config['num_predict_classes']
+        # 'softmax' over the state and targets, or 'triple' for a tensor triple product of them (see triple_product)
+        self.classifier = config.get('classifier', 'softmax')
+        assert self.classifier in CLASSIFIERS, "classifier must be one of %r" % (CLASSIFIERS,)
+        self.triple_rank = config.get('triple_rank', None) # None for a full tensor per class
         self.max_grad_norm = config['max_grad_norm']
 
         self.vocab_size = config['vocab_size']
@@ -100,6 +104,9 @@ class RelEmbed(object):
         self.name = config['model_name']
         self.checkpoint_prefix = config['checkpoint_prefix'] + self.name
         self.summary_prefix = config['summary_prefix'] + self.name
+        # which training steps also fetch summaries, see summary_cadence
+        self._unsup_cadence = config_cadence(config)
+        self._class_cadence = config_cadence(config)
         
         self.initializer = tf.random_uniform_initializer(-1., 1.)
         self.word_initializer = tf.truncated_normal_initializer(mean=0.0, stddev=1./(self.word_embed_size))
@@ -209,36 +216,43 @@ class RelEmbed(object):
             # TODO: Make it multilevel
 #             self._initial_state = self.cell.zero_state(batch_size, tf.float32)
 #             print(self._initial_state.get_shape())
-            input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, input_embeds)]
-            input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, dep_embeds)]
-            input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, pos_embeds)]
-            inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
-                       for (input_word, input_dep, input_pos_) in zip(input_words, input_deps, input_pos)]
-
-            # inputs = input_words # just use words
-
             # start off with a basic configuration
             if self.bidirectional:
                 self.fwcell = tf.nn.rnn_cell.GRUCell(self.hidden_size/2, 
                                                 input_size=self.input_size)
                 self.bwcell = tf.nn.rnn_cell.GRUCell(self.hidden_size/2, 
                                                 input_size=self.input_size)
-                outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, inputs, 
-                                        sequence_length=tf.to_int64(tf.squeeze(self._input_lengths, [1])),
-                                        dtype=tf.float32)
-                # splice out the final forward and backward hidden states since apparently the documentation lies
-                # fw_state = tf.split(1, 2, outs[-1])[0]
-                # bw_state = tf.split(1, 2, outs[0])[1]
-                # state = tf.concat(1, [fw_state, bw_state])
-                state = outs[-1]
             else:
                 self.cell = tf.nn.rnn_cell.BasicLSTMCell(self.hidden_size, 
                                                 input_size=self.input_size)
                 # self.cell = tf.nn.rnn_cell.GRUCell(self.hidden_size, 
                 #                                 input_size=self.input_size)
-                _, state = tf.nn.rnn(self.cell, inputs, 
-                                     sequence_length=tf.squeeze(self._input_lengths, [1]),
-                                     dtype=tf.float32)
+            if self.rnn_mode == 'dynamic':
+                state = self._dynamic_rnn(step_inputs(input_embeds, dep_embeds, pos_embeds),
+                                          tf.squeeze(self._input_lengths, [1]))
+            else:
+                input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, input_embeds)]
+                input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, dep_embeds)]
+                input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, pos_embeds)]
+                inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
+                           for (input_word, input_dep, input_pos_) in zip(input_words, input_deps, input_pos)]
+
+                # inputs = input_words # just use words
+                if self.bidirectional:
+                    outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, inputs, 
+                                            sequence_length=tf.to_int64(tf.squeeze(self._input_lengths, [1])),
+                                            dtype=tf.float32)
+                    # splice out the final forward and backward hidden states since apparently the documentation lies
+                    # fw_state = tf.split(1, 2, outs[-1])[0]
+                    # bw_state = tf.split(1, 2, outs[0])[1]
+                    # state = tf.concat(1, [fw_state, bw_state])
+                    state = outs[-1]
+                    if self.path_end_state: # outs[-1] is zeros for a path shorter than the unrolled steps
+                        state = bidirectional_outputs_final_state(outs, tf.squeeze(self._input_lengths, [1]))
+                else:
+                    _, state = tf.nn.rnn(self.cell, inputs, 
+                                         sequence_length=tf.squeeze(self._input_lengths, [1]),
+                                         dtype=tf.float32)
 #                                  initial_state=self._initial_state)
             # self._final_state = tf.nn.dropout(tf.nn.l2_normalize(state, 1), keep_prob= self._keep_prob)
             self._final_state = tf.nn.dropout(state, keep_prob=self._keep_prob)
@@ -274,22 +288,14 @@ class RelEmbed(object):
             # self._xent = tf.reduce_mean(tf.nn.sparse_softmax_cross_entropy_with_logits(logits, 
             #                                      tf.to_int64(tf.squeeze(self._input_labels, [1]))))
 
-            ## just softmax ###
-            self._clusters_w =  tf.get_variable("clusters_w", [self._cluster_input.get_shape()[1], self.num_clusters**2])
-            self._clusters_b = tf.Variable(tf.zeros([self.num_clusters**2], dtype=tf.float32), name="clusters_b")   
-
-            logits = tf.matmul(self._cluster_input, self._clusters_w) + self._clusters_b
-
-            self._xent = tf.reduce_mean(tf.nn.sparse_softmax_cross_entropy_with_logits(logits, 
-                                                 tf.to_int64(tf.squeeze(self._input_labels, [1]))))        
+            train_xent, self._xent, logits = self._cluster_pair_xent()
             
             self._l2_penalty = self._lambda*(#tf.nn.l2_loss(self._gate_matrix)
                                           # + tf.nn.l2_loss(self._gate_bias)
                                            #+ tf.nn.l2_loss(self._cand_matrix)
                                            #+ tf.nn.l2_loss(self._cand_bias)
                                            #+ 
-                                           tf.nn.l2_loss(self._clusters_w)
-                                           + tf.nn.l2_loss(self._clusters_b))
+                                           tf.add_n([ tf.nn.l2_loss(w) for w in self._cluster_weights ]))
                                            # + tf.nn.l2_loss(self._c_hidden_w)
                                            # + tf.nn.l2_loss(self._c_hidden_b))
                                            
@@ -302,6 +308,8 @@ class RelEmbed(object):
             #                                                         tf.to_float(self._input_labels)),
             #                            name="neg_sample_loss")
             self._loss = self._xent + self._l2_penalty 
+            # what training minimizes, the same as _loss unless the softmax is sampled
+            self._train_loss = self._loss if train_xent is self._xent else train_xent + self._l2_penalty
             
         with tf.name_scope("Summaries"):
             logit_mag = tf.histogram_summary("Logit_magnitudes", logits)
@@ -309,9 +317,79 @@ class RelEmbed(object):
             target_embed_mag = tf.histogram_summary("Target_Embed_L2", tf.nn.l2_loss(self._target_embeds))
             state_mag = tf.histogram_summary("RNN_final_state_L2", tf.nn.l2_loss(self._final_state))
             self._penalty_summary = tf.merge_summary([logit_mag, l2, target_embed_mag, state_mag])
-            self._train_cost_summary = tf.merge_summary([tf.scalar_summary("Train_Loss", self._loss)])
+            self._train_cost_summary = tf.merge_summary([tf.scalar_summary("Train_Loss", self._train_loss)])
             self._valid_cost_summary = tf.merge_summary([tf.scalar_summary("Validation_Loss", self._loss)])
         
+    def _cluster_pair_xent(self):
+        """Average xent of the cluster pair labels to train on, the one to report, and logits to summarize
+
+        'full' has one softmax over all num_clusters**2 pairs.
+        'sampled' trains on a sampled softmax of the true pair against num_sampled others,
+        and reports the full softmax, which is only computed when something fetches _loss.
+        'two_level' factors P(pair) = P(X cluster) * P(Y cluster | X cluster), a label is X*num_clusters + Y,
+        so each example only needs 2*num_clusters logits.  Its xent is exact, training reports the same one.
+        """
+        num_pairs = self.num_clusters**2
+        labels = tf.to_int64(self._input_labels)
+        if self.cluster_softmax == 'two_level':
+            x_labels = tf.squeeze(tf.div(self._input_labels, self.num_clusters), [1])
+            y_labels = tf.squeeze(tf.mod(self._input_labels, self.num_clusters), [1])
+            self._x_clusters_w = tf.get_variable("x_clusters_w", [self._cluster_input.get_shape()[1], self.num_clusters])
+            self._x_clusters_b = tf.Variable(tf.zeros([self.num_clusters], dtype=tf.float32), name="x_clusters_b")
+            # a Y cluster softmax for each X cluster
+            self._y_clusters_w = tf.get_variable("y_clusters_w", [self.num_clusters, self._cluster_input.get_shape()[1],
+                                                                  self.num_clusters])
+            self._y_clusters_b = tf.Variable(tf.zeros([self.num_clusters, self.num_clusters], dtype=tf.float32),
+                                             name="y_clusters_b")
+            self._cluster_weights = [self._x_clusters_w, self._x_clusters_b, self._y_clusters_w, self._y_clusters_b]
+            x_logits = tf.matmul(self._cluster_input, self._x_clusters_w) + self._x_clusters_b
+            y_logits = (tf.squeeze(tf.batch_matmul(tf.expand_dims(self._cluster_input, 1), # [batch x 1 x hidden]
+                                                   tf.gather(self._y_clusters_w, x_labels)), # [batch x hidden x clusters]
+                                   [1])
+                        + tf.gather(self._y_clusters_b, x_labels))
+            xent = tf.reduce_mean(tf.nn.sparse_softmax_cross_entropy_with_logits(x_logits, tf.to_int64(x_labels))
+                                  + tf.nn.sparse_softmax_cross_entropy_with_logits(y_logits, tf.to_int64(y_labels)))
+            return xent, xent, tf.concat(1, [x_logits, y_logits])
+        if self.cluster_softmax == 'sampled':
+            # [pairs x hidden], the layout sampled_softmax_loss wants
+            self._clusters_w = tf.get_variable("clusters_w", [num_pairs, self._cluster_input.get_shape()[1]])
+            self._clusters_b = tf.Variable(tf.zeros([num_pairs], dtype=tf.float32), name="clusters_b")
+            self._cluster_weights = [self._clusters_w, self._clusters_b]
+            train_xent = tf.reduce_mean(tf.nn.sampled_softmax_loss(self._clusters_w, self._clusters_b, 
+                                                                   self._cluster_input, labels,
+                                                                   min(self.num_sampled, num_pairs - 1), num_pairs))
+            logits = tf.matmul(self._cluster_input, self._clusters_w, transpose_b=True) + self._clusters_b
+            xent = tf.reduce_mean(tf.nn.sparse_softmax_cross_entropy_with_logits(logits, tf.squeeze(labels, [1])))
+            # only the true pairs' logits, so the summaries don't need the full softmax either
+            true_logits = (tf.reduce_sum(self._cluster_input * tf.gather(self._clusters_w, tf.squeeze(labels, [1])), 1)
+                           + tf.gather(self._clusters_b, tf.squeeze(labels, [1])))
+            return train_xent, xent, true_logits
+        ## just softmax ###
+        self._clusters_w =  tf.get_variable("clusters_w", [self._cluster_input.get_shape()[1], num_pairs])
+        self._clusters_b = tf.Variable(tf.zeros([num_pairs], dtype=tf.float32), name="clusters_b")   
+        self._cluster_weights = [self._clusters_w, self._clusters_b]
+
+        logits = tf.matmul(self._cluster_input, self._clusters_w) + self._clusters_b
+
+        xent = tf.reduce_mean(tf.nn.sparse_softmax_cross_entropy_with_logits(logits, tf.squeeze(labels, [1])))
+        return xent, xent, logits
+
+    def _dynamic_rnn(self, inputs, lengths, spliced=False):
+        """Final state of the RNN looped over [batch, time, input] `inputs` only as far as the longest of `lengths`
+
+        Bidirectional, it's what the unrolled graph takes from the outputs: the last output, or with `spliced`
+        the forward half of the last output and the backward half of the first.  With path_end_state it's the
+        forward and backward states at each path's ends.
+        """
+        if self.bidirectional:
+            if self.path_end_state:
+                return tf.concat(1, bidirectional_final_states(self.fwcell, self.bwcell, inputs, lengths))
+            if not spliced:
+                return bidirectional_last_output(self.fwcell, self.bwcell, inputs, lengths, self.max_num_steps)
+            fw_state, bw_state = bidirectional_final_states(self.fwcell, self.bwcell, inputs, lengths)
+            return tf.concat(1, [fw_state * full_length(lengths, self.max_num_steps), bw_state])
+        return rnn_final_state(self.cell, inputs, lengths)
+
     def _build_classification_graph(self):
         with tf.name_scope("Classifier"):
             self._class_lambda = tf.Variable(10e-3, trainable=False, name="Class_L2_Lambda")
@@ -319,10 +397,17 @@ class RelEmbed(object):
             # self._softmax_input = self._final_state
             ### REGULAR SOFTMAX ###
             ### just softmax
-            self._score_w = tf.get_variable("score_w", [self._softmax_input.get_shape()[1], self.num_classes])
             self._score_bias = tf.Variable(tf.zeros([self.num_classes], dtype=tf.float32), name="score_bias")
-
-            scores = tf.matmul(self._softmax_input, self._score_w) + self._score_bias
+            if self.classifier == 'triple':
+                # score(class c) = sum_ijk W_c[i,j,k] h_i x_j y_k
+                left_target, right_target = tf.split(1, 2, self._target_embeds)
+                scores, self._class_weights = triple_product_head(self._final_state, left_target, right_target,
+                                                                  self.num_classes, rank=self.triple_rank)
+                scores += self._score_bias
+            else:
+                self._score_w = tf.get_variable("score_w", [self._softmax_input.get_shape()[1], self.num_classes])
+                self._class_weights = [self._score_w]
+                scores = tf.matmul(self._softmax_input, self._score_w) + self._score_bias
             self._predictions = tf.argmax(scores, 1, name="predict")
             self._predict_probs = tf.nn.softmax(scores, name="predict_probabilities")
 
@@ -436,7 +521,7 @@ class RelEmbed(object):
 
             ### MARGIN RANKING BASED ###
 
-            self._class_l2 = self._class_lambda*(tf.nn.l2_loss(self._score_w)
+            self._class_l2 = self._class_lambda*(tf.add_n([ tf.nn.l2_loss(w) for w in self._class_weights ])
                                                 + tf.nn.l2_loss(self._score_bias))
 
             # self._class_l2 += self._lambda*(tf.nn.l2_loss(self._gate_matrix)
@@ -474,7 +559,7 @@ class RelEmbed(object):
             self._optimizer = tf.train.AdamOptimizer(.001)
             
             # clip and apply gradients
-            grads_and_vars = self._optimizer.compute_gradients(self._loss)
+            grads_and_vars = self._optimizer.compute_gradients(self._train_loss)
 #             for gv in grads_and_vars:
 #                 print(gv, gv[1] is self._cost)
             clipped_grads_and_vars = [(tf.clip_by_norm(gv[0], self.max_grad_norm), gv[1]) 
@@ -559,50 +644,63 @@ class RelEmbed(object):
             sim_target_embeds = tf.squeeze(tf.concat(2, [sim_left_target_embeds, sim_right_target_embeds]), [1])
         
         with tf.name_scope("RNN"):
-            # compute rep of a query phrase
-            query_phrase = [tf.squeeze(qw, [1]) for qw in tf.split(0, self.max_num_steps, query_phrase_embed)]
-            query_dep = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_dep_embed)]
-            query_pos = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_pos_embed)]
-
-#             print(query_phrase[0].get_shape(), query_dep[0].get_shape())
-            query_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(query_phrase, query_dep, query_pos)]
-
-            # just words
-            # query_input = query_phrase
-            if self.bidirectional:
-                outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, query_input, 
-                                        sequence_length=tf.to_int64(self._query_length),
-                                        dtype=tf.float32)
-                # splice out the final forward and backward hidden states since apparently the documentation lies
-                fw_state = tf.split(1, 2, outs[-1])[0]
-                bw_state = tf.split(1, 2, outs[0])[1]
-                query_phrase_state = tf.concat(1, [fw_state, bw_state])
+            if self.rnn_mode == 'dynamic':
+                query_phrase_state = self._dynamic_rnn(step_inputs(tf.expand_dims(query_phrase_embed, 0),
+                                                                   tf.expand_dims(query_dep_embed, 0),
+                                                                   tf.expand_dims(query_pos_embed, 0)),
+                                                       self._query_length, spliced=True)
+                sim_phrase_states = self._dynamic_rnn(step_inputs(sim_phrase_embed, sim_dep_embed, sim_pos_embed),
+                                                      tf.squeeze(self._sim_lengths, [1]), spliced=True)
             else:
-                _, query_phrase_state = tf.nn.rnn(self.cell, query_input, 
-                                              sequence_length=tf.to_int64(self._query_length), 
-                                              dtype=tf.float32)
-
-            # compute reps of similarity phrases
-            sim_phrases = [tf.squeeze(qw, [1,2]) for qw in tf.split(1, self.max_num_steps, sim_phrase_embed)]
-            sim_deps = [tf.squeeze(qd, [1,2]) for qd in tf.split(1, self.max_num_steps, sim_dep_embed)]
-            sim_pos = [tf.squeeze(qp, [1,2]) for qp in tf.split(1, self.max_num_steps, sim_pos_embed)]
+                # compute rep of a query phrase
+                query_phrase = [tf.squeeze(qw, [1]) for qw in tf.split(0, self.max_num_steps, query_phrase_embed)]
+                query_dep = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_dep_embed)]
+                query_pos = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_pos_embed)]
 
-            sim_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(sim_phrases, sim_deps, sim_pos)]
-
-            #jsut words
-            # sim_input = sim_phrases
-            if self.bidirectional:
-                outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, sim_input, 
-                                        sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])),
-                                        dtype=tf.float32)
-                # splice out the final forward and backward hidden states since apparently the documentation lies
-                fw_state = tf.split(1, 2, outs[-1])[0]
-                bw_state = tf.split(1, 2, outs[0])[1]
-                sim_phrase_states = tf.concat(1, [fw_state, bw_state])
-            else:
-                _, sim_phrase_states = tf.nn.rnn(self.cell, sim_input, 
-                                             sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])), 
-                                             dtype=tf.float32)
+#             print(query_phrase[0].get_shape(), query_dep[0].get_shape())
+                query_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(query_phrase, query_dep, query_pos)]
+
+                # just words
+                # query_input = query_phrase
+                if self.bidirectional:
+                    outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, query_input, 
+                                            sequence_length=tf.to_int64(self._query_length),
+                                            dtype=tf.float32)
+                    # splice out the final forward and backward hidden states since apparently the documentation lies
+                    fw_state = tf.split(1, 2, outs[-1])[0]
+                    bw_state = tf.split(1, 2, outs[0])[1]
+                    query_phrase_state = tf.concat(1, [fw_state, bw_state])
+                    if self.path_end_state: # fw_state is zeros for a path shorter than max_num_steps
+                        query_phrase_state = bidirectional_outputs_final_state(outs, self._query_length)
+                else:
+                    _, query_phrase_state = tf.nn.rnn(self.cell, query_input, 
+                                                  sequence_length=tf.to_int64(self._query_length), 
+                                                  dtype=tf.float32)
+
+                # compute reps of similarity phrases
+                sim_phrases = [tf.squeeze(qw, [1,2]) for qw in tf.split(1, self.max_num_steps, sim_phrase_embed)]
+                sim_deps = [tf.squeeze(qd, [1,2]) for qd in tf.split(1, self.max_num_steps, sim_dep_embed)]
+                sim_pos = [tf.squeeze(qp, [1,2]) for qp in tf.split(1, self.max_num_steps, sim_pos_embed)]
+
+                sim_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(sim_phrases, sim_deps, sim_pos)]
+
+                #jsut words
+                # sim_input = sim_phrases
+                if self.bidirectional:
+                    outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, sim_input, 
+                                            sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])),
+                                            dtype=tf.float32)
+                    # splice out the final forward and backward hidden states since apparently the documentation lies
+                    fw_state = tf.split(1, 2, outs[-1])[0]
+                    bw_state = tf.split(1, 2, outs[0])[1]
+                    sim_phrase_states = tf.concat(1, [fw_state, bw_state])
+                    if self.path_end_state:
+                        sim_phrase_states = bidirectional_outputs_final_state(outs, 
+                                                                              tf.squeeze(self._sim_lengths, [1]))
+                else:
+                    _, sim_phrase_states = tf.nn.rnn(self.cell, sim_input, 
+                                                 sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])), 
+                                                 dtype=tf.float32)
             
         with tf.name_scope("Similarities"):
             with tf.name_scope("Normalize"):
@@ -612,6 +710,7 @@ class RelEmbed(object):
 #                 query_word = tf.nn.l2_normalize(query_word_embed, 1)
                 # sim_phrases = tf.nn.l2_normalize(tf.concat(1, [sim_phrase_states, sim_target_embeds]), 1)
                 sim_phrases = tf.nn.l2_normalize(sim_phrase_states, 1)
+                self._sim_vectors = sim_phrases # the rows the queries are scored against
 #                 sim_word = tf.nn.l2_normalize(sim_word_embed, 1)                
 
             with tf.name_scope("Calc_distances"):
@@ -640,18 +739,23 @@ class RelEmbed(object):
                   
         Returns average batch perplexity
         """
+        feed = {self._input_phrases:input_phrases,
+                self._input_targets:input_targets,
+                self._class_labels:class_labels,
+                self._input_lengths:input_lengths,
+                self._keep_prob:keep_prob}
+        step = self._class_cadence.step
+        if not self._class_cadence.due():
+            loss, _ = self.session.run([self._class_loss, self._class_train_op], feed)
+            return loss
         loss, _, g_summaries, c_summary, p_summary = self.session.run([self._class_loss, self._class_train_op, 
                                                             self._class_grad_summaries,
                                                             self._train_class_loss_summary,
                                                             self._class_penalty_summary],
-                                                           {self._input_phrases:input_phrases,
-                                                            self._input_targets:input_targets,
-                                                            self._class_labels:class_labels,
-                                                            self._input_lengths:input_lengths,
-                                                            self._keep_prob:keep_prob})
-        self.summary_writer.add_summary(g_summaries)
-        self.summary_writer.add_summary(c_summary)
-        self.summary_writer.add_summary(p_summary)
+                                                           feed)
+        self.summary_writer.add_summary(g_summaries, step)
+        self.summary_writer.add_summary(c_summary, step)
+        self.summary_writer.add_summary(p_summary, step)
         return loss
     
     def partial_unsup_fit(self, input_phrases, input_targets, input_labels, input_lengths, keep_prob=.5):
@@ -663,18 +767,23 @@ class RelEmbed(object):
                   
         Returns average batch perplexity
         """
-        loss, _, g_summaries, c_summary, p_summary = self.session.run([self._loss, self._train_op, 
+        feed = {self._input_phrases:input_phrases,
+                self._input_targets:input_targets,
+                self._input_labels:input_labels,
+                self._input_lengths:input_lengths,
+                self._keep_prob:keep_prob}
+        step = self._unsup_cadence.step
+        if not self._unsup_cadence.due():
+            loss, _ = self.session.run([self._train_loss, self._train_op], feed)
+            return loss
+        loss, _, g_summaries, c_summary, p_summary = self.session.run([self._train_loss, self._train_op, 
                                                             self._grad_summaries,
                                                             self._train_cost_summary,
                                                             self._penalty_summary],
-                                                           {self._input_phrases:input_phrases,
-                                                            self._input_targets:input_targets,
-                                                            self._input_labels:input_labels,
-                                                            self._input_lengths:input_lengths,
-                                                            self._keep_prob:keep_prob})
-        self.summary_writer.add_summary(g_summaries)
-        self.summary_writer.add_summary(c_summary)
-        self.summary_writer.add_summary(p_summary)
+                                                           feed)
+        self.summary_writer.add_summary(g_summaries, step)
+        self.summary_writer.add_summary(c_summary, step)
+        self.summary_writer.add_summary(p_summary, step)
         return loss
     
     def validation_loss(self, valid_phrases, valid_targets, valid_labels, valid_lengths):
@@ -713,6 +822,15 @@ class RelEmbed(object):
 #         print("Sanity check: %r" % sanity)
         return nearby_vals, nearby_idx
     
+    def embed_similarity_vectors(self, phrases, targets, lengths):
+        """The unit vectors the similarity graph compares phrases by, the normalized RNN states
+
+        The rows validation_phrase_nearby scores its similarity set with, see phrase_index.
+        The targets aren't part of this model's similarity"""
+        return self.session.run(self._sim_vectors, {self._sim_phrases:phrases,
+                                                    self._sim_lengths:lengths,
+                                                    self._keep_prob:1.0})
+    
     def embed_phrases_and_targets(self, phrases, targets, lengths):
         phrase_reps, target_reps = self.session.run([self._final_state, self._target_embeds],
                                                     { self._input_phrases:phrases,
@@ -800,6 +918,9 @@ class RelEmbed(object):
         del unsup
 
     def random_restart_score_weights(self):
+        if self.classifier == 'triple':
+            self.session.run(tf.initialize_variables(self._class_weights + [self._score_bias]))
+            return
         random_w = np.random.uniform(low=-1., high=1.0, size=(self.hidden_size + 2*self.word_embed_size, self.num_classes))
         zero_bias = np.zeros(self.num_classes)
         self.session.run([self._score_w.assign(random_w),
@@ -5,22 +5,9 @@ from __future__ import print_function
 import numpy as np
 import tensorflow as tf
 
-def batch_triple_inner(W, x, y, z):
-    """ Computes the inner product of 3 vectors and a tensor
-
-    Args:
-        W: a 3D tensor with shape[x_len, y_len, z_len]
-        x: a 2D tensor with shape[batch_size, x_len]
-        y: a 2D tensor with shape[batch_size, y_len]
-        y: a 2D tensor with shape[batch_size, z_len]
-
-    NOTE: Literally as naive as is possible"""
-    val = tf.zeros(tf.pack([tf.shape(x)[0], 1])) # get zeros to work with unknown size
-    for i in xrange(x.get_shape()[1]):
-        for j in xrange(y.get_shape()[1]):
-            for k in xrange(z.get_shape()[1]):
-                val += W[i,j,k]*x[:,i]*y[:,j]*z[:,k]
-    return val
+from dynamic_rnn import RNN_MODES, step_inputs, rnn_final_state, full_length
+from summary_cadence import config_cadence
+from triple_product import CLASSIFIERS, triple_product_head, batch_triple_inner
 
 class RelEmbed(object):
     """ Encapsulation of the dependency RNN lang model
@@ -59,6 +46,11 @@ class RelEmbed(object):
     def __init__(self, config):
         self.config = config
         self.max_num_steps = config['max_num_steps']
+        # 'unrolled' builds the RNN for every one of max_num_steps, 'dynamic' loops to the longest path in the batch
+        self.rnn_mode = config.get('rnn_mode', 'unrolled')
+        assert self.rnn_mode in RNN_MODES, "rnn_mode must be one of %r" % (RNN_MODES,)
+        # use the RNN state at each path's own end, not the output at the last of max_num_steps (zeros for shorter paths)
+        self.path_end_state = config.get('path_end_state', False)
         self.word_embed_size = config['word_embed_size']
         self.dep_embed_size = config['dep_embed_size']
         self.pos_embed_size = config['pos_embed_size']
@@ -71,6 +63,10 @@ class RelEmbed(object):
         if np.any(self.pretrained_word_embeddings):
             assert self.word_embed_size == self.pretrained_word_embeddings.shape[1]
         self.num_classes = config['num_predict_classes']
+        # 'softmax' over the states and targets, or 'triple' for a tensor triple product of them (see triple_product)
+        self.classifier = config.get('classifier', 'softmax')
+        assert self.classifier in CLASSIFIERS, "classifier must be one of %r" % (CLASSIFIERS,)
+        self.triple_rank = config.get('triple_rank', None) # None for a full tensor per class
         self.max_grad_norm = config['max_grad_norm']
 
         self.predict_style = 'END' # could be 'ALL' or 'AVG' also
@@ -81,6 +77,9 @@ class RelEmbed(object):
         self.name = config['model_name']
         self.checkpoint_prefix = config['checkpoint_prefix'] + self.name
         self.summary_prefix = config['summary_prefix'] + self.name
+        # which training steps also fetch summaries, see summary_cadence
+        self._unsup_cadence = config_cadence(config)
+        self._class_cadence = config_cadence(config)
         
         self.initializer = tf.random_uniform_initializer(-.1, .1)
         self.word_initializer = tf.truncated_normal_initializer(mean=0.0, stddev=1./(self.word_embed_size))
@@ -197,11 +196,7 @@ class RelEmbed(object):
             # TODO: Make it multilevel
 #             self._initial_state = self.cell.zero_state(batch_size, tf.float32)
 #             print(self._initial_state.get_shape())
-            input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, input_embeds)]
-            input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, dep_embeds)]
-            input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, pos_embeds)]
-            inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
-                       for (input_word, input_dep, input_pos_) in zip(input_words, input_deps, input_pos)]
+            inputs = self._rnn_inputs(input_embeds, dep_embeds, pos_embeds)
 
             # inputs = input_words # just use words
             # start off with a basic configuration
@@ -212,13 +207,9 @@ class RelEmbed(object):
                                                 input_size=self.input_size)
                 with tf.variable_scope("FW") as scope:
                     # predicting y if going forward
-                    y_outs, y_state = tf.nn.rnn(self.fwcell, inputs, 
-                                         sequence_length=tf.squeeze(self._input_lengths, [1]),
-                                         dtype=tf.float32, scope=scope)
+                    y_outs, y_state = self._rnn(self.fwcell, inputs, tf.squeeze(self._input_lengths, [1]), scope)
                 with tf.variable_scope("BW") as scope:
-                    x_outs, x_state = tf.nn.rnn(self.bwcell, inputs, 
-                                     sequence_length=tf.squeeze(self._input_lengths, [1]),
-                                     dtype=tf.float32, scope=scope)
+                    x_outs, x_state = self._rnn(self.bwcell, inputs, tf.squeeze(self._input_lengths, [1]), scope)
                 # print(len(x_outs), self.max_num_steps)
                 # final out only
                 #TODO: Make sure squeeez isn't fucking it up (pretty sure it's not)
@@ -235,9 +226,7 @@ class RelEmbed(object):
             else:
                 self.cell = tf.nn.rnn_cell.GRUCell(self.hidden_size, 
                                                 input_size=self.input_size)
-                _, state = tf.nn.rnn(self.cell, inputs, 
-                                     sequence_length=tf.squeeze(self._input_lengths, [1]),
-                                     dtype=tf.float32)
+                _, state = self._rnn(self.cell, inputs, tf.squeeze(self._input_lengths, [1]))
 #                                  initial_state=self._initial_state)
             # self._final_state = tf.nn.dropout(tf.nn.l2_normalize(state, 1), keep_prob= self._keep_prob)
                 self._final_state = tf.nn.dropout(state, keep_prob=self._keep_prob)
@@ -310,6 +299,23 @@ class RelEmbed(object):
             self._train_cost_summary = tf.merge_summary([tf.scalar_summary("Train_NEG_Loss", self._loss)])
             self._valid_cost_summary = tf.merge_summary([tf.scalar_summary("Validation_NEG_Loss", self._loss)])
         
+    def _rnn_inputs(self, word_embeds, dep_embeds, pos_embeds):
+        """RNN inputs from [batch, max_num_steps, 1, embed size] lookups,
+        a list of steps to unroll over or with rnn_mode 'dynamic' one [batch, time, input] tensor to loop over"""
+        if self.rnn_mode == 'dynamic':
+            return step_inputs(word_embeds, dep_embeds, pos_embeds)
+        input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, word_embeds)]
+        input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, dep_embeds)]
+        input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, pos_embeds)]
+        return [ tf.concat(1, [input_word, input_dep, input_pos_]) 
+                 for (input_word, input_dep, input_pos_) in zip(input_words, input_deps, input_pos)]
+
+    def _rnn(self, cell, inputs, lengths, scope=None):
+        """(outputs, final state) of `cell` over `inputs` from `_rnn_inputs`, with rnn_mode 'dynamic' there are no outputs"""
+        if self.rnn_mode == 'dynamic':
+            return None, rnn_final_state(cell, inputs, lengths, scope=scope)
+        return tf.nn.rnn(cell, inputs, sequence_length=lengths, dtype=tf.float32, scope=scope)
+
     def _build_classification_graph(self):
         # tf.get_variable_scope().reuse_variables()
         with tf.name_scope("Inputs"):
@@ -351,38 +357,28 @@ class RelEmbed(object):
             self._y_target_embeds = tf.nn.dropout(tf.squeeze(y_target_embeds, [1]), keep_prob=self._keep_prob)
 
         with tf.name_scope("RNN"):
-            x_input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, x_input_embeds)]
-            x_input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, x_dep_embeds)]
-            x_input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, x_pos_embeds)]
-            x_inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
-                       for (input_word, input_dep, input_pos_) in zip(x_input_words, x_input_deps, x_input_pos)]
-
-            y_input_words = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, y_input_embeds)]
-            y_input_deps = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, y_dep_embeds)]
-            y_input_pos = [ tf.squeeze(input_, [1, 2]) for input_ in tf.split(1, self.max_num_steps, y_pos_embeds)]
-            y_inputs = [ tf.concat(1, [input_word, input_dep, input_pos_]) 
-                       for (input_word, input_dep, input_pos_) in zip(y_input_words, y_input_deps, y_input_pos)]
+            x_inputs = self._rnn_inputs(x_input_embeds, x_dep_embeds, x_pos_embeds)
+            y_inputs = self._rnn_inputs(y_input_embeds, y_dep_embeds, y_pos_embeds)
 
             if self.bidirectional:
                 with tf.variable_scope("FW", reuse=True) as scope:
-                    x_outs, x_state = tf.nn.rnn(self.fwcell, x_inputs, 
-                                              sequence_length=tf.squeeze(self._input_lengths, [1]), 
-                                              dtype=tf.float32, scope=scope)
+                    x_outs, x_state = self._rnn(self.fwcell, x_inputs, tf.squeeze(self._input_lengths, [1]), scope)
                 with tf.variable_scope("BW", reuse=True) as scope:
-                    y_outs, y_state = tf.nn.rnn(self.bwcell, y_inputs, 
-                                              sequence_length=tf.squeeze(self._input_lengths, [1]), 
-                                              dtype=tf.float32, scope=scope)
+                    y_outs, y_state = self._rnn(self.bwcell, y_inputs, tf.squeeze(self._input_lengths, [1]), scope)
             else:
                 with tf.variable_scope("RNN", reuse=True) as scope:
-                    x_outs, x_state = tf.nn.rnn(self.cell, x_inputs, 
-                                                  sequence_length=tf.squeeze(self._input_lengths, [1]), 
-                                                  dtype=tf.float32, scope=scope)
-                    y_outs, y_state = tf.nn.rnn(self.cell, y_inputs, 
-                                                  sequence_length=tf.squeeze(self._input_lengths, [1]), 
-                                                  dtype=tf.float32, scope=scope)
-
-            self._x_final_state = tf.nn.dropout(x_outs[-1], keep_prob=self._keep_prob)
-            self._y_final_state = tf.nn.dropout(y_outs[-1], keep_prob=self._keep_prob)
+                    x_outs, x_state = self._rnn(self.cell, x_inputs, tf.squeeze(self._input_lengths, [1]), scope)
+                    y_outs, y_state = self._rnn(self.cell, y_inputs, tf.squeeze(self._input_lengths, [1]), scope)
+
+            if self.rnn_mode == 'dynamic': # no outputs, the last one is the final state of the full length paths
+                full = full_length(tf.squeeze(self._input_lengths, [1]), self.max_num_steps)
+                x_final, y_final = x_state * full, y_state * full
+            else:
+                x_final, y_final = x_outs[-1], y_outs[-1]
+            if self.path_end_state:
+                x_final, y_final = x_state, y_state
+            self._x_final_state = tf.nn.dropout(x_final, keep_prob=self._keep_prob)
+            self._y_final_state = tf.nn.dropout(y_final, keep_prob=self._keep_prob)
  
         with tf.name_scope("Classifier"):
             self._class_lambda = tf.Variable(10e-3, trainable=False, name="Class_L2_Lambda")
@@ -409,12 +405,19 @@ class RelEmbed(object):
             # self._predict_probs = tf.nn.softmax(class_logits, name="predict_probabilities")
 
             ### just softmax
-            softmax_shape = [2*self.hidden_size + 2*self.word_embed_size, self.num_classes]
-            self.score_w = tf.Variable(tf.random_uniform(softmax_shape, minval=-1.0, maxval=1.0), 
-                                       name="score_w")
             self.score_bias = tf.Variable(tf.zeros([self.num_classes], dtype=tf.float32), name="score_bias")
-
-            scores = tf.matmul(self._softmax_input, self.score_w) + self.score_bias
+            if self.classifier == 'triple':
+                # score(class c) = sum_ijk W_c[i,j,k] [h_x, h_y]_i x_j y_k
+                scores, self._class_weights = triple_product_head(self._class_final_states,
+                                                                  self._x_target_embeds, self._y_target_embeds,
+                                                                  self.num_classes, rank=self.triple_rank)
+                scores += self.score_bias
+            else:
+                softmax_shape = [2*self.hidden_size + 2*self.word_embed_size, self.num_classes]
+                self.score_w = tf.Variable(tf.random_uniform(softmax_shape, minval=-1.0, maxval=1.0), 
+                                           name="score_w")
+                self._class_weights = [self.score_w]
+                scores = tf.matmul(self._softmax_input, self.score_w) + self.score_bias
             self._predictions = tf.argmax(scores, 1, name="predict")
             self._predict_probs = tf.nn.softmax(scores, name="predict_probabilities")
 
@@ -512,7 +515,7 @@ class RelEmbed(object):
 
             ### MARGIN RANKING BASED ###
 
-            self._class_l2 = self._class_lambda*(tf.nn.l2_loss(self.score_w)
+            self._class_l2 = self._class_lambda*(tf.add_n([ tf.nn.l2_loss(w) for w in self._class_weights ])
                                                 + tf.nn.l2_loss(self.score_bias))
 
             # self._class_l2 = self._class_lambda*(tf.nn.l2_loss(self._scoring_w)
@@ -625,12 +628,9 @@ class RelEmbed(object):
         
         with tf.name_scope("RNN"):
             # compute rep of a query phrase
-            query_phrase = [tf.squeeze(qw, [1]) for qw in tf.split(0, self.max_num_steps, query_phrase_embed)]
-            query_dep = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_dep_embed)]
-            query_pos = [tf.squeeze(qd, [1]) for qd in tf.split(0, self.max_num_steps, query_pos_embed)]
-
-#             print(query_phrase[0].get_shape(), query_dep[0].get_shape())
-            query_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(query_phrase, query_dep, query_pos)]
+            # as a batch of one
+            query_input = self._rnn_inputs(tf.expand_dims(query_phrase_embed, 0), tf.expand_dims(query_dep_embed, 0),
+                                           tf.expand_dims(query_pos_embed, 0))
 
             # just words
             # query_input = query_phrase
@@ -643,29 +643,20 @@ class RelEmbed(object):
             #     bw_state = tf.split(1, 2, outs[0])[1]
             #     query_phrase_state = tf.concat(1, [fw_state, bw_state])
                 with tf.variable_scope("FW", reuse=True) as scope:
-                    _, query_phrase_state = tf.nn.rnn(self.fwcell, query_input, 
-                                              sequence_length=tf.to_int64(self._query_length), 
-                                              dtype=tf.float32, scope=scope)
+                    _, query_phrase_state = self._rnn(self.fwcell, query_input, tf.to_int64(self._query_length), scope)
             else:
                 with tf.variable_scope("RNN", reuse=True) as scope:
-                    _, query_phrase_state = tf.nn.rnn(self.cell, query_input, 
-                                                  sequence_length=tf.to_int64(self._query_length), 
-                                                  dtype=tf.float32, scope=scope)
+                    _, query_phrase_state = self._rnn(self.cell, query_input, tf.to_int64(self._query_length), scope)
 
             # compute reps of similarity phrases
-            sim_phrases = [tf.squeeze(qw, [1,2]) for qw in tf.split(1, self.max_num_steps, sim_phrase_embed)]
-            sim_deps = [tf.squeeze(qd, [1,2]) for qd in tf.split(1, self.max_num_steps, sim_dep_embed)]
-            sim_pos = [tf.squeeze(qp, [1,2]) for qp in tf.split(1, self.max_num_steps, sim_pos_embed)]
-
-            sim_input = [ tf.concat(1, [qw, qd, qp]) for (qw, qd, qp) in zip(sim_phrases, sim_deps, sim_pos)]
+            sim_input = self._rnn_inputs(sim_phrase_embed, sim_dep_embed, sim_pos_embed)
 
             #jsut words
             # sim_input = sim_phrases
             if self.bidirectional:
                 with tf.variable_scope("FW", reuse=True) as scope:
-                    _, sim_phrase_states = tf.nn.rnn(self.fwcell, sim_input, 
-                                                 sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])), 
-                                                 dtype=tf.float32, scope=scope)
+                    _, sim_phrase_states = self._rnn(self.fwcell, sim_input, 
+                                                     tf.to_int64(tf.squeeze(self._sim_lengths, [1])), scope)
                 # outs = tf.nn.bidirectional_rnn(self.fwcell, self.bwcell, sim_input, 
                 #                         sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])),
                 #                         dtype=tf.float32)
@@ -675,9 +666,8 @@ class RelEmbed(object):
                 # sim_phrase_states = tf.concat(1, [fw_state, bw_state])
             else:
                 with tf.variable_scope("RNN", reuse=True) as scope:
-                    _, sim_phrase_states = tf.nn.rnn(self.cell, sim_input, 
-                                                 sequence_length=tf.to_int64(tf.squeeze(self._sim_lengths, [1])), 
-                                                 dtype=tf.float32, scope=scope)
+                    _, sim_phrase_states = self._rnn(self.cell, sim_input, 
+                                                     tf.to_int64(tf.squeeze(self._sim_lengths, [1])), scope)
             
         with tf.name_scope("Similarities"):
             with tf.name_scope("Normalize"):
@@ -687,6 +677,7 @@ class RelEmbed(object):
 #                 query_word = tf.nn.l2_normalize(query_word_embed, 1)
                 # sim_phrases = tf.nn.l2_normalize(tf.concat(1, [sim_phrase_states, sim_target_embeds]), 1)
                 sim_phrases = tf.nn.l2_normalize(sim_phrase_states, 1)
+                self._sim_vectors = sim_phrases # the rows the queries are scored against
 #                 sim_word = tf.nn.l2_normalize(sim_word_embed, 1)                  
 
             with tf.name_scope("Calc_distances"):
@@ -717,21 +708,26 @@ class RelEmbed(object):
                   
         Returns average batch perplexity
         """
+        feed = {self._input_x_phrases:x_input_phrases,
+                self._input_y_phrases:y_input_phrases,
+                self._input_x_targets:x_input_targets,
+                self._input_y_targets:y_input_targets,
+                self._class_labels:class_labels,
+                self._input_lengths:input_lengths,
+                self._keep_prob:keep_prob}
+        step = self._class_cadence.step
+        if not self._class_cadence.due():
+            loss, xent, _ = self.session.run([self._class_loss, self._avg_class_loss, self._class_train_op], feed)
+            return loss, xent
         loss, xent, _, g_summaries, c_summary, p_summary = self.session.run([self._class_loss, self._avg_class_loss,
                                                             self._class_train_op, 
                                                             self._class_grad_summaries,
                                                             self._train_class_loss_summary,
                                                             self._class_penalty_summary],
-                                                           {self._input_x_phrases:x_input_phrases,
-                                                            self._input_y_phrases:y_input_phrases,
-                                                            self._input_x_targets:x_input_targets,
-                                                            self._input_y_targets:y_input_targets,
-                                                            self._class_labels:class_labels,
-                                                            self._input_lengths:input_lengths,
-                                                            self._keep_prob:keep_prob})
-        self.summary_writer.add_summary(g_summaries)
-        self.summary_writer.add_summary(c_summary)
-        self.summary_writer.add_summary(p_summary)
+                                                           feed)
+        self.summary_writer.add_summary(g_summaries, step)
+        self.summary_writer.add_summary(c_summary, step)
+        self.summary_writer.add_summary(p_summary, step)
         return loss, xent
     
     def partial_unsup_fit(self, input_phrases, input_targets, 
@@ -745,19 +741,24 @@ class RelEmbed(object):
                   
         Returns average batch perplexity
         """
+        feed = {self._input_phrases:input_phrases,
+                self._input_targets:input_targets,
+                self._input_labels:input_labels,
+                self._input_lengths:input_lengths,
+                self._input_predict_x:input_predict_x,
+                self._keep_prob:keep_prob}
+        step = self._unsup_cadence.step
+        if not self._unsup_cadence.due():
+            loss, xent, _ = self.session.run([self._loss, self._xent, self._train_op], feed)
+            return loss, xent
         loss, xent, _, g_summaries, c_summary, p_summary = self.session.run([self._loss, self._xent, self._train_op, 
                                                             self._grad_summaries,
                                                             self._train_cost_summary,
                                                             self._penalty_summary],
-                                                           {self._input_phrases:input_phrases,
-                                                            self._input_targets:input_targets,
-                                                            self._input_labels:input_labels,
-                                                            self._input_lengths:input_lengths,
-                                                            self._input_predict_x:input_predict_x,
-                                                            self._keep_prob:keep_prob})
-        self.summary_writer.add_summary(g_summaries)
-        self.summary_writer.add_summary(c_summary)
-        self.summary_writer.add_summary(p_summary)
+                                                           feed)
+        self.summary_writer.add_summary(g_summaries, step)
+        self.summary_writer.add_summary(c_summary, step)
+        self.summary_writer.add_summary(p_summary, step)
         return loss, xent
     
     def validation_loss(self, valid_phrases, valid_targets,     
@@ -803,6 +804,15 @@ class RelEmbed(object):
 #         print("Sanity check: %r" % sanity)
         return nearby_vals, nearby_idx
     
+    def embed_similarity_vectors(self, phrases, targets, lengths):
+        """The unit vectors the similarity graph compares phrases by, the normalized RNN states
+
+        The rows validation_phrase_nearby scores its similarity set with, see phrase_index.
+        The targets aren't part of this model's similarity"""
+        return self.session.run(self._sim_vectors, {self._sim_phrases:phrases,
+                                                    self._sim_lengths:lengths,
+                                                    self._keep_prob:1.0})
+    
     def embed_phrases_and_targets(self, phrases, targets, lengths):
         phrase_reps, target_reps = self.session.run([self._final_state, self._target_embeds],
                                                     { self._input_phrases:phrases,
@@ -898,6 +908,9 @@ class RelEmbed(object):
         del unsup
 
     def random_restart_score_weights(self):
+        if self.classifier == 'triple':
+            self.session.run(tf.initialize_variables(self._class_weights + [self.score_bias]))
+            return
         random_w = np.random.uniform(low=-.5, high=.5, size=(2*self.hidden_size + 2*self.word_embed_size, self.num_classes))
         zero_bias = np.zeros(self.num_classes)
         self.session.run([self.score_w.assign(random_w),
@@ -0,0 +1,147 @@
+"""
+Re-index an SDP dataset under a new vocab without reparsing anything.
+
+Every field of the path elements (token, dep[, pos]) and the targets gets an int32 lookup array from old id to new id,
+types the new vocab doesn't have go to its <OOV>.  A whole block of records is then remapped with one fancy index
+per field, so the packed format goes through at millions of records a second.  The json lines still have to be
+parsed and dumped, but the ids of a chunk of them are remapped the same way.
+
+The new vocab comes either from the vocab files of another dataset (--vocab_prefix), or is rebuilt from the
+old dataset's `_counts` file with new thresholds (-m / -v), see vocab_builder.
+Words that were already <OOV> in the old vocab stay <OOV>: growing the vocab needs the string records.
+
+    python remap_sdp.py -i data/semeval_wiki_sdp_10000 -o data/semeval_wiki_sdp_10000_m10 -m 10
+"""
+from __future__ import print_function
+import itertools
+import json
+import os
+import click
+import numpy as np
+from time import time
+
+from packed_sdp import PackedSDPData, PackedSDPWriter
+import vocab_builder as vb
+
+KINDS = ('vocab', 'dep', 'pos') # the order of the fields of a path element
+
+def read_vocab(filename):
+    """The types and probabilities of a vocab file"""
+    with open(filename, 'r') as f:
+        terms = [ json.loads(line) for line in f ]
+    return [ term[0] for term in terms ], [ term[1] for term in terms ]
+
+def remap_array(old_vocab, new_vocab, oov=u'<OOV>'):
+    """Lookup array from old ids to the ids of the same types in `new_vocab`, or to its `oov`"""
+    new2int = { token:i for (i, token) in enumerate(new_vocab) }
+    new_oov = new2int[oov]
+    return np.array([ new2int.get(token, new_oov) for token in old_vocab ], dtype=np.int32)
+
+def ok_records(words, lengths, targets, oov, oov_percent=75):
+    """Mask of the records that pass the OOV rules of the *2sdp scripts' `is_ok_sdp` under the new vocab:
+    no target may be OOV, and no more than `oov_percent` percent of the path
+
+    `words` are the token ids of all the path elements, `lengths` the length of each path"""
+    ok = ~np.any(targets == oov, axis=1)
+    ends = np.cumsum(lengths)
+    oov_so_far = np.concatenate([[0], np.cumsum(words == oov)])
+    oov_counts = oov_so_far[ends] - oov_so_far[ends - lengths]
+    too_many = ((oov_percent / 100.0) * lengths).astype(np.int64)
+    return ok & (oov_counts <= too_many) & (lengths > 0)
+
+def remap_packed(in_prefix, out_prefix, remaps, oov=None, chunk_size=1000000):
+    """Remap the packed files of `in_prefix` into `out_prefix`, `chunk_size` records at a time
+
+    `remaps` has one lookup array per field of a path element, the first one also maps the targets.
+    If `oov` is given, records that fail `ok_records` are dropped. Returns (records in, records out)"""
+    data = PackedSDPData(in_prefix)
+    writer = PackedSDPWriter(out_prefix)
+    kept = 0
+    for start in range(0, data.num_paths, chunk_size):
+        stop = min(start + chunk_size, data.num_paths)
+        offsets = np.asarray(data.offsets[start:stop+1])
+        lengths = np.diff(offsets)
+        paths = np.asarray(data.paths[offsets[0]:offsets[-1]])
+        new_paths = np.empty_like(paths)
+        for field, remap in enumerate(remaps[:data.width]):
+            new_paths[:, field] = remap[paths[:, field]]
+        targets = remaps[0][np.asarray(data.targets[start:stop])]
+        sources = np.asarray(data.source[start:stop])
+        if oov is not None:
+            keep = ok_records(new_paths[:, 0], lengths, targets, oov)
+            new_paths = new_paths[np.repeat(keep, lengths)]
+            lengths, targets, sources = lengths[keep], targets[keep], sources[keep]
+        writer.write_arrays(new_paths, lengths, targets, sources)
+        kept += len(lengths)
+    writer.close()
+    return data.num_paths, kept
+
+def remap_json(in_file, out_file, remaps, oov=None, chunk_size=100000):
+    """Remap the json lines SDP file `in_file` into `out_file`, the same as `remap_packed`"""
+    total, kept = 0, 0
+    with open(in_file, 'r') as f, open(out_file, 'w') as out:
+        while True:
+            records = [ json.loads(line) for line in itertools.islice(f, chunk_size) ]
+            if not records:
+                break
+            total += len(records)
+            width = len(records[0]['path'][0])
+            lengths = np.fromiter((len(r['path']) for r in records), dtype=np.int64, count=len(records))
+            paths = np.fromiter(itertools.chain.from_iterable(itertools.chain.from_iterable(r['path'] for r in records)),
+                                dtype=np.int32, count=width*np.sum(lengths)).reshape([-1, width])
+            new_paths = np.empty_like(paths)
+            for field, remap in enumerate(remaps[:width]):
+                new_paths[:, field] = remap[paths[:, field]]
+            targets = remaps[0][np.array([ r['target'] for r in records ], dtype=np.int32)]
+            keep = ok_records(new_paths[:, 0], lengths, targets, oov) if oov is not None else None
+            new_paths, targets = new_paths.tolist(), targets.tolist()
+            start = 0
+            for i, (record, length) in enumerate(zip(records, lengths.tolist())):
+                if keep is None or keep[i]:
+                    record['path'] = new_paths[start:start+length]
+                    record['target'] = targets[i]
+                    out.write(json.dumps(record) + '\n')
+                    kept += 1
+                start += length
+    return total, kept
+
+def new_vocabs(in_prefix, vocab_prefix=None, min_count=None, vocab_limit=None):
+    """(types, probabilities) of each kind of the new vocab, read from `vocab_prefix` or rebuilt from the counts"""
+    if vocab_prefix:
+        return { kind:read_vocab(vocab_prefix + '_' + kind) for kind in KINDS
+                 if os.path.exists(vocab_prefix + '_' + kind) }
+    counts = vb.read_counts(in_prefix + '_counts')
+    vocabs = vb.build_vocabs(counts, vocab_limit=vocab_limit, min_count=min_count)
+    return { kind:(vocab[0], vocab[3]) for kind, vocab in vocabs.items() }
+
+@click.command()
+@click.option('-i', '--in_prefix', required=True, help="Dataset to remap (its json file, _vocab/_dep/_pos and packed files)")
+@click.option('-o', '--out_prefix', required=True, help="Prefix of the remapped dataset")
+@click.option('--vocab_prefix', default=None, help="Take the new vocab files from this dataset")
+@click.option('-m', '--min_count', default=5, help="Minimum count of a vocab to keep, when rebuilding from the counts")
+@click.option('-v', '--vocab_limit', default=None, type=int, help="Number of most common token types to keep, when rebuilding")
+@click.option('--no_filter', default=False, is_flag=True, help="Keep records with OOV targets or mostly OOV paths under the new vocab")
+@click.option('--chunk_size', default=1000000, help="Records remapped at a time")
+def main(in_prefix, out_prefix, vocab_prefix, min_count, vocab_limit, no_filter, chunk_size):
+    start = time()
+    vocabs = new_vocabs(in_prefix, vocab_prefix=vocab_prefix, min_count=min_count, vocab_limit=vocab_limit)
+    remaps = []
+    for kind in KINDS:
+        if kind in vocabs and os.path.exists(in_prefix + '_' + kind):
+            old_vocab, _ = read_vocab(in_prefix + '_' + kind)
+            remaps.append(remap_array(old_vocab, vocabs[kind][0]))
+            vb.write_vocab(out_prefix + '_' + kind, *vocabs[kind])
+    oov = None if no_filter else vocabs['vocab'][0].index(u'<OOV>')
+    print("New vocab: %s" % ", ".join("%i %s" % (len(vocabs[kind][0]), kind) for kind in KINDS if kind in vocabs))
+    if os.path.exists(in_prefix + '_packed_meta'):
+        remap_start = time()
+        total, kept = remap_packed(in_prefix, out_prefix, remaps, oov=oov, chunk_size=chunk_size)
+        print("Packed: kept %i of %i records, %0.0f records/sec" % (kept, total, total / (time() - remap_start)))
+    if os.path.exists(in_prefix):
+        remap_start = time()
+        total, kept = remap_json(in_prefix, out_prefix, remaps, oov=oov, chunk_size=min(chunk_size, 100000))
+        print("Json: kept %i of %i records, %0.0f records/sec" % (kept, total, total / (time() - remap_start)))
+    print("Took %0.1f sec" % (time() - start))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""
+Array based shortest dependency path (SDP) extraction.
+
+Works on the compact parses from `parse_cache` (plain lists of words, labels and head indices) instead of
+walking spacy Token objects.  Per sentence we precompute the depth of every token in the dependency tree,
+so the lowest common ancestor of two nominals is found by climbing from the deeper one to the same depth
+and then climbing both together.  That's O(path length) instead of comparing every pair of tokens on the two
+paths to root, and nothing is rebuilt per pair except the path itself.
+
+`sentence_to_sdps` yields the same records as the `sentence_to_sdps` functions of the *2sdp scripts.
+`sentence_to_sdps_batched` yields them too, but shares one table of root paths between all the pairs of a sentence,
+which pays off on long sentences with many noun chunks.
+"""
+from __future__ import print_function
+from parse_cache import compact_parse
+
+def as_compact_parse(sentence):
+    """Accept a compact parse, a CachedDoc or a spacy Doc and return the compact parse"""
+    if isinstance(sentence, dict):
+        return sentence
+    if hasattr(sentence, 'parse') and isinstance(sentence.parse, dict):
+        return sentence.parse # CachedDoc
+    return compact_parse(sentence)
+
+def head_depths(heads):
+    """Depth of every token in the dependency tree(s), roots (tokens that are their own head) are 0"""
+    depths = [-1]*len(heads)
+    for i in range(len(heads)):
+        # walk up until we hit something we know, then fill in on the way back down
+        chain = []
+        j = i
+        while depths[j] < 0:
+            if heads[j] == j:
+                depths[j] = 0
+                break
+            chain.append(j)
+            j = heads[j]
+        depth = depths[j]
+        for k in reversed(chain):
+            depth += 1
+            depths[k] = depth
+    return depths
+
+def chunk_head(start, end, heads):
+    """Index of the token in chunk [start, end) whose head is outside the chunk, None if there isn't one"""
+    for i in range(start, end):
+        if not start <= heads[i] < end:
+            return i
+    return None
+
+def lowest_common_ancestor(x, y, heads, depths):
+    """Lowest common ancestor of tokens `x` and `y`, None if they are in different trees"""
+    while depths[x] > depths[y]:
+        x = heads[x]
+    while depths[y] > depths[x]:
+        y = heads[y]
+    while x != y:
+        if heads[x] == x: # both at a root, but not the same one
+            return None
+        x = heads[x]
+        y = heads[y]
+    return x
+
+def path_between(x, y, common, heads):
+    """Token indices along the dependency path X <- ... <- common -> ... -> Y, endpoints included"""
+    path = [x]
+    while x != common:
+        x = heads[x]
+        path.append(x)
+    down = []
+    while y != common:
+        down.append(y)
+        y = heads[y]
+    path.extend(reversed(down))
+    return path
+
+def smart_texts(parse):
+    """Lowercased token texts with numbers and punctuation simplified, like `smart_token_to_text`"""
+    texts = []
+    for word, like_num, is_punct in zip(parse['words'], parse['like_num'], parse['is_punct']):
+        if like_num:
+            texts.append(u'<NUM>')
+        elif is_punct:
+            texts.append(u'<PUNCT>')
+        else:
+            texts.append(word.lower())
+    return texts
+
+def path_elements(parse, pos=True):
+    """The (word, dep[, pos]) tuple of every token in the sentence"""
+    if pos:
+        return list(zip(smart_texts(parse), parse['deps'], parse['pos']))
+    return list(zip(smart_texts(parse), parse['deps']))
+
+def chunk_heads(parse, verbose=True):
+    """Head noun index of every noun chunk in the sentence, skipping chunks without one"""
+    heads = parse['heads']
+    chunk_heads = []
+    for start, end in parse['chunks']:
+        head = chunk_head(start, end, heads)
+        if head is None:
+            if verbose:
+                print("No head noun found in chunk... %r" % u' '.join(parse['words'][start:end]).lower())
+            continue
+        chunk_heads.append(head)
+    return chunk_heads
+
+def structure_labels(texts, deps):
+    """The dep label each token adds to a path's dep structure, None for <PUNCT> which `post_process_sdp` drops"""
+    return [ None if text == u'<PUNCT>' else dep for (text, dep) in zip(texts, deps) ]
+
+def step_label(trie, node, label):
+    """Step `trie` from `node` with a token's structure label, tokens without one leave it where it is"""
+    if label is None:
+        return node
+    return trie.step(node, label)
+
+def pruned_path_between(X, Y, heads, depths, labels, end_labels, structures):
+    """Climb from `X` and `Y` to their common ancestor stepping `structures` along the way
+
+    X's side steps the trie forwards and Y's side steps its reversed trie, so the climb stops
+    at the first label no structure can have there.  `end_labels` are the labels X and Y add.
+
+    Returns:
+        common, path: the common ancestor (None if they are in different trees)
+                      and the path like `path_between` (None if its dep structure isn't in `structures`)
+    """
+    def label(t):
+        if t == X:
+            return end_labels[0]
+        if t == Y:
+            return end_labels[1]
+        return labels[t]
+    backwards = structures.reversed()
+    forward_node, backward_node = structures.ROOT, backwards.ROOT
+    x_side, y_side = [], []
+    x, y = X, Y
+    while depths[x] > depths[y]:
+        forward_node = step_label(structures, forward_node, label(x))
+        if forward_node == structures.REJECT:
+            return x, None
+        x_side.append(x)
+        x = heads[x]
+    while depths[y] > depths[x]:
+        backward_node = step_label(backwards, backward_node, label(y))
+        if backward_node == backwards.REJECT:
+            return y, None
+        y_side.append(y)
+        y = heads[y]
+    while x != y:
+        if heads[x] == x: # both at a root, but not the same one
+            return None, None
+        forward_node = step_label(structures, forward_node, label(x))
+        backward_node = step_label(backwards, backward_node, label(y))
+        if forward_node == structures.REJECT or backward_node == backwards.REJECT:
+            return x, None
+        x_side.append(x)
+        y_side.append(y)
+        x = heads[x]
+        y = heads[y]
+    # the common ancestor and Y's side, in path order, finish the structure
+    forward_node = step_label(structures, forward_node, label(x))
+    for t in reversed(y_side):
+        forward_node = step_label(structures, forward_node, label(t))
+    if not structures.accepting(forward_node):
+        return x, None
+    x_side.append(x)
+    x_side.extend(reversed(y_side))
+    return x, x_side
+
+def sentence_to_sdps(sentence, include_ends=False, min_len=1, max_len=7,
+                     pos=True, sent=False, structures=None, verbose=False):
+    """Takes sentence and returns all shortest dependency paths (SDP) between pairs of noun phrase heads in a sentence
+
+    Args:
+        sentence: a compact parse, CachedDoc or spacy Doc
+        include_ends (opt): keep the nominal words at the ends of the path instead of <X> and <Y>
+        min_len (opt): the minimum number of words along the path
+        max_len (opt): the maximum number of words along the path
+        pos (opt): make path elements (word, dep, pos) triples instead of (word, dep) pairs
+        sent (opt): include the sentence text in each record under `sent`
+        structures (opt): a sdp_dep_structures.DepTrie of dep labels, the climb to the common ancestor
+                          stops at the first label that takes the path's dep structure out of it
+
+    Returns:
+        sdps: dicts with `path` and `target` fields like the *2sdp scripts' `sentence_to_sdps`
+    """
+    parse = as_compact_parse(sentence)
+    heads = parse['heads']
+    depths = head_depths(heads)
+    texts = smart_texts(parse)
+    deps = parse['deps']
+    tags = parse['pos']
+    labels = structure_labels(texts, deps) if structures is not None else None
+    nouns = chunk_heads(parse)
+    for i, X in enumerate(nouns[:-1]):
+        for Y in nouns[i+1:]:
+            if structures is not None:
+                # the ends are <X> and <Y> and always kept, unless the nominal words are
+                end_labels = (labels[X], labels[Y]) if include_ends else (deps[X], deps[Y])
+                common, path = pruned_path_between(X, Y, heads, depths, labels, end_labels, structures)
+            else:
+                common = lowest_common_ancestor(X, Y, heads, depths)
+                path = None
+            if common is None:
+                if verbose:
+                    print("Bad SDP for sentence '%r' :: skipping" % parse['text'])
+                continue
+            if structures is not None:
+                if path is None:
+                    continue
+            else:
+                path = path_between(X, Y, common, heads)
+            if pos:
+                sdp = [ (texts[t], deps[t], tags[t]) for t in path ]
+                if not include_ends:
+                    sdp[0] = (u'<X>', sdp[0][1], sdp[0][2])
+                    sdp[-1] = (u'<Y>', sdp[-1][1], sdp[-1][2])
+            else:
+                sdp = [ (texts[t], deps[t]) for t in path ]
+                if not include_ends:
+                    sdp[0] = (u'<X>', sdp[0][1])
+                    sdp[-1] = (u'<Y>', sdp[-1][1])
+            if len(sdp) < min_len or len(sdp) > max_len:
+                continue
+            record = {'path': sdp, 'target':(parse['words'][X].lower(), parse['words'][Y].lower())}
+            if sent:
+                record['sent'] = parse['text']
+            yield record
+
+def sentence_to_sdps_batched(sentence, include_ends=False, min_len=1, max_len=7,
+                             pos=True, sent=False, structures=None, verbose=False):
+    """Same records as `sentence_to_sdps`, but computes all the pairwise SDPs of a sentence from one shared table
+
+    Every head noun is found once, and its path to root (as token indices and as path elements)
+    and an index of where each ancestor sits on that path are built once.
+    For a pair (X, Y) the common ancestor is then the first token on Y's root path that's in X's index,
+    its positions give the path length before anything is built, and the path itself is two list slices.
+    Pairs whose depths alone rule out `max_len` are skipped without looking for the ancestor.
+    With `structures`, the trie nodes along every root path are stepped once too (forwards for X's side,
+    reversed for Y's), and the scan for the ancestor stops as soon as Y's side leaves the reversed trie.
+    """
+    parse = as_compact_parse(sentence)
+    heads = parse['heads']
+    nouns = chunk_heads(parse)
+    if len(nouns) < 2:
+        return
+    elements = path_elements(parse, pos=pos)
+    if structures is not None:
+        labels = structure_labels(smart_texts(parse), parse['deps'])
+        backwards = structures.reversed()
+    # the shared table: root path, its elements and ancestor positions for every head noun
+    root_paths = []
+    root_elements = []
+    ancestor_positions = []
+    # and the trie nodes before each position of the root path, forwards and reversed
+    forward_nodes = []
+    backward_nodes = []
+    for noun in nouns:
+        path = [noun]
+        while heads[path[-1]] != path[-1]:
+            path.append(heads[path[-1]])
+        root_paths.append(path)
+        root_elements.append([ elements[t] for t in path ])
+        ancestor_positions.append({ t:i for (i, t) in enumerate(path) })
+        if structures is not None:
+            # the noun is an end of every pair it's in
+            path_labels = [ labels[noun] if include_ends else elements[noun][1] ] + [ labels[t] for t in path[1:] ]
+            forward, backward = [structures.ROOT], [backwards.ROOT]
+            for label in path_labels[:-1]:
+                forward.append(step_label(structures, forward[-1], label))
+                backward.append(step_label(backwards, backward[-1], label))
+            forward_nodes.append(forward)
+            backward_nodes.append(backward)
+    for i, X in enumerate(nouns[:-1]):
+        X_len = len(root_paths[i])
+        X_elements = root_elements[i]
+        X_positions = ancestor_positions[i]
+        for j in range(i+1, len(nouns)):
+            Y = nouns[j]
+            Y_path = root_paths[j]
+            if abs(X_len - len(Y_path)) + 1 > max_len:
+                continue # the path is at least as long as the difference in depth
+            x_pos = None
+            rejected = False
+            for y_pos, t in enumerate(Y_path):
+                x_pos = X_positions.get(t)
+                if x_pos is not None:
+                    break
+                if structures is not None and backward_nodes[j][y_pos+1] == backwards.REJECT:
+                    rejected = True # Y's side below here is in no structure, whatever the ancestor
+                    break
+            if rejected:
+                continue
+            if x_pos is None:
+                if verbose:
+                    print("Bad SDP for sentence '%r' :: skipping" % parse['text'])
+                continue
+            if x_pos + y_pos + 1 < min_len or x_pos + y_pos + 1 > max_len:
+                continue
+            if structures is not None:
+                node = forward_nodes[i][x_pos]
+                if node == structures.REJECT:
+                    continue
+                # the common ancestor, then Y's side in path order
+                if x_pos == 0 or y_pos == 0:
+                    node = step_label(structures, node, labels[t] if include_ends else elements[t][1])
+                else:
+                    node = step_label(structures, node, labels[t])
+                for y_side in range(y_pos-1, -1, -1):
+                    if y_side == 0:
+                        label = labels[Y] if include_ends else elements[Y][1]
+                    else:
+                        label = labels[Y_path[y_side]]
+                    node = step_label(structures, node, label)
+                if not structures.accepting(node):
+                    continue
+            # X <- ... <- Z, then Z -> ... -> Y
+            sdp = X_elements[:x_pos+1] + root_elements[j][:y_pos][::-1]
+            if not include_ends:
+                sdp[0] = (u'<X>',) + sdp[0][1:]
+                sdp[-1] = (u'<Y>',) + sdp[-1][1:]
+            record = {'path': sdp, 'target':(parse['words'][X].lower(), parse['words'][Y].lower())}
+            if sent:
+                record['sent'] = parse['text']
+            yield record
@@ -1 +1,104 @@
-ok_dep_structures = set([(u'nsubj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj'), (u'dobj', u'prep', u'pobj'), (u'dobj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'compound', u'pobj'), (u'attr', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj'), (u'compound', u'nsubj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj'), (u'pobj', u'acl', u'agent', u'pobj'), (u'nsubjpass', u'prep', u'pobj'), (u'compound', u'dobj'), (u'conj', u'prep', u'pobj'), (u'nsubj', u'acl', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'dobj', u'acl', u'agent', u'pobj'), (u'poss', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound'), (u'nsubj', u'advcl', u'dobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'compound'), (u'nsubj', u'advcl', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'advmod', u'prep', u'pobj'), (u'dobj', u'ROOT', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'dobj', u'compound'), (u'pobj', u'acl', u'prep', u'pobj'), (u'appos', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'dobj'), (u'poss', u'nsubj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'amod'), (u'pobj', u'relcl', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'dobj', u'relcl', u'prep', u'pobj'), (u'dobj', u'conj', u'prep', u'pobj'), (u'dobj', u'acl', u'dobj'), (u'nsubj', u'ROOT', u'advcl', u'dobj'), (u'attr', u'acl', u'agent', u'pobj'), (u'compound', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'compound', u'nsubjpass'), (u'nsubj', u'ROOT', u'dobj', u'conj'), (u'pobj', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'amod'), (u'dobj', u'xcomp', u'prep', u'pobj'), (u'pobj', u'relcl', u'dobj'), (u'nsubj', u'relcl', u'dobj'), (u'pobj', u'prep', u'ROOT', u'prep', u'pobj'), (u'dobj', u'ROOT', u'prep', u'pobj', u'amod'), (u'dobj', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'prep', u'prep', u'pobj'), (u'dobj', u'acl', u'prep', u'pobj'), (u'nsubjpass', u'ccomp', u'prep', u'pobj'), (u'nsubj', u'conj', u'dobj'), (u'nsubj', u'ROOT', u'prep', u'pcomp', u'dobj'), (u'nsubj', u'ROOT', u'ccomp', u'nsubj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'attr'), (u'attr', u'acl', u'dobj'), (u'pobj', u'prep', u'dobj', u'ROOT', u'prep', u'pobj'), (u'dobj', u'advcl', u'prep', u'pobj'), (u'compound', u'attr'), (u'nsubj', u'ROOT', u'acomp', u'prep', u'pobj'), (u'dobj', u'pcomp', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'amod'), (u'pobj', u'prep', u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'attr', u'acl', u'prep', u'pobj'), (u'nsubjpass', u'conj', u'prep', u'pobj'), (u'pobj', u'acl', u'dobj'), (u'nsubj', u'relcl', u'prep', u'pobj'), (u'attr', u'relcl', u'dobj'), (u'nsubj', u'acl', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'compound'), (u'compound', u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'poss', u'dobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj'), (u'dobj', u'relcl', u'dobj'), (u'nsubjpass', u'relcl', u'prep', u'pobj'), (u'nsubj', u'conj', u'prep', u'pobj'), (u'compound', u'nsubj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj', u'prep', u'pobj'), (u'dobj', u'amod', u'prep', u'pobj'), (u'pobj', u'prep', u'dobj', u'prep', u'pobj'), (u'compound', u'conj'), (u'pobj', u'relcl', u'agent', u'pobj'), (u'nsubjpass', u'advcl', u'prep', u'pobj'), (u'amod', u'nsubj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'ccomp', u'agent', u'pobj'), (u'compound', u'nsubj', u'ROOT', u'dobj'), (u'nsubj', u'prep', u'pobj', u'compound'), (u'nsubjpass', u'acl', u'agent', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'amod'), (u'dobj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'dative', u'pobj'), (u'ROOT', u'acl', u'prep', u'pobj'), (u'ROOT', u'prep', u'pobj'), (u'dobj', u'ROOT', u'dative', u'pobj'), (u'nsubj', u'ROOT', u'xcomp', u'dobj'), (u'pobj', u'amod', u'prep', u'pobj'), (u'amod', u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'advcl', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'acl', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'prep', u'pobj'), (u'conj', u'nsubj', u'ROOT', u'dobj'), (u'dobj', u'prep', u'pobj', u'prep', u'pobj'), (u'compound', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'xcomp', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'acl', u'dobj'), (u'pobj', u'prep', u'ROOT', u'dobj'), (u'compound', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'nsubj'), (u'nsubj', u'ROOT', u'conj', u'prep', u'pobj'), (u'compound', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'amod'), (u'amod', u'pobj'), (u'amod', u'dobj'), (u'nsubj', u'ROOT', u'conj', u'dobj'), (u'dobj', u'ccomp', u'prep', u'pobj'), (u'nsubj', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'compound'), (u'compound', u'appos'), (u'nsubj', u'advcl', u'advmod', u'prep', u'pobj'), (u'nsubjpass', u'advcl', u'agent', u'pobj'), (u'attr', u'relcl', u'prep', u'pobj'), (u'nsubj', u'acl', u'dobj'), (u'compound', u'dobj', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'nsubj'), (u'amod', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'advcl', u'dobj'), (u'nsubjpass', u'acl', u'dobj'), (u'appos', u'relcl', u'dobj'), (u'compound', u'nsubjpass', u'prep', u'pobj'), (u'pobj', u'acl', u'agent', u'pobj', u'conj'), (u'compound', u'compound'), (u'attr', u'prep', u'pobj', u'compound'), (u'dobj', u'prep', u'pobj', u'amod'), (u'compound', u'poss'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'conj'), (u'compound', u'nsubj', u'ROOT', u'prep', u'pobj', u'compound'), (u'dobj', u'relcl', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'npadvmod'), (u'conj', u'acl', u'agent', u'pobj'), (u'amod', u'dobj', u'ROOT', u'prep', u'pobj'), (u'compound', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj'), (u'npadvmod', u'prep', u'pobj'), (u'dobj', u'ROOT', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'relcl', u'dobj'), (u'compound', u'dobj', u'ROOT', u'prep', u'pobj'), (u'attr', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj', u'compound'), (u'pobj', u'conj'), (u'dobj', u'ROOT', u'xcomp', u'dobj'), (u'ROOT', u'acl', u'dobj'), (u'nsubjpass', u'ROOT', u'xcomp', u'prep', u'pobj'), (u'poss', u'pobj', u'prep', u'pobj'), (u'dobj', u'ROOT', u'advcl', u'dobj'), (u'dobj', u'conj', u'prep', u'pobj', u'compound'), (u'conj', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr'), (u'compound', u'nsubj', u'ROOT', u'prep', u'pobj', u'amod'), (u'appos', u'relcl', u'prep', u'pobj'), (u'pobj', u'prep', u'advcl', u'prep', u'pobj'), (u'amod', u'dobj', u'prep', u'pobj'), (u'advcl', u'prep', u'pobj'), (u'conj', u'dobj', u'prep', u'pobj'), (u'pobj', u'acl', u'agent', u'pobj', u'prep', u'pobj'), (u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'attr', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'acl', u'agent', u'pobj'), (u'nsubjpass', u'ROOT', u'xcomp', u'dobj'), (u'nsubj', u'ccomp', u'attr', u'prep', u'pobj'), (u'appos', u'acl', u'agent', u'pobj'), (u'amod', u'nsubj', u'prep', u'pobj'), (u'compound', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'amod'), (u'attr', u'relcl', u'dobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj'), (u'amod', u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'dobj', u'relcl', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'dobj', u'nmod'), (u'pobj', u'prep', u'pobj', u'prep', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj', u'amod'), (u'ROOT', u'prep', u'pobj', u'compound'), (u'appos', u'nsubj', u'ROOT', u'dobj'), (u'nsubjpass', u'ROOT', u'npadvmod'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pcomp', u'dobj'), (u'compound', u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'nsubj', u'auxpass', u'ROOT', u'prep', u'pobj'), (u'nsubjpass', u'amod', u'prep', u'pobj'), (u'conj', u'nsubj', u'relcl', u'dobj'), (u'attr', u'prep', u'pobj', u'conj'), (u'amod', u'attr'), (u'ROOT', u'conj'), (u'nsubj', u'advcl', u'dobj', u'prep', u'pobj'), (u'nsubjpass', u'acl', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj', u'conj'), (u'nsubj', u'advcl', u'attr', u'prep', u'pobj'), (u'nmod', u'attr'), (u'nsubj', u'amod', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'conj', u'conj'), (u'dobj', u'amod', u'prep', u'pobj', u'compound'), (u'conj', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'conj'), (u'nsubj', u'ccomp', u'dobj', u'prep', u'pobj'), (u'compound', u'nsubj', u'ROOT', u'dobj', u'compound'), (u'dobj', u'ROOT', u'prep', u'pcomp', u'dobj'), (u'dobj', u'ROOT', u'prep', u'pcomp'), (u'poss', u'nsubjpass'), (u'dobj', u'ROOT', u'xcomp', u'prep', u'pobj'), (u'appos', u'acl', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'ccomp', u'dobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'conj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'dobj'), (u'conj', u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'prep', u'ROOT', u'nsubj'), (u'pobj', u'relcl', u'advmod', u'prep', u'pobj'), (u'nsubjpass', u'conj', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pcomp'), (u'nsubj', u'ROOT', u'ccomp'), (u'nsubj', u'ROOT', u'ccomp', u'nsubjpass'), (u'nsubjpass', u'ROOT', u'advcl'), (u'pobj', u'prep', u'acl', u'agent', u'pobj'), (u'ROOT', u'acl', u'agent', u'pobj'), (u'nmod', u'pobj'), (u'pobj', u'prep', u'attr', u'relcl', u'dobj'), (u'nsubjpass', u'ROOT', u'advmod', u'prep', u'pobj'), (u'dobj', u'conj', u'acl', u'agent', u'pobj'), (u'amod', u'nsubjpass'), (u'pobj', u'prep', u'ROOT', u'dobj', u'prep', u'pobj'), (u'pobj', u'prep', u'advmod', u'ROOT', u'nsubj'), (u'pobj', u'agent', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'prep', u'pobj', u'compound'), (u'nsubj', u'relcl', u'dobj', u'amod'), (u'nsubj', u'ROOT', u'advcl', u'dobj', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ccomp', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'advcl'), (u'pobj', u'prep', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound'), (u'dobj', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'acomp', u'prep', u'pobj'), (u'nsubj', u'relcl', u'prep', u'prep', u'pobj'), (u'compound', u'pobj', u'compound'), (u'amod', u'ROOT', u'dobj'), (u'amod', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'dobj', u'relcl', u'dobj', u'compound'), (u'det', u'pobj', u'prep'), (u'nsubj', u'prep', u'pcomp', u'npadvmod'), (u'compound', u'attr', u'prep', u'pobj'), (u'pobj', u'relcl', u'nsubj'), (u'ROOT', u'relcl', u'prep', u'pobj'), (u'dobj', u'prep', u'pcomp', u'dobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'conj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'prep', u'pobj'), (u'nsubjpass', u'prep', u'pobj', u'compound'), (u'nsubjpass', u'ROOT', u'nsubjpass'), (u'compound', u'ROOT'), (u'attr', u'relcl', u'agent', u'pobj'), (u'nsubj', u'prep', u'pobj', u'amod'), (u'ROOT', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'pobj', u'relcl', u'attr', u'prep', u'pobj'), (u'amod', u'dobj', u'prep', u'pobj', u'amod'), (u'ROOT', u'conj', u'dobj'), (u'nsubj', u'ROOT', u'attr', u'acl', u'prep', u'pobj'), (u'dobj', u'ROOT', u'advcl', u'prep', u'pobj'), (u'compound', u'dobj', u'pcomp', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'oprd', u'prep', u'pobj'), (u'amod', u'nsubj', u'ROOT', u'prep', u'pobj', u'compound'), (u'pobj', u'acl', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'advmod', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'nsubjpass'), (u'pobj', u'acl', u'agent', u'pobj', u'compound'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'prep', u'pobj'), (u'nsubjpass', u'relcl', u'dobj'), (u'pobj', u'prep', u'acl', u'prep', u'pobj'), (u'dobj', u'conj'), (u'nsubjpass', u'ROOT', u'prep', u'pcomp'), (u'nsubj', u'ROOT', u'dobj', u'acl', u'prep', u'pobj'), (u'appos', u'conj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj'), (u'dobj', u'relcl', u'nsubj'), (u'det', u'dobj', u'compound'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'pobj', u'conj'), (u'pobj', u'prep', u'ROOT', u'conj', u'prep', u'pobj'), (u'conj', u'nsubj', u'ccomp', u'dobj'), (u'ROOT', u'advmod', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pcomp', u'dobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'prep', u'pobj', u'compound'), (u'poss', u'nsubj', u'prep', u'pobj'), (u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'compound', u'nsubj', u'ROOT'), (u'poss', u'attr'), (u'amod', u'attr', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'acomp', u'prep', u'pobj'), (u'nsubj', u'relcl', u'advmod', u'prep', u'pobj'), (u'attr', u'prep', u'pcomp', u'dobj'), (u'amod', u'ROOT', u'prep', u'pobj'), (u'pobj', u'agent', u'ROOT', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'ccomp', u'nsubj', u'conj'), (u'ROOT', u'relcl', u'dobj'), (u'dobj', u'relcl', u'agent', u'pobj', u'compound'), (u'attr', u'prep', u'pobj', u'amod'), (u'dobj', u'advcl', u'ROOT', u'nsubj'), (u'nsubjpass', u'ROOT', u'advcl', u'dobj', u'amod'), (u'compound', u'ROOT', u'acl', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'amod'), (u'dobj', u'ROOT', u'prep', u'pobj', u'compound', u'compound'), (u'compound', u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'dobj'), (u'conj', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'dobj', u'ROOT', u'prep', u'pcomp'), (u'nsubj', u'ROOT', u'acomp', u'prep', u'pobj', u'amod'), (u'nsubj', u'ROOT', u'attr', u'relcl', u'nsubj'), (u'attr', u'acl', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'dobj', u'appos'), (u'poss', u'nsubj', u'ROOT', u'dobj'), (u'nsubj', u'advcl', u'prep', u'prep', u'pobj'), (u'amod', u'pobj', u'compound'), (u'dobj', u'acl', u'prep', u'pobj', u'compound'), (u'pobj', u'agent', u'ROOT', u'advcl', u'dobj'), (u'pobj', u'prep', u'xcomp', u'prep', u'pobj'), (u'amod', u'nsubj', u'ROOT', u'dobj', u'compound'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'ROOT', u'acl', u'prep', u'pobj', u'compound'), (u'attr', u'relcl', u'dobj', u'compound'), (u'compound', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'conj', u'pobj', u'acl', u'agent', u'pobj'), (u'compound', u'compound', u'attr'), (u'compound', u'nsubj', u'compound'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'acomp', u'prep', u'pcomp', u'dobj'), (u'pobj', u'prep', u'dobj', u'conj'), (u'pobj', u'prep', u'advcl', u'conj', u'prep', u'pobj'), (u'nsubjpass', u'acl', u'agent', u'pobj', u'conj'), (u'conj', u'dobj', u'ROOT', u'prep', u'pobj'), (u'dobj', u'ROOT', u'advcl', u'nsubj'), (u'nsubjpass', u'ROOT', u'prep', u'pcomp', u'dobj'), (u'nsubj', u'pcomp', u'dobj'), (u'amod', u'nsubj', u'ROOT', u'dobj'), (u'nsubj', u'acl', u'agent', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'dobj', u'amod', u'prep', u'pobj'), (u'conj', u'nmod', u'nsubj'), (u'pobj', u'prep', u'pobj', u'nmod'), (u'pobj', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'compound', u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'conj', u'conj', u'conj'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj', u'prep', u'pobj', u'prep', u'pobj'), (u'dobj', u'conj', u'prep', u'pcomp'), (u'dobj', u'prep', u'pcomp'), (u'nsubj', u'ROOT', u'advcl', u'dobj', u'conj'), (u'nsubjpass', u'pcomp', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound', u'amod'), (u'compound', u'pobj', u'acl', u'agent', u'pobj'), (u'pobj', u'prep', u'nsubjpass', u'prep', u'pobj'), (u'nsubj', u'nsubj', u'ROOT', u'dobj'), (u'pobj', u'prep', u'pobj', u'prep', u'nsubj', u'ROOT', u'attr'), (u'compound', u'nsubj', u'ROOT', u'dobj', u'amod'), (u'amod', u'nsubj', u'ROOT', u'prep', u'pobj', u'amod'), (u'nsubj', u'ROOT', u'ccomp', u'prep', u'pobj'), (u'ROOT', u'prep', u'prep', u'pobj'), (u'nsubjpass', u'ccomp', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'nsubjpass', u'ROOT', u'agent', u'pobj', u'compound'), (u'pobj', u'conj', u'acl', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'nsubj'), (u'pobj', u'relcl', u'prep', u'pobj', u'compound'), (u'compound', u'dobj', u'amod', u'prep', u'pobj'), (u'nsubjpass', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'ccomp', u'agent', u'pobj', u'compound'), (u'nsubj', u'csubj', u'prep', u'pobj'), (u'nsubj', u'advcl', u'dobj', u'amod'), (u'det', u'dobj', u'prep'), (u'nsubj', u'conj', u'acl', u'agent', u'pobj'), (u'pobj', u'acl', u'agent', u'pobj', u'amod'), (u'nsubj', u'ccomp', u'xcomp', u'dobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound', u'compound'), (u'dobj', u'relcl', u'dobj', u'conj'), (u'dobj', u'advcl', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'acl', u'prep', u'pobj', u'amod'), (u'conj', u'dobj', u'xcomp', u'prep', u'pobj'), (u'amod', u'pobj', u'prep', u'pobj'), (u'dobj', u'acl', u'agent', u'pobj', u'compound'), (u'conj', u'amod', u'prep', u'pobj'), (u'conj', u'prep', u'pobj', u'amod'), (u'amod', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound'), (u'dobj', u'relcl', u'dobj', u'conj', u'conj'), (u'nsubj', u'prep', u'pcomp'), (u'compound', u'attr', u'acl', u'dobj'), (u'nsubj', u'conj', u'dobj', u'prep', u'pobj'), (u'nsubj', u'nsubj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'advmod', u'pobj'), (u'compound', u'dobj', u'ROOT', u'prep', u'pobj', u'amod'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'nmod'), (u'compound', u'dobj', u'relcl', u'prep', u'pobj'), (u'conj', u'nmod', u'attr'), (u'pobj', u'prep', u'ROOT', u'ccomp', u'nsubj'), (u'pobj', u'relcl', u'dobj', u'amod'), (u'nsubjpass', u'ROOT', u'dobj'), (u'dobj', u'acl', u'dobj', u'prep', u'pobj'), (u'dobj', u'relcl', u'prep', u'prep', u'pobj'), (u'dobj', u'acl', u'prep', u'pobj', u'prep', u'pobj'), (u'dobj', u'amod', u'prep', u'pobj', u'amod'), (u'nsubj', u'auxpass', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'conj', u'prep', u'pobj'), (u'nsubj', u'conj'), (u'compound', u'npadvmod'), (u'pobj', u'prep', u'nsubj', u'conj', u'dobj'), (u'attr', u'prep', u'pobj', u'relcl', u'dobj'), (u'attr', u'acl', u'agent', u'pobj', u'compound'), (u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'dobj', u'acl', u'agent', u'pobj', u'conj'), (u'pobj', u'prep', u'ROOT', u'advcl', u'dobj'), (u'nsubj', u'ROOT', u'acomp', u'xcomp', u'prep', u'pcomp', u'dobj'), (u'attr', u'relcl', u'prep', u'pobj', u'prep', u'pobj'), (u'csubj', u'prep', u'pobj'), (u'compound', u'attr', u'acl', u'prep', u'pobj', u'compound'), (u'npadvmod', u'amod', u'pobj'), (u'dobj', u'prep', u'pobj', u'conj'), (u'pobj', u'prep', u'attr', u'ROOT', u'prep', u'pobj'), (u'attr', u'acl', u'nsubj'), (u'det', u'dobj', u'prep', u'pobj', u'amod'), (u'attr', u'amod', u'prep', u'pobj'), (u'nsubj', u'relcl', u'dobj', u'prep', u'pobj'), (u'nsubjpass', u'ccomp', u'agent', u'pobj', u'amod'), (u'compound', u'ROOT', u'compound'), (u'nsubj', u'advcl', u'prep', u'pobj', u'amod'), (u'compound', u'compound', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'prep', u'pobj'), (u'dobj', u'prep', u'pobj', u'relcl', u'dobj'), (u'compound', u'conj', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'attr', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pcomp', u'dobj'), (u'pobj', u'relcl', u'dobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'conj', u'pobj'), (u'nsubj', u'ROOT', u'acomp', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'acl'), (u'nsubj', u'relcl', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'xcomp', u'dobj', u'prep', u'pobj'), (u'conj', u'acl', u'prep', u'pobj'), (u'attr', u'acl', u'prep', u'pobj', u'amod'), (u'nsubj', u'ccomp', u'dobj', u'compound'), (u'nsubj', u'conj', u'attr', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'advcl', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'acl', u'prep', u'pcomp', u'dobj'), (u'pobj', u'acl', u'dobj', u'compound'), (u'nsubjpass', u'ROOT', u'oprd'), (u'compound', u'nsubj', u'conj', u'prep', u'pobj'), (u'pobj', u'acl', u'prep', u'pcomp', u'dobj'), (u'dobj', u'ROOT', u'prep', u'pobj', u'acl', u'dobj'), (u'pcomp', u'prep', u'pobj'), (u'appos', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'advcl', u'acomp', u'prep', u'pobj'), (u'compound', u'compound', u'nsubj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'prep', u'pobj', u'amod'), (u'nsubj', u'relcl', u'dobj', u'compound'), (u'pobj', u'prep', u'pcomp', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'acomp', u'pobj'), (u'dobj', u'csubj', u'prep', u'pobj'), (u'dobj', u'ROOT', u'advcl'), (u'amod', u'pobj', u'prep', u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'attr', u'acl', u'dobj', u'compound'), (u'compound', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound', u'compound'), (u'conj', u'nsubj', u'conj', u'prep', u'pobj'), (u'appos', u'nsubj', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj'), (u'pobj', u'prep', u'attr', u'relcl', u'nsubjpass'), (u'nsubj', u'ROOT', u'advcl', u'agent', u'pobj', u'compound'), (u'dobj', u'advmod', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'relcl', u'nsubj'), (u'nsubj', u'ROOT', u'dobj', u'acl', u'dobj', u'prep', u'pobj'), (u'dobj', u'relcl', u'advmod', u'prep', u'pobj'), (u'pobj', u'prep', u'conj', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pcomp', u'npadvmod'), (u'dobj', u'ROOT', u'agent', u'pobj'), (u'amod', u'appos', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'relcl', u'dobj'), (u'nsubj', u'ROOT', u'dobj', u'compound', u'amod'), (u'nsubj', u'acl', u'agent', u'pobj', u'amod'), (u'conj', u'prep', u'pobj', u'conj'), (u'pobj', u'prep', u'nsubj', u'ccomp', u'attr', u'prep', u'pobj'), (u'det', u'dobj', u'amod', u'prep'), (u'ROOT', u'prep', u'pobj', u'dobj', u'amod'), (u'nsubjpass', u'ROOT', u'prep', u'pcomp', u'dobj', u'compound'), (u'appos', u'nsubj', u'auxpass', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'compound', u'compound', u'compound'), (u'attr', u'ROOT', u'advmod'), (u'nsubj', u'ROOT', u'oprd'), (u'conj', u'nsubj', u'advcl', u'dobj'), (u'pobj', u'prep', u'pobj', u'prep', u'dobj', u'xcomp', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'prep', u'pobj', u'relcl', u'dobj'), (u'pobj', u'prep', u'attr', u'acl', u'prep', u'pobj'), (u'dobj', u'advcl', u'agent', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'prep', u'pobj', u'compound'), (u'poss', u'nsubj', u'ROOT', u'dobj', u'conj'), (u'pobj', u'prep', u'relcl', u'prep', u'pobj'), (u'amod', u'ROOT', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'dobj', u'relcl', u'pobj', u'prep', u'conj', u'relcl', u'nsubj', u'conj', u'acomp', u'prep', u'pobj'), (u'pobj', u'acl', u'nsubj'), (u'nsubj', u'advcl', u'ccomp', u'nsubj'), (u'attr', u'relcl', u'advcl', u'dobj'), (u'nsubj', u'ROOT', u'acomp', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'conj', u'acl', u'prep', u'pobj', u'nmod'), (u'conj', u'pobj', u'acl', u'prep', u'pobj'), (u'appos', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'conj', u'prep', u'pobj', u'amod', u'amod', u'npadvmod'), (u'nsubj', u'auxpass', u'ROOT', u'prep', u'pobj', u'compound', u'compound'), (u'nsubj', u'ROOT', u'advmod', u'advmod'), (u'pobj', u'prep', u'dobj', u'ROOT', u'prep', u'amod'), (u'amod', u'ROOT'), (u'compound', u'compound', u'pobj', u'prep', u'ROOT', u'appos', u'conj'), (u'conj', u'dobj', u'advcl', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'conj', u'agent', u'pobj'), (u'nsubjpass', u'ROOT', u'advmod', u'aux'), (u'dobj', u'relcl', u'dobj', u'amod'), (u'dobj', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'prep', u'pobj', u'prep'), (u'pobj', u'prep', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'nmod', u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'attr', u'relcl', u'nsubj'), (u'pobj', u'prep', u'pcomp', u'dobj'), (u'pobj', u'amod', u'prep', u'pobj', u'amod'), (u'dobj', u'xcomp', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'nsubjpass', u'ROOT', u'xcomp', u'prt', u'pobj'), (u'dobj', u'prep', u'pobj', u'conj', u'conj'), (u'nsubj', u'acl', u'attr'), (u'dobj', u'relcl', u'ccomp', u'nsubj'), (u'attr', u'relcl', u'prep', u'pobj', u'compound'), (u'compound', u'pobj', u'acl', u'dobj'), (u'pobj', u'prep', u'advcl', u'advcl', u'ROOT', u'auxpass', u'nsubj'), (u'nsubj', u'ROOT', u'prep', u'advmod'), (u'compound', u'ROOT', u'prep', u'prep', u'pobj'), (u'poss', u'nsubj', u'ROOT', u'prep'), (u'attr', u'acl', u'dobj', u'prep', u'pobj'), (u'dobj', u'relcl', u'dobj', u'prep', u'pobj', u'amod'), (u'pobj', u'prep', u'nsubj', u'conj', u'prep', u'prep', u'pobj'), (u'compound', u'poss', u'ROOT', u'prep', u'pobj'), (u'pobj', u'prep', u'dobj', u'relcl', u'prep', u'pobj'), (u'advcl', u'dobj'), (u'pcomp', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'prep', u'pobj', u'conj'), (u'dobj', u'acl', u'nsubj'), (u'nsubj', u'ROOT', u'xcomp', u'dobj', u'compound'), (u'conj', u'acl', u'conj'), (u'pobj', u'prep', u'ROOT', u'prep', u'pcomp', u'npadvmod'), (u'pobj', u'conj', u'prep', u'pobj', u'prep', u'pobj', u'prep', u'nsubjpass', u'ROOT', u'prep', u'pobj'), (u'det', u'pobj', u'relcl', u'dobj', u'amod'), (u'nsubj', u'conj', u'ccomp', u'nsubj'), (u'dobj', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'ccomp', u'csubj', u'prep', u'pobj'), (u'compound', u'dobj', u'acl', u'prep', u'pobj', u'amod'), (u'amod', u'dobj', u'relcl', u'prep', u'pobj', u'compound'), (u'nsubjpass', u'ROOT', u'advcl', u'xcomp', u'prep', u'pobj'), (u'compound', u'nsubjpass', u'advcl', u'prep', u'pobj'), (u'pobj', u'prep', u'dobj', u'ROOT', u'ccomp'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj', u'conj'), (u'compound', u'dative'), (u'compound', u'nsubjpass', u'prep', u'pobj', u'amod'), (u'advmod', u'prep', u'pobj'), (u'amod', u'attr', u'relcl', u'dobj', u'compound'), (u'conj', u'nsubjpass', u'ROOT', u'agent', u'pobj', u'appos', u'conj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'relcl', u'dobj', u'conj'), (u'dobj', u'appos', u'conj', u'prep', u'pobj', u'relcl', u'dobj'), (u'attr', u'conj', u'acl', u'prep', u'pobj'), (u'nmod', u'ROOT', u'prep', u'pobj'), (u'ROOT', u'prep', u'pcomp'), (u'poss', u'nsubj', u'ROOT', u'conj', u'conj'), (u'compound', u'nmod'), (u'compound', u'conj', u'prep'), (u'pobj', u'prep', u'nsubj', u'nsubj', u'ROOT'), (u'nsubj', u'conj', u'prep', u'pcomp', u'nsubj'), (u'nsubj', u'ROOT', u'dobj', u'relcl', u'dobj'), (u'nmod', u'npadvmod', u'compound'), (u'acomp', u'relcl', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'advcl', u'advcl', u'conj', u'conj'), (u'compound', u'nsubj', u'compound', u'compound'), (u'compound', u'attr', u'relcl', u'dobj'), (u'compound', u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'dobj', u'amod'), (u'attr', u'acl', u'dobj', u'conj', u'conj'), (u'npadvmod', u'ROOT', u'dobj'), (u'nsubj', u'ROOT', u'dobj', u'compound', u'punct'), (u'ROOT', u'ccomp', u'dobj'), (u'dobj', u'conj', u'prep', u'pobj', u'conj'), (u'ROOT', u'conj', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'amod'), (u'nsubjpass', u'ROOT', u'conj', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'prep', u'advcl', u'prep', u'pobj'), (u'compound', u'ROOT', u'dobj'), (u'nsubj', u'ROOT', u'attr', u'relcl', u'agent', u'pobj'), (u'nsubj', u'conj', u'relcl', u'nsubj'), (u'compound', u'pobj', u'agent', u'acl', u'dep', u'ROOT', u'nsubj'), (u'amod', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj'), (u'dobj', u'relcl', u'oprd', u'prep', u'pobj'), (u'pobj', u'prep', u'conj', u'ROOT', u'amod', u'prep', u'pobj'), (u'dobj', u'relcl', u'conj', u'dobj', u'conj', u'conj'), (u'nsubjpass', u'prep', u'pobj', u'amod'), (u'nsubj', u'ccomp', u'prep', u'pobj', u'acl', u'dobj'), (u'attr', u'acl', u'dobj', u'nmod'), (u'dobj', u'acl', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'prep', u'pobj', u'amod'), (u'compound', u'compound', u'nsubjpass'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'nmod'), (u'pobj', u'prep', u'ROOT', u'acl', u'agent', u'pobj'), (u'attr', u'prep', u'conj', u'pobj', u'acl', u'agent', u'pobj', u'amod'), (u'dobj', u'relcl', u'nsubj', u'ROOT', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'attr', u'acl', u'dobj'), (u'conj', u'pobj', u'prep', u'csubj', u'ROOT', u'prep', u'pobj'), (u'nsubjpass', u'relcl', u'attr', u'prep', u'pobj'), (u'pobj', u'prep', u'ROOT', u'compound'), (u'compound', u'dobj', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'nsubj', u'advcl', u'conj', u'dobj'), (u'dobj', u'conj', u'prep', u'pobj', u'compound', u'compound'), (u'compound', u'nsubj', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'ccomp', u'attr'), (u'det', u'conj', u'nsubjpass', u'ROOT', u'advmod', u'det'), (u'pobj', u'prep', u'nsubjpass', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'acl', u'prep', u'pobj', u'conj'), (u'nsubj', u'ROOT', u'ccomp', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'dobj', u'xcomp', u'prep', u'pobj', u'prep', u'pobj'), (u'conj', u'prep', u'pobj', u'conj', u'amod'), (u'nsubjpass', u'ccomp', u'dobj'), (u'oprd', u'acl', u'agent', u'pobj'), (u'acl', u'nsubj', u'ROOT', u'dobj'), (u'dobj', u'ROOT', u'conj', u'dobj'), (u'conj', u'nmod', u'advmod'), (u'conj', u'dobj', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'acl', u'dobj'), (u'compound', u'nsubj', u'ROOT', u'advcl'), (u'dobj', u'prep', u'pobj', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'nmod'), (u'conj', u'conj', u'attr', u'prep', u'pobj'), (u'amod', u'dobj', u'advcl', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'nsubj'), (u'nsubj', u'advcl', u'ROOT', u'nsubj'), (u'pobj', u'acl', u'conj', u'dobj'), (u'pobj', u'prep', u'pobj', u'relcl', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'prep', u'ROOT', u'ccomp', u'nsubj', u'conj'), (u'dobj', u'ROOT', u'xcomp', u'dobj', u'acl', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'xcomp', u'prep', u'pobj', u'amod'), (u'nsubj', u'ROOT', u'dobj', u'nmod', u'pcomp', u'punct'), (u'csubj', u'dobj'), (u'dobj', u'relcl', u'attr', u'acl', u'prep', u'pcomp', u'dobj'), (u'pobj', u'prep', u'pobj', u'prep', u'pobj', u'prep', u'pobj'), (u'ROOT', u'acl', u'prep', u'pobj', u'conj', u'dobj'), (u'nsubjpass', u'ROOT', u'conj', u'aux'), (u'amod', u'ccomp'), (u'nsubj', u'ROOT', u'dobj', u'relcl', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'acl', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'ccomp', u'nsubjpass'), (u'dobj', u'acl', u'dobj', u'amod'), (u'dobj', u'acl', u'xcomp', u'prep', u'pobj', u'amod'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj', u'compound', u'compound'), (u'amod', u'pobj', u'advcl', u'dobj'), (u'conj', u'nsubj', u'ROOT', u'advcl', u'dobj', u'relcl', u'prep', u'pobj'), (u'attr', u'acl', u'dobj', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'advcl', u'prep', u'prep', u'pobj'), (u'conj', u'advcl', u'acl', u'dobj'), (u'dobj', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj', u'conj'), (u'compound', u'dobj', u'conj', u'prep', u'pobj'), (u'amod', u'pobj', u'prep', u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'attr', u'acl', u'agent', u'pobj', u'prep', u'pobj'), (u'nsubj', u'conj', u'acomp', u'prep', u'pobj'), (u'det', u'dobj', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'pobj', u'amod'), (u'compound', u'nsubj', u'ccomp', u'prep', u'pobj'), (u'conj', u'pobj', u'prep', u'ccomp', u'ROOT', u'conj', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'advcl', u'prep', u'pcomp', u'dep', u'dobj', u'prep', u'pobj'), (u'dep', u'acl', u'prep', u'pobj'), (u'dobj', u'advcl', u'dobj', u'compound'), (u'nsubj', u'conj', u'conj', u'acl', u'agent', u'pobj'), (u'dobj', u'acl', u'ccomp', u'nsubj'), (u'npadvmod', u'acl', u'agent', u'pobj'), (u'compound', u'compound', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'dobj', u'ROOT', u'ccomp', u'nsubjpass'), (u'pobj', u'prep', u'dobj', u'relcl', u'prep', u'pobj', u'prep', u'pobj'), (u'conj', u'acl', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj'), (u'dobj', u'relcl', u'prep', u'pcomp'), (u'dobj', u'pcomp', u'dobj'), (u'nsubj', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'relcl', u'dobj', u'compound'), (u'nsubjpass', u'relcl', u'nsubj'), (u'nsubj', u'advcl'), (u'dobj', u'conj', u'xcomp'), (u'nsubj', u'ROOT', u'xcomp', u'attr', u'compound'), (u'pobj', u'acl', u'nsubjpass'), (u'compound', u'nsubjpass', u'ROOT', u'prep', u'prep', u'pobj'), (u'nsubj', u'prep', u'prep', u'pobj', u'relcl', u'dobj'), (u'pobj', u'acl', u'agent', u'pobj', u'conj', u'compound'), (u'nsubjpass', u'ROOT', u'agent', u'conj', u'pobj', u'amod'), (u'nsubj', u'compound', u'nsubj', u'prep'), (u'nsubjpass', u'prep', u'pcomp'), (u'dobj', u'pcomp', u'prep', u'ROOT', u'nsubj', u'prep', u'pobj'), (u'nsubj', u'conj', u'prep', u'pobj', u'compound'), (u'acl', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'prep', u'dobj'), (u'pobj', u'prep', u'pobj', u'dobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'amod', u'aux'), (u'nsubj', u'relcl', u'attr', u'prep', u'pobj'), (u'compound', u'pobj', u'prep', u'pobj', u'compound'), (u'attr', u'prep', u'pobj', u'conj', u'compound'), (u'nsubj', u'ROOT', u'advcl', u'prep', u'prep', u'pobj'), (u'ccomp', u'amod', u'agent', u'pobj'), (u'pobj', u'prep', u'advcl', u'ROOT', u'nsubjpass'), (u'ROOT', u'prep', u'pobj', u'dobj', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj', u'conj', u'conj', u'conj', u'conj', u'conj', u'conj', u'conj'), (u'pobj', u'prep', u'pobj', u'prep', u'ROOT', u'dobj'), (u'advcl', u'acl', u'xcomp', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'npadvmod', u'compound'), (u'nsubj', u'compound', u'nsubj'), (u'det', u'dobj', u'prep', u'pobj', u'det'), (u'nsubj', u'ccomp', u'xcomp'), (u'nummod', u'npadvmod', u'amod', u'nsubjpass', u'ROOT', u'prep'), (u'conj', u'pobj', u'prep', u'dobj', u'ccomp', u'xcomp', u'acomp', u'ROOT', u'conj', u'dobj'), (u'poss', u'dobj', u'prep', u'pobj', u'nummod'), (u'compound', u'pobj', u'relcl', u'prep', u'pobj'), (u'ROOT', u'acl', u'prep', u'pcomp', u'dobj'), (u'poss', u'pobj', u'compound'), (u'acl', u'dobj', u'conj', u'prep', u'pobj', u'conj'), (u'appos', u'attr', u'relcl', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'acl', u'prep', u'pcomp'), (u'attr', u'ROOT', u'conj', u'agent', u'pobj'), (u'meta', u'dobj', u'relcl', u'prep', u'pobj', u'amod'), (u'pobj', u'prep', u'xcomp', u'ROOT', u'ccomp', u'prep', u'pobj'), (u'poss', u'dobj', u'relcl', u'dobj'), (u'nsubj', u'csubj', u'ROOT', u'prep', u'pobj'), (u'compound', u'attr', u'acl', u'prep', u'pobj'), (u'pobj', u'agent', u'ROOT', u'xcomp', u'dobj'), (u'pobj', u'relcl', u'agent', u'pobj', u'relcl', u'dobj'), (u'compound', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'ccomp', u'nsubjpass', u'nummod', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj', u'compound'), (u'compound', u'conj', u'dobj', u'xcomp', u'prep', u'pobj'), (u'compound', u'nsubjpass', u'ROOT', u'xcomp', u'dobj'), (u'pobj', u'prep', u'advcl', u'advmod', u'prep', u'pobj'), (u'pobj', u'prep', u'attr', u'relcl', u'prep', u'pobj'), (u'poss', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'relcl', u'xcomp'), (u'nsubj', u'ROOT', u'prep', u'pcomp', u'prep', u'pcomp', u'dobj'), (u'nmod', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj'), (u'nsubjpass', u'pcomp', u'agent', u'pobj'), (u'advcl', u'ROOT', u'prep', u'pcomp'), (u'amod', u'nsubjpass', u'ROOT', u'advmod', u'prep', u'pobj'), (u'conj', u'pobj', u'prep', u'pobj', u'prep', u'dobj', u'ROOT', u'prep', u'pobj'), (u'amod', u'compound', u'pobj', u'prep', u'pobj', u'conj'), (u'nsubj', u'ROOT', u'acomp', u'prep', u'pcomp', u'npadvmod'), (u'amod', u'pobj', u'prep', u'pobj', u'prep', u'ROOT', u'conj', u'dobj'), (u'pobj', u'prep', u'ROOT', u'prep', u'pobj', u'amod'), (u'compound', u'compound', u'conj', u'conj'), (u'dobj', u'ROOT', u'advcl', u'advcl'), (u'det', u'pobj', u'relcl', u'dobj', u'prep'), (u'pobj', u'agent', u'advcl', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'nsubjpass', u'acl', u'dobj', u'prep', u'pobj'), (u'pobj', u'agent', u'ROOT', u'advcl', u'dobj', u'prep', u'pobj'), (u'ROOT', u'conj', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'xcomp', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'nsubj', u'ccomp', u'attr', u'prep', u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'nsubjpass', u'prep', u'pobj', u'amod', u'conj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'ccomp', u'nsubj', u'amod'), (u'pobj', u'conj', u'prep', u'pobj', u'prep', u'dobj', u'ROOT', u'prep', u'pcomp'), (u'nsubj', u'ROOT', u'conj', u'prep', u'pcomp', u'dobj'), (u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj', u'amod'), (u'ROOT', u'prep', u'pobj', u'acl', u'prep', u'pobj'), (u'conj', u'acl', u'dobj'), (u'nsubj', u'ROOT', u'dobj', u'conj', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'compound', u'punct'), (u'amod', u'nsubj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'acl', u'prep', u'pcomp', u'conj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'dobj'), (u'conj', u'attr', u'csubj', u'ROOT', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'npadvmod', u'prep', u'pobj', u'compound', u'compound', u'compound'), (u'nsubjpass', u'advmod', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'ccomp', u'nsubj', u'compound'), (u'compound', u'ROOT', u'dobj', u'acl', u'dobj'), (u'nsubj', u'ROOT', u'dobj', u'acl'), (u'pobj', u'prep', u'advcl', u'prep', u'pobj', u'compound'), (u'amod', u'ROOT', u'prep', u'pcomp', u'dobj'), (u'pobj', u'prep', u'conj', u'agent', u'pobj'), (u'npadvmod', u'relcl', u'prep', u'pobj'), (u'pobj', u'ROOT', u'pobj', u'compound'), (u'dobj', u'xcomp', u'ROOT', u'conj', u'agent', u'pobj'), (u'dobj', u'relcl', u'agent', u'pobj', u'acl', u'dobj'), (u'dobj', u'prep', u'pobj', u'conj', u'relcl'), (u'det', u'dobj', u'relcl', u'dobj', u'compound'), (u'attr', u'conj', u'relcl', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'nsubjpass', u'ROOT', u'advcl', u'nsubj', u'amod'), (u'advcl', u'dobj', u'prep', u'pobj', u'poss', u'case'), (u'amod', u'acomp', u'prep', u'pobj'), (u'conj', u'dobj', u'ccomp', u'conj', u'dobj', u'conj', u'amod'), (u'pobj', u'prep', u'acl', u'pobj', u'prep', u'advmod', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'advcl', u'xcomp', u'agent', u'pobj'), (u'attr', u'relcl', u'attr'), (u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'poss'), (u'compound', u'dobj', u'acl', u'dobj', u'ROOT', u'npadvmod'), (u'conj', u'nsubj', u'acl', u'nsubjpass', u'ROOT', u'nsubjpass', u'compound'), (u'pobj', u'prep', u'pobj', u'relcl', u'dobj'), (u'pobj', u'acl', u'pobj', u'compound'), (u'pobj', u'prep', u'acl', u'prep', u'pcomp'), (u'conj', u'nsubj', u'ROOT', u'compound'), (u'conj', u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pcomp', u'xcomp', u'attr', u'amod'), (u'nsubjpass', u'ROOT', u'agent', u'conj', u'pobj', u'compound'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'xcomp', u'dobj', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'pobj', u'prep', u'dobj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'acl', u'nsubj'), (u'attr', u'relcl', u'prep', u'pobj', u'amod'), (u'compound', u'pobj', u'prep', u'ccomp', u'ROOT', u'ccomp'), (u'amod', u'nsubj', u'compound'), (u'dobj', u'prep', u'pobj', u'prep', u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'pobj', u'prep', u'nsubj', u'ccomp', u'prep', u'pobj', u'prep', u'pobj'), (u'det', u'dobj', u'prep', u'pobj', u'poss'), (u'dobj', u'csubj', u'ROOT', u'prep', u'pobj'), (u'nsubj', u'ccomp', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj'), (u'dobj', u'conj', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'dobj', u'prep', u'pobj', u'compound', u'compound'), (u'pobj', u'prep', u'pobj', u'acl', u'conj', u'agent', u'pobj'), (u'conj', u'pobj', u'prep', u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'nsubjpass', u'ROOT', u'conj', u'dobj'), (u'nsubj', u'prep', u'pobj', u'prep', u'pobj', u'amod'), (u'dobj', u'acl', u'pobj', u'dative', u'ROOT', u'dobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj', u'amod'), (u'pobj', u'relcl', u'agent', u'pobj', u'prep', u'pobj'), (u'pobj', u'acl', u'prep', u'pobj', u'compound', u'compound', u'amod'), (u'nsubj', u'advcl', u'conj', u'agent', u'pobj', u'amod'), (u'attr', u'ROOT', u'ccomp', u'dobj'), (u'nsubj', u'ROOT', u'dobj', u'appos', u'compound'), (u'nsubj', u'ROOT', u'prep', u'nmod', u'prep', u'punct'), (u'nsubj', u'advcl', u'prep', u'pcomp', u'nsubj'), (u'attr', u'prep', u'pobj', u'acl', u'agent', u'pobj', u'conj', u'conj'), (u'conj', u'conj', u'pobj', u'acl', u'dobj'), (u'compound', u'pobj', u'prep', u'ROOT', u'advcl', u'conj', u'prep', u'pobj'), (u'amod', u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj', u'prep', u'pobj'), (u'pobj', u'conj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dep', u'prep', u'pobj'), (u'nsubj', u'ccomp'), (u'compound', u'advcl', u'prep', u'pobj'), (u'ROOT', u'acl', u'ccomp', u'nsubjpass'), (u'pobj', u'prep', u'dobj', u'csubj', u'ccomp', u'attr'), (u'ROOT', u'advcl', u'nsubj'), (u'pobj', u'prep', u'nsubjpass', u'acl', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'dobj', u'acl', u'advcl', u'dobj'), (u'det', u'dobj', u'ROOT', u'prep', u'pobj', u'det'), (u'prep', u'pcomp', u'dobj', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'amod', u'npadvmod'), (u'nsubj', u'parataxis', u'ROOT', u'dobj'), (u'poss', u'pobj', u'prt', u'pobj'), (u'appos', u'dobj', u'ROOT', u'npadvmod'), (u'pobj', u'prep', u'pobj', u'relcl', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'amod', u'dobj', u'conj', u'prep', u'pobj', u'poss'), (u'nsubjpass', u'prep', u'pcomp', u'dobj'), (u'attr', u'acl', u'agent', u'pobj', u'relcl', u'conj', u'prep', u'pobj', u'compound'), (u'amod', u'nsubjpass', u'ccomp', u'prep', u'pobj'), (u'pobj', u'prep', u'dobj', u'ccomp', u'prep', u'pobj'), (u'nsubjpass', u'nsubjpass', u'agent', u'pobj', u'amod'), (u'pobj', u'prep', u'advmod', u'ROOT', u'dobj'), (u'nsubj', u'ROOT', u'dobj', u'appos', u'conj'), (u'dobj', u'prep', u'pobj', u'relcl', u'agent', u'pobj', u'conj'), (u'compound', u'compound', u'ROOT', u'prep', u'pobj'), (u'compound', u'dobj', u'acl', u'prep', u'pobj'), (u'dobj', u'ROOT', u'conj', u'prep', u'pobj', u'relcl', u'prep', u'pobj'), (u'pobj', u'agent', u'ROOT', u'conj', u'prep', u'pobj', u'amod'), (u'nsubj', u'acl', u'prep', u'pcomp', u'dobj'), (u'nsubj', u'ROOT', u'advcl', u'npadvmod'), (u'appos', u'prep', u'pobj', u'conj'), (u'nsubj', u'ROOT', u'prep', u'pcomp', u'nsubj'), (u'mark', u'prep', u'pobj'), (u'dobj', u'ROOT', u'prep', u'prep', u'pobj'), (u'dobj', u'csubj', u'prep', u'pobj', u'compound'), (u'nsubj', u'ROOT', u'attr', u'conj', u'prep', u'pobj'), (u'nsubj', u'conj', u'attr', u'prep', u'pobj', u'prep', u'pobj'), (u'advcl', u'acl', u'agent', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'appos', u'amod'), (u'pobj', u'relcl', u'dobj', u'acl', u'dobj'), (u'pobj', u'prep', u'nsubjpass', u'ccomp', u'prep', u'pobj'), (u'conj', u'conj', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'auxpass', u'ROOT', u'agent', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'prep', u'pobj', u'conj', u'conj', u'conj', u'prep', u'pobj'), (u'dobj', u'ROOT', u'advcl', u'prep', u'pcomp', u'dobj'), (u'pobj', u'prep', u'ROOT', u'prep', u'pobj', u'compound'), (u'compound', u'dobj', u'conj', u'pcomp', u'prep', u'acomp', u'relcl', u'nsubj', u'ROOT', u'prep', u'pobj', u'conj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'acl', u'advcl', u'prep', u'pobj'), (u'relcl', u'prep'), (u'nsubj', u'ccomp', u'acomp', u'prep', u'pobj', u'amod', u'conj', u'punct'), (u'nsubj', u'ROOT', u'prep', u'advmod', u'acomp', u'prep', u'pobj'), (u'pobj', u'prep', u'nsubj', u'advcl', u'dobj'), (u'conj', u'nsubj', u'ROOT', u'attr'), (u'pobj', u'prep', u'advmod', u'dobj', u'conj'), (u'amod', u'dobj', u'csubj', u'ROOT', u'prep', u'pobj', u'amod'), (u'compound', u'pobj', u'prep', u'attr', u'ROOT', u'advcl', u'prep', u'pobj'), (u'dobj', u'xcomp', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'advcl', u'agent', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'relcl', u'dobj', u'conj'), (u'dobj', u'ROOT', u'xcomp', u'dobj', u'prep', u'pobj'), (u'compound', u'pobj', u'prep', u'ROOT', u'nsubj'), (u'pobj', u'acl', u'agent', u'pobj', u'appos'), (u'pobj', u'prep', u'nsubjpass', u'ccomp', u'agent', u'pobj'), (u'pobj', u'prep', u'dobj', u'xcomp', u'prep', u'pobj'), (u'pobj', u'relcl', u'prep', u'prep', u'pobj'), (u'compound', u'attr', u'acl', u'prep', u'pcomp', u'dobj', u'compound', u'compound'), (u'pobj', u'prep', u'advcl', u'ROOT', u'nsubj'), (u'mark', u'ccomp'), (u'conj', u'ROOT', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'prep', u'pcomp', u'nsubj'), (u'conj', u'pobj', u'relcl', u'agent', u'pobj'), (u'dobj', u'xcomp', u'amod', u'pobj', u'prep', u'nsubjpass', u'ROOT', u'nsubjpass'), (u'cc', u'pobj', u'prep', u'pobj', u'det'), (u'nsubjpass', u'acl', u'prep', u'pcomp', u'dobj'), (u'ROOT', u'relcl', u'dobj', u'compound'), (u'ROOT', u'prep', u'pobj', u'acl', u'dobj'), (u'nsubj', u'ROOT', u'conj', u'prep', u'pobj', u'acl', u'dobj'), (u'pobj', u'prep', u'nsubjpass', u'ccomp', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'prep', u'acomp', u'prep', u'pobj'), (u'pobj', u'ROOT', u'pobj', u'nsubj'), (u'amod', u'pobj', u'prep', u'pobj', u'compound'), (u'nmod', u'dobj'), (u'dobj', u'prep', u'pobj', u'prep', u'pobj', u'acl', u'agent', u'pobj', u'compound'), (u'amod', u'nsubj', u'ROOT', u'dobj', u'amod'), (u'det', u'ROOT', u'compound'), (u'conj', u'nsubj', u'ROOT', u'dobj', u'prep', u'pobj', u'conj', u'conj'), (u'acl', u'nsubjpass', u'ROOT', u'agent', u'pobj'), (u'poss', u'nsubj', u'prep', u'pcomp', u'dobj'), (u'pobj', u'prep', u'dobj', u'pcomp', u'prep', u'nsubj', u'ROOT', u'nsubj'), (u'ROOT', u'dobj'), (u'ROOT', u'parataxis', u'attr', u'acl', u'agent', u'pobj', u'dobj'), (u'attr', u'prep', u'pobj', u'relcl', u'prep', u'pobj', u'amod'), (u'nsubj', u'acl', u'agent', u'pobj', u'poss'), (u'nsubj', u'ccomp', u'dobj', u'amod'), (u'attr', u'advcl', u'dobj'), (u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj'), (u'conj', u'nsubj', u'ROOT', u'nsubj'), (u'amod', u'appos'), (u'nsubj', u'ROOT', u'prep', u'pcomp', u'dobj', u'prep', u'pobj'), (u'dobj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj', u'nmod'), (u'compound', u'dobj', u'prep'), (u'ROOT', u'acl', u'prep', u'pobj', u'amod'), (u'pobj', u'conj', u'poss'), (u'pobj', u'prep', u'nsubj', u'ccomp', u'nsubj'), (u'attr', u'acl', u'nsubjpass'), (u'conj', u'conj', u'dobj', u'relcl', u'dobj', u'conj', u'conj', u'conj'), (u'pobj', u'prep', u'dobj', u'ROOT', u'advcl', u'nsubj'), (u'poss', u'pobj', u'prep', u'ROOT', u'nsubj'), (u'nsubj', u'relcl', u'prep', u'pobj', u'prep', u'pobj', u'prep', u'pobj', u'amod'), (u'nsubj', u'ROOT', u'dobj', u'prep', u'prep', u'pobj'), (u'dobj', u'pcomp', u'prep', u'pobj', u'prep', u'pobj'), (u'amod', u'dobj', u'acl', u'prep', u'pobj'), (u'attr', u'ROOT', u'advcl', u'dobj'), (u'compound', u'dobj', u'ROOT', u'prep', u'pobj', u'compound'), (u'pobj', u'prep', u'dobj', u'relcl', u'nsubj'), (u'nsubjpass', u'ROOT', u'agent', u'pobj', u'prep', u'pobj', u'conj'), (u'pobj', u'prep', u'dobj', u'advcl', u'xcomp', u'dobj'), (u'pobj', u'prep', u'pobj', u'prep', u'nsubjpass', u'ROOT', u'agent', u'pobj', u'appos'), (u'nsubj', u'ROOT', u'advmod', u'prep', u'pobj', u'acl', u'agent', u'pobj'), (u'appos', u'prep', u'pobj', u'relcl', u'dobj'), (u'pobj', u'acl', u'prep', u'pobj', u'amod'), (u'dobj', u'ccomp', u'prep', u'pobj', u'amod'), (u'dobj', u'relcl', u'conj', u'prep', u'pobj'), (u'ROOT', u'relcl', u'agent', u'pobj', u'compound'), (u'dobj', u'conj', u'advmod', u'prep', u'pobj'), (u'pobj', u'prep', u'pobj', u'conj', u'conj'), (u'conj', u'dobj', u'ccomp', u'conj', u'dobj'), (u'amod', u'conj'), (u'nsubj', u'ROOT', u'amod'), (u'conj', u'dobj', u'nsubj', u'ROOT', u'dobj'), (u'attr', u'relcl', u'ccomp', u'nsubj'), (u'nsubj', u'conj', u'prep', u'pobj', u'prep', u'pobj'), (u'pobj', u'acl', u'dobj', u'amod'), (u'compound', u'nsubj', u'relcl', u'dobj'), (u'attr', u'prep', u'pobj', u'acl', u'agent', u'pobj', u'prep', u'pobj'), (u'nsubj', u'ROOT', u'attr', u'conj'), (u'pobj', u'prep', u'dobj', u'xcomp', u'advcl', u'prep', u'pobj'), (u'nsubj', u'auxpass', u'ccomp', u'agent', u'pobj'), (u'pobj', u'prep', u'conj', u'prep', u'pobj'), (u'nsubj', u'conj', u'prep', u'pobj', u'prep', u'pobj', u'compound'), (u'conj', u'pobj', u'prep', u'nsubj', u'ROOT', u'dobj'), (u'cc', u'ROOT', u'conj', u'dobj', u'det'), (u'pobj', u'prep', u'attr', u'ROOT', u'ccomp', u'attr', u'prep', u'pobj'), (u'compound', u'ROOT', u'prep', u'pcomp', u'prep', u'pobj'), (u'intj', u'ROOT', u'prep', u'prep', u'pobj'), (u'conj', u'conj', u'dobj'), (u'dobj', u'ROOT', u'xcomp', u'prep', u'pobj', u'compound'), (u'pobj', u'acl', u'advmod', u'prep', u'pobj'), (u'nsubjpass', u'ROOT', u'advmod', u'pobj'), (u'nsubj', u'ROOT', u'csubj', u'dobj'), (u'pobj', u'prep', u'dobj', u'advcl', u'ROOT', u'nsubjpass'), (u'nmod', u'nsubj', u'ROOT'), (u'amod', u'pobj', u'prep', u'pobj', u'acl', u'prep', u'pobj', u'amod'), (u'dobj', u'acl', u'attr', u'conj'), (u'nsubj', u'ROOT', u'prep', u'pobj', u'prep', u'pobj', u'prep', u'pobj'), (u'conj', u'nsubj', u'ROOT', u'acomp', u'prep', u'pcomp', u'dobj'), (u'nsubj', u'ROOT', u'advcl', u'nsubj', u'compound'), (u'amod', u'pobj', u'prep', u'nsubj', u'ROOT', u'prep', u'pobj'), (u'conj', u'dobj', u'relcl', u'prep', u'pobj'), (u'compound', u'appos', u'nsubj', u'ROOT', u'attr', u'prep', u'pobj', u'amod'), (u'ROOT', u'acl', u'appos'), (u'dobj', u'relcl', u'agent', u'pobj', u'conj'), (u'nsubjpass', u'ROOT', u'prep', u'pobj', u'acl', u'nsubj', u'conj'), (u'compound', u'dobj', u'ROOT', u'advcl', u'prep', u'pobj', u'prep', u'pobj'), (u'nmod', u'dobj', u'conj')])
\ No newline at end of file
+"""
+The dependency structures we keep SDPs for: the sequence of dep labels along a path, from X to Y.
+
+They live in sdp_dep_structures.txt, one structure per line with its labels separated by spaces.
+`DepTrie` compiles them into a trie, over the labels themselves or (through `mapped`) over dep ids,
+so a path can be checked one label at a time as it's walked and dropped at the first label that leaves the trie.
+"""
+from __future__ import print_function
+import io
+import os
+
+STRUCTURES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sdp_dep_structures.txt')
+
+def load_dep_structures(filename=STRUCTURES_FILE):
+    """The set of ok dep structures as tuples of labels"""
+    with io.open(filename, 'r', encoding='utf-8') as f:
+        return set( tuple(line.split()) for line in f if line.strip() )
+
+class DepTrie(object):
+    """Trie over dep structures
+
+    Nodes are ints, ROOT is the empty path.  `step` follows one label and returns REJECT if no structure
+    continues that way, `accepts_path` walks a whole (possibly lazy) sequence and stops at the first bad label.
+    """
+    ROOT = 0
+    REJECT = -1
+
+    def __init__(self, structures=()):
+        self._children = [{}]
+        self._accepting = [False]
+        self._size = 0
+        self._reversed = None
+        for structure in structures:
+            self.add(structure)
+
+    def add(self, structure):
+        node = self.ROOT
+        for label in structure:
+            child = self._children[node].get(label)
+            if child is None:
+                child = len(self._children)
+                self._children[node][label] = child
+                self._children.append({})
+                self._accepting.append(False)
+            node = child
+        if not self._accepting[node]:
+            self._accepting[node] = True
+            self._size += 1
+        self._reversed = None
+
+    def step(self, node, label):
+        if node == self.REJECT:
+            return self.REJECT
+        return self._children[node].get(label, self.REJECT)
+
+    def accepting(self, node):
+        return node != self.REJECT and self._accepting[node]
+
+    def accepts_path(self, labels):
+        """Whether a sequence of labels is one of the structures, without looking past the first label that isn't"""
+        children = self._children
+        node = self.ROOT
+        for label in labels:
+            node = children[node].get(label)
+            if node is None:
+                return False
+        return self._accepting[node]
+
+    def __contains__(self, structure):
+        return self.accepts_path(structure)
+
+    def __len__(self):
+        return self._size
+
+    def structures(self):
+        """Every structure in the trie, as tuples"""
+        found = []
+        stack = [(self.ROOT, ())]
+        while stack:
+            node, prefix = stack.pop()
+            if self._accepting[node]:
+                found.append(prefix)
+            for label, child in self._children[node].items():
+                stack.append((child, prefix + (label,)))
+        return found
+
+    def reversed(self):
+        """The trie of the structures read backwards, built once
+
+        Stepping it with a path's labels from the Y end rejects as soon as they can't end any structure"""
+        if self._reversed is None:
+            self._reversed = DepTrie( tuple(reversed(structure)) for structure in self.structures() )
+        return self._reversed
+
+    def mapped(self, label2int):
+        """The same trie over ids, structures with a label that isn't in `label2int` can't match and are left out"""
+        return DepTrie( tuple(label2int[label] for label in structure) for structure in self.structures()
+                        if all(label in label2int for label in structure) )
+
+def ok_dep_trie(filename=STRUCTURES_FILE):
+    return DepTrie(load_dep_structures(filename))
+
+# the set the notebooks import
+ok_dep_structures = load_dep_structures()
@@ -17,9 +17,12 @@ import click
 from time import time
 
 import semeval_data_helper as sdh
+from parse_cache import ParseCache
+from packed_sdp import PackedSDPWriter
+from vocab_builder import count_sentences, write_counts, build_vocabs, write_vocabs
 
-from spacy.en import English
-nlp = English()
+import nlp_loader
+from nlp_loader import parse as nlp
 
 def noun_chunk_to_head_noun(chunk):
     """Given a chunk, find the noun who's head is outside the chunk. This is the head noun"""
@@ -185,57 +188,6 @@ def sentence_to_sdps(sentence, min_len=1, max_len=7, verbose=False):
             continue                    # skip ones that are too short
         yield {'path': sdp, 'target':(X.text.lower(), Y.text.lower())}
 
-def create_vocab_from_data(sentences, vocab_limit=None, 
-                           min_count=None, dep=False, pos=True,
-                           filter_oov=False, print_oov=False,
-                           oov_count=1):
-    """Create a vocab index, inverse index, and unigram distribution over tokens from a list of spacy sentences
-    
-    if `dep`=True, return the dependencies instead of the tokens"""
-    counts = collections.Counter()
-    for sentence in sentences:
-        for token in sentence:
-            if dep:
-                counts[token.dep_] += 1
-            elif pos:
-                counts[token.pos_] += 1
-            else:
-                if filter_oov and not token.is_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                elif not filter_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                elif print_oov:
-                    print("Token %r is oov" % token.text.lower())
-    
-    counts = counts.most_common()
-    if not (vocab_limit or min_count):
-        vocab_limit = len(counts)
-    elif vocab_limit > len(counts):
-        print("Your vocab limit %i was bigger than the number of token types, now it's %i" 
-              % (vocab_limit, len(counts)))
-        vocab_limit = len(counts)
-    elif min_count:
-        # get first index of an element that doesn't meet the requency constraint
-        vocab_limit = len(counts) # never found something too small
-        for i, count in enumerate(map(lambda x:x[1], counts)):
-            if count < min_count:
-                vocab_limit = i
-                break
-    
-    # create the vocab in most common order
-    # include an <OOV> token and make it's count the sum of all elements that didn't make the cut
-    vocab = [ x[0] for x in counts][:vocab_limit] + [u'<OOV>', u'<X>', u'<Y>', u'<NUM>', u'<PUNCT>']
-    if not oov_count and vocab_limit < len(vocab): # if we didn't specify a psuedocount, take the real one... probably a bad idea
-        oov_count = sum(map(lambda x:x[1], counts[vocab_limit:]))
-    freqs = [ x[1] for x in counts ][:vocab_limit] + [oov_count]*5
-    # calculate the empirical distribution
-    unigram_distribution = list(np.array(freqs) / np.sum(freqs, dtype=np.float32))
-    # create index and inverted index
-    vocab2int = { token:i for (i, token) in enumerate(vocab) }
-    int2vocab = { i:token for (token, i) in vocab2int.items() }
-
-    return vocab, vocab2int, int2vocab, unigram_distribution
-
 def post_process_sdp(sdp):
     """ Filter out unwanted sdps structure """
     bad_tokens = set([u'<PUNCT>']) #set([',', '.', '-', '(', ')', '&', '*', '_', '%', '!', '?', '/', '<', '>', '\\', '[', ']', '{', '}', '"', "'"])
@@ -286,7 +238,9 @@ def sec_to_hms(seconds):
 @click.option('--maxlen', default=7, help="Maximum length of the dependency path not including nominals")
 @click.option('--include_ends', default=False, is_flag=True, help="Include the endpoints of the sdps, not <X>,<Y>")
 @click.option('--sentence', default=False, is_flag=True, help="Compute sequences between nominals instead of SDPs")
-def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen, include_ends, sentence):
+@click.option('--parse_cache', default=None, help="Parse cache file. Sentences found in it aren't reparsed, new parses are added to it")
+@click.option('--packed', default=False, is_flag=True, help="Also write the SDPs in the memory mappable packed binary format")
+def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen, include_ends, sentence, parse_cache, packed):
     FLAGS = {
         'num_sentences': min(num_sentences, 8000), # max is 31661479
         'min_count':min_count,        
@@ -302,32 +256,30 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen,
 
     print("(%i:%i:%i) Reading Data..." % sec_to_hms(time()-start))
 
+    if parse_cache:
+        parse_cache = ParseCache(parse_cache, parser=lambda text: nlp(text))
     train, valid, test, label2int, int2label = sdh.load_semeval_data(shuffle_seed=0, 
                                                                      include_ends=include_ends,
-                                                                     sentence=sentence) # dont' permute data
+                                                                     sentence=sentence,
+                                                                     parse_cache=parse_cache) # dont' permute data
+    if parse_cache:
+        parse_cache.close()
     sentences = [ sent[0] for sent in train['sents']+valid['sents']+test['sents'] ]
 
     print("(%i:%i:%i) Creating vocab..." % sec_to_hms(time()-start))
-    vocab, vocab2int, int2vocab, vocab_dist = create_vocab_from_data(sentences,
-                                                                 vocab_limit=FLAGS['vocab_limit'],
-                                                                 min_count=FLAGS['min_count'],
-                                                                 dep=False, pos=False,
-                                                                 oov_count=1)
-    dep_vocab, dep2int, int2dep, dep_dist = create_vocab_from_data(sentences,
-                                                                 vocab_limit=None,
-                                                                 min_count=0,
-                                                                 dep=True, pos=False,
-                                                                 oov_count=1)
-    pos_vocab, pos2int, int2pos, pos_dist = create_vocab_from_data(sentences,
-                                                                 vocab_limit=None,
-                                                                 min_count=0,
-                                                                 dep=False, pos=True,
-                                                                 oov_count=1)
+    counts = count_sentences(sentences)
+    write_counts(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_counts', counts)
+    vocabs = build_vocabs(counts, vocab_limit=FLAGS['vocab_limit'], min_count=FLAGS['min_count'])
+    vocab, vocab2int, int2vocab, vocab_dist = vocabs['vocab']
+    dep_vocab, dep2int, int2dep, dep_dist = vocabs['dep']
+    pos_vocab, pos2int, int2pos, pos_dist = vocabs['pos']
     # write out the data
     print("(%i:%i:%i) Writing data..." % sec_to_hms(time()-start))
     all_data = [{'path':sdp, 'target':target} for (sdp, target)
                 in zip(train['sdps']+valid['sdps'], train['targets']+valid['targets'])]
     sdp_count = 0
+    if packed:
+        packed = PackedSDPWriter(FLAGS['out_prefix'] + str(FLAGS['num_sentences']))
     with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences']), 'w') as outfile:
         for sdp in all_data:
             # convert from tokens to indices
@@ -340,24 +292,19 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen,
                 sdp_count += 1
                 # write out the dict as json line
                 outfile.write(json.dumps(sdp) + '\n')
+                if packed:
+                    packed.write(sdp, source='SEMEVAL')
+    if packed:
+        packed.close()
 
     # write out the vocab file
     print("(%i:%i:%i) Writing vocab..." % sec_to_hms(time()-start))
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_vocab', 'w') as outfile:
-        for term in zip(vocab, vocab_dist):
-            outfile.write(json.dumps(term)+'\n')
-
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_dep', 'w') as outfile:
-        for term in zip(dep_vocab, dep_dist):
-            outfile.write(json.dumps(term)+'\n')
-
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_pos', 'w') as outfile:
-        for term in zip(pos_vocab, pos_dist):
-            outfile.write(json.dumps(term)+'\n')
+    write_vocabs(FLAGS['out_prefix'] + str(FLAGS['num_sentences']), vocabs)
 
     print("="*80)
     print("DONE: Created %i SDPs from %i sentences with a total vocab size of %i" % (sdp_count, num_sentences, len(vocab)))
     print("Took a total of %i:%i:%i hours" % sec_to_hms(time()-start))
+    nlp_loader.report()
     print("="*80)
 
 if __name__ == '__main__':
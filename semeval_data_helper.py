@@ -1,23 +1,88 @@
 """
 Semeval Data handler
 """
+import hashlib
+import json
+import os
 import random
-from spacy.en import English
-nlp = English()
+import re
+from nlp_loader import parse as nlp
+from parse_cache import CachedDoc
+from sdp_arrays import as_compact_parse
 
-def convert_raw_x(line, verbose=False):
+TRAIN_FILE = 'SemEval2010_task8_all_data/SemEval2010_task8_training/TRAIN_FILE.TXT'
+TEST_FILE = 'SemEval2010_task8_all_data/SemEval2010_task8_testing/TEST_FILE.txt'
+CACHE_DIR = 'SemEval2010_task8_all_data/cache'
+# bump this if the loader's output changes so old cache files stop matching
+LOADER_VERSION = 1
+
+ENTITY_TAG = re.compile(u'</?e[12]>')
+
+def raw_sentence(line):
+    """The text between the first and last quote of a raw semeval line, as unicode"""
+    if isinstance(line, str):
+        line = unicode(line)
+    s = line.strip()
+    return s[s.index(u'"')+1: -(s[::-1].index(u'"')+1)] # get s between first " and last "
+
+def strip_entity_tags(s):
+    """Drop the <e1>, <e2> tags from a sentence and return the clean text with the character offset of each entity
+
+    Sometimes the tags are missing spaces in front or behind, those get a space so the entity is still its own token.
+    """
+    pieces = []
+    length = 0
+    last = u''    # last character of the clean text so far
+    offsets = {}
+    position = 0
+    for match in ENTITY_TAG.finditer(s):
+        piece = s[position:match.start()]
+        if piece:
+            pieces.append(piece)
+            length += len(piece)
+            last = piece[-1]
+        tag = match.group()
+        following = s[match.end():match.end()+1]
+        # right tags keep the entity apart from whatever follows, left tags from whatever is in front
+        if (tag[1] == u'/' and following and not following.isspace()) or (tag[1] != u'/' and last and not last.isspace()):
+            pieces.append(u' ')
+            length += 1
+            last = u' '
+        if tag[1] != u'/':
+            offsets[tag[1:3]] = length
+        position = match.end()
+    pieces.append(s[position:])
+    return u''.join(pieces), offsets['e1'], offsets['e2']
+
+def token_at(doc, offset):
+    """The first token of `doc` that ends after character `offset`"""
+    for token in doc:
+        if token.idx + len(token.text) > offset:
+            return token
+    return doc[len(doc)-1]
+
+def convert_raw_x(line, verbose=False, parse_cache=None, double_parse=False):
     """Convert raw line of semeval data into a useable form
     
     Convert to a triple of (spacy sentence, e1_token, e2_token)
+    The tags are stripped and the entities found by their character offsets, so each sentence is parsed once.
+    `double_parse` uses the old way instead, parsing with markers and then again on the rejoined tokens.
+    If `parse_cache` is given, parses are looked up there (and added on a miss) instead of always running spacy
     """
-    if isinstance(line, str):
-        line = unicode(line)
-    s = line.strip()
-    s = s[s.index(u'"')+1: -(s[::-1].index(u'"')+1)] # get s between first " and last "
+    parse = parse_cache.parse if parse_cache else nlp
+    s = raw_sentence(line)
     # we will assume that the first token follow the <e1> , <e2> tags are the entity words.  
     # note this is a big assumption and hopefully phrases will be in subtrees or in heads of the parse trees
     # TODO: this can be addressed by making it a 5-tuple with the endpoints also encoded
-    
+    if double_parse:
+        return convert_raw_x_double_parse(s, parse)
+    text, e1_offset, e2_offset = strip_entity_tags(s)
+    s = parse(text)
+    return (s, token_at(s, e1_offset), token_at(s, e2_offset))
+
+def convert_raw_x_double_parse(s, parse):
+    """The original conversion, marks the entities so they can be found in a first parse, then parses the
+    tokens of that joined by spaces"""
     # sometimes the tags are missing spaces in front or behind.
     # check out those cases separately so we don't add exrta whitespace and mess up parsing
     # Proper whitespaceing case
@@ -32,7 +97,7 @@ def convert_raw_x(line, verbose=False):
     s = s.replace(u'<e2>', u' e2>')
     s = s.replace(u'</e2>', u' ')
     
-    s = nlp(s)
+    s = parse(s)
     tokenized_s = [token.text for token in s]
     for i, token in enumerate(tokenized_s):
         if u'e1>' == token[:3]:
@@ -42,7 +107,7 @@ def convert_raw_x(line, verbose=False):
             tokenized_s[i] = token[3:]
             e2_index = i
     s = u' '.join(tokenized_s)
-    s = nlp(s)
+    s = parse(s)
     e1 = s[e1_index]
     e2 = s[e2_index]
     return (s, e1, e2)
@@ -177,8 +242,9 @@ def is_ok_sdp(sdp):#, int2vocab, oov_percent=75):
         return False
     return True
 
-def line_to_data(raw_line, include_ends=False, verbose=False, sentence=False, single=False):
-    sent = convert_raw_x(raw_line)
+def line_to_data(raw_line, include_ends=False, verbose=False, sentence=False, single=False, parse_cache=None,
+                 double_parse=False):
+    sent = convert_raw_x(raw_line, parse_cache=parse_cache, double_parse=double_parse)
     e1 = sent[1]
     e2 = sent[2]
     if sentence:
@@ -239,12 +305,86 @@ def line_to_label(raw_label_line, label2int):
     #     return label2int[line]
     return label2int[line]
 
-def load_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, single=False):
+def cache_key(shuffle_seed, include_ends, sentence, single, double_parse):
+    """Hash of everything the processed data depends on: the flags, the loader version and the data files"""
+    flags = {'shuffle_seed': shuffle_seed, 'include_ends': include_ends, 'sentence': sentence, 'single': single,
+             'double_parse': double_parse, 'version': LOADER_VERSION,
+             'files': [ (f, os.path.getsize(f), os.path.getmtime(f)) for f in [TRAIN_FILE, TEST_FILE] ]}
+    return hashlib.sha1(json.dumps(flags, sort_keys=True)).hexdigest()
+
+def _dump_sent(sent):
+    """A (doc, e1, e2) triple as its compact parse and the token indices, failed lines ([doc]*3) have no entities"""
+    if isinstance(sent, list):
+        return {'parse': as_compact_parse(sent[0]), 'e1': None, 'e2': None}
+    return {'parse': as_compact_parse(sent[0]), 'e1': sent[1].i, 'e2': sent[2].i}
+
+def _load_sent(dumped):
+    doc = CachedDoc(dumped['parse'])
+    if dumped['e1'] is None:
+        return [doc]*3
+    return (doc, doc[dumped['e1']], doc[dumped['e2']])
+
+def _dump_split(split):
+    return { key:([ _dump_sent(sent) for sent in values ] if key == 'sents' else list(values))
+             for key, values in split.items() }
+
+def _load_split(dumped, single=False, as_tuples=False):
+    """Undo `_dump_split`, putting back the tuples json turned into lists"""
+    split = {}
+    for key, values in dumped.items():
+        if key == 'sents':
+            values = [ _load_sent(sent) for sent in values ]
+        elif key == 'sdps':
+            values = [ [ tuple(x) for x in sdp ] for sdp in values ]
+        elif key == 'targets':
+            values = [ list(target) if single else tuple(target) for target in values ]
+        elif key in ('raws', 'comments'):
+            values = [ value.encode('utf-8') for value in values ]
+        split[key] = tuple(values) if as_tuples else values
+    return split
+
+def load_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, single=False, parse_cache=None,
+                      double_parse=False, cache_dir=CACHE_DIR):
     """Load in SemEval 2010 Task 8 Training file and return lists of tuples:
     
-    Tuple form =  (spacy(stripped sentence), index of e1, index of e2)"""
+    Tuple form =  (spacy(stripped sentence), index of e1, index of e2)
+
+    The processed train, valid and test dicts are kept in `cache_dir` (None to turn it off) under a hash of the flags,
+    so the next load with the same flags doesn't parse anything.  The sentences of a cached load are CachedDocs.
+    Pass a `parse_cache.ParseCache` as `parse_cache` to reuse parses from earlier runs"""
+    cache_file = None
+    if cache_dir:
+        cache_file = os.path.join(cache_dir, 'semeval_%s.json'
+                                  % cache_key(shuffle_seed, include_ends, sentence, single, double_parse))
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+            train = _load_split(cached['train'], single=single, as_tuples=bool(shuffle_seed))
+            valid = _load_split(cached['valid'], single=single, as_tuples=bool(shuffle_seed))
+            test = _load_split(cached['test'])
+            label2int = create_label2int()
+            int2label = {i:label for (label, i) in label2int.items()}
+            print("Loaded cached semeval data from %s" % cache_file)
+            print("Num training: %i" % len(train['labels']))
+            print("Num valididation: %i" % len(valid['labels']))
+            print("Num testing: %i" % len(test['targets']))
+            return train, valid, test, label2int, int2label
+    train, valid, test, label2int, int2label = process_semeval_data(shuffle_seed=shuffle_seed,
+        include_ends=include_ends, sentence=sentence, single=single, parse_cache=parse_cache, double_parse=double_parse)
+    if cache_file:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # write then rename, so an interrupted write never leaves a bad cache file behind
+        with open(cache_file + '.tmp', 'w') as f:
+            json.dump({'train': _dump_split(train), 'valid': _dump_split(valid), 'test': _dump_split(test)}, f)
+        os.rename(cache_file + '.tmp', cache_file)
+    return train, valid, test, label2int, int2label
+
+def process_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, single=False, parse_cache=None,
+                         double_parse=False):
+    """Parse and process the SemEval data, see `load_semeval_data`"""
     ### TRAINING AND VALIDATION DATA ###
-    training_txt_file = 'SemEval2010_task8_all_data/SemEval2010_task8_training/TRAIN_FILE.TXT'
+    training_txt_file = TRAIN_FILE
     validation_index = 8000 - 800 # len data - len valid - 1 since we start at 0
     validation_size = 800
     all_ = {'raws':[], 'sents':[], 'sdps':[], 'targets':[], 'labels':[], 'comments':[]}
@@ -259,7 +399,8 @@ def load_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, singl
             comment = text[4*cursor + 2]
             if single: # really just for use by *2sdp for auxilary task
                 sent, sdp, target = line_to_data(text_line, include_ends=include_ends, 
-                                                      sentence=sentence, single=single)
+                                                      sentence=sentence, single=single,
+                                                      parse_cache=parse_cache, double_parse=double_parse)
                 # print(sent, sdp, target)
                 label = line_to_label(label_line, label2int)
     #             print(sent, sdp, target, label)
@@ -290,7 +431,8 @@ def load_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, singl
                     valid['comments'].extend([comment]*num)
             else: # else we only get one per line
                 sent, sdp, target = line_to_data(text_line, include_ends=include_ends, 
-                                                 sentence=sentence, single=single)
+                                                 sentence=sentence, single=single,
+                                                 parse_cache=parse_cache, double_parse=double_parse)
                 label = line_to_label(label_line, label2int)
     #             print(sent, sdp, target, label)
                 if not (sent and sdp and target):
@@ -319,16 +461,14 @@ def load_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, singl
             #     valid['comments'].append(comment)
     # shuffle all and take the last validation_size as validation, rest as test
     if shuffle_seed:
+        # shuffle one index and gather each field through it
+        # (moves things exactly like shuffling the zipped fields used to)
+        order = range(len(all_['labels']))
         random.seed(shuffle_seed)
-        zip_all = zip(all_['raws'], all_['sents'], all_['sdps'], all_['targets'], all_['labels'], all_['comments'])
-        random.shuffle(zip_all)
-        raws, sents, sdps, targets, labels, comments = zip(*zip_all)
-        train['raws'], valid['raws'] = raws[:-validation_size], raws[-validation_size:]
-        train['sents'], valid['sents'] = sents[:-validation_size], sents[-validation_size:]
-        train['sdps'], valid['sdps'] = sdps[:-validation_size], sdps[-validation_size:]
-        train['targets'], valid['targets'] = targets[:-validation_size], targets[-validation_size:]
-        train['labels'], valid['labels'] = labels[:-validation_size], labels[-validation_size:]
-        train['comments'], valid['comments'] = comments[:-validation_size], comments[-validation_size:]
+        random.shuffle(order)
+        for key in ['raws', 'sents', 'sdps', 'targets', 'labels', 'comments']:
+            train[key] = tuple(all_[key][i] for i in order[:-validation_size])
+            valid[key] = tuple(all_[key][i] for i in order[-validation_size:])
 
     int2label = {i:label for (label, i) in label2int.items()}
     print("Num training: %i" % len(train['labels']))
@@ -337,11 +477,12 @@ def load_semeval_data(shuffle_seed=42, include_ends=False, sentence=False, singl
     
     ### TEST DATA ### (has no labels, is not used in duplicate form so don't output it)
     # NOTE: converting test data into duplicate form is not implemented
-    test_txt_file = "SemEval2010_task8_all_data/SemEval2010_task8_testing/TEST_FILE.txt"
+    test_txt_file = TEST_FILE
     test = {'raws':[], 'sents':[], 'sdps':[], 'targets':[]}
     text = open(test_txt_file, 'r').readlines()
     for line in text:
-        sent, sdp, target = line_to_data(line, include_ends=include_ends, sentence=sentence)
+        sent, sdp, target = line_to_data(line, include_ends=include_ends, sentence=sentence,
+                                         parse_cache=parse_cache, double_parse=double_parse)
         if not (sent and sdp and target):
             print("Skipping this one... %r" % text_line)
             print(sent, sdp, target, label)
@@ -1,7 +1,16 @@
 """
 Shuffle the wikipedia mohameds wikipedia sentences
+
+By default everything is read into memory and shuffled there.  With --external the lines are scattered
+into K temp bucket files at random, then each bucket is shuffled in memory and appended to the output,
+so only about 1/K of the corpus is ever in memory.  Both are reproducible given a --seed.
 """
+from __future__ import print_function
+import os
 import random
+import shutil
+import tempfile
+import click
 from time import time
 
 def sec_to_hms(seconds):
@@ -9,14 +18,65 @@ def sec_to_hms(seconds):
     h, m = divmod(m, 60)
     return h,m,s
 
-start = time()
-print("(%i:%i:%i) Reading..." % sec_to_hms(time()-start))
-sentences = open('data/en.tok.txt', 'r').readlines() 
-print("(%i:%i:%i) Shuffling..." % sec_to_hms(time()-start))
-random.shuffle(sentences)
-print("(%i:%i:%i) Writing..." % sec_to_hms(time()-start))
-with open('data/shuffled.en.tok.txt', 'w') as f:
-    for sentence in sentences:
-        f.write(sentence)
-del sentences # make sure it's garbage collected
-print("Done. Total time : (%i:%i:%i) hours" % sec_to_hms(time()-start))
\ No newline at end of file
+def shuffle_in_memory(infile, outfile, rng):
+    sentences = open(infile, 'r').readlines()
+    rng.shuffle(sentences)
+    with open(outfile, 'w') as f:
+        for sentence in sentences:
+            f.write(sentence)
+    del sentences # make sure it's garbage collected
+
+def shuffle_external(infile, outfile, num_buckets, rng, tmp_dir=None):
+    """Scatter lines into `num_buckets` temp files at random, shuffle each one in memory and concatenate them
+
+    Each line lands in a uniformly random bucket and each bucket is uniformly shuffled,
+    so every order of the lines is equally likely, same as shuffling them all at once
+    """
+    bucket_dir = tempfile.mkdtemp(prefix='shuffle_buckets_', dir=tmp_dir)
+    try:
+        bucket_names = [ os.path.join(bucket_dir, 'bucket_%i' % i) for i in range(num_buckets) ]
+        buckets = [ open(name, 'w') for name in bucket_names ]
+        randint = rng.randint
+        for line in open(infile, 'r'):
+            if not line.endswith('\n'): # last line, keep it a line of its own when it moves
+                line += '\n'
+            buckets[randint(0, num_buckets-1)].write(line)
+        for bucket in buckets:
+            bucket.close()
+        with open(outfile, 'w') as f:
+            for name in bucket_names:
+                with open(name, 'r') as bucket:
+                    sentences = bucket.readlines()
+                rng.shuffle(sentences)
+                f.writelines(sentences)
+                del sentences
+                os.remove(name)
+    finally:
+        shutil.rmtree(bucket_dir, ignore_errors=True)
+
+@click.command()
+@click.option('-i', '--infile', default='data/en.tok.txt', help="Sentences to shuffle, one per line")
+@click.option('-o', '--outfile', default='data/shuffled.en.tok.txt', help="Where to write the shuffled sentences")
+@click.option('--seed', default=None, type=int, help="Seed for a reproducible shuffle")
+@click.option('--external', default=False, is_flag=True, help="Shuffle out of core through temp bucket files")
+@click.option('-k', '--buckets', default=None, type=int, help="Number of temp buckets for --external (default from --memory_mb)")
+@click.option('--memory_mb', default=1024, help="About how much of the corpus to hold in memory at once with --external")
+@click.option('--tmp_dir', default=None, help="Where to put the temp buckets (defaults next to the output)")
+def main(infile, outfile, seed, external, buckets, memory_mb, tmp_dir):
+    start = time()
+    rng = random.Random(seed)
+    if external:
+        if not buckets:
+            # python strings take a few times their size on disk, leave room for that
+            buckets = max(1, int(4 * os.path.getsize(infile) / (memory_mb * 2**20.)) + 1)
+        if tmp_dir is None:
+            tmp_dir = os.path.dirname(os.path.abspath(outfile))
+        print("(%i:%i:%i) Shuffling through %i buckets..." % (sec_to_hms(time()-start) + (buckets,)))
+        shuffle_external(infile, outfile, buckets, rng, tmp_dir=tmp_dir)
+    else:
+        print("(%i:%i:%i) Shuffling in memory..." % sec_to_hms(time()-start))
+        shuffle_in_memory(infile, outfile, rng)
+    print("Done. Total time : (%i:%i:%i) hours" % sec_to_hms(time()-start))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Approximate token counting in bounded memory.
+
+`SketchCounter` is a count-min sketch plus a table of heavy hitters.  The sketch is a depth x width table of
+counts; every key adds its count to one cell per row (picked by a hash) and its estimate is the smallest
+of its cells, which is never below the true count and is at most eps * N above it (N the total count,
+eps = e / width) with probability 1 - exp(-depth).  Memory is fixed by width and depth, however many
+distinct types the corpus has.  The sketch can't list its keys, so the keys with the largest estimates
+are kept on the side, and those are what `items()` and `most_common()` return.
+
+It stands in for the Counters of `vocab_builder`, so the *2sdp scripts can count the full wiki dump with --sketch_mb.
+Run this module on a sample of the corpus to see how far the estimates are from the exact counts:
+
+    python sketch_counter.py -i data/shuffled.en.tok.txt -n 100000 --memory_mb 16
+"""
+from __future__ import print_function
+import collections
+import math
+import zlib
+import click
+import numpy as np
+
+class SketchCounter(object):
+    """Count-min sketch with heavy hitter tracking
+
+    Args:
+        width: cells per row. The error bound is e / width of the total count
+        depth (opt): number of rows (hashes). The bound fails with probability exp(-depth)
+        top (opt): number of heavy hitters to keep track of, it should be at least the vocab limit
+    """
+    def __init__(self, width, depth=4, top=100000):
+        self.width = int(width)
+        self.depth = int(depth)
+        self.top = int(top)
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+        self._heavy = {}
+        self._floor = 0
+        self._rows = np.arange(self.depth)[:, None]
+
+    @classmethod
+    def from_memory(cls, memory_mb, depth=4, top=100000):
+        """A sketch whose table takes about `memory_mb` megabytes"""
+        return cls(max(1, int(memory_mb * 2**20 / (8 * depth))), depth=depth, top=top)
+
+    def _cells(self, keys):
+        """Column of each key in every row, from two crc32 hashes of the key (double hashing)"""
+        h1 = np.empty(len(keys), dtype=np.int64)
+        h2 = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            data = key.encode('utf-8') if isinstance(key, type(u'')) else key
+            h1[i] = zlib.crc32(data) & 0xffffffff
+            h2[i] = zlib.crc32(data, 0x9e3779b9) & 0xffffffff | 1
+        return (h1[None, :] + self._rows * h2[None, :]) % self.width
+
+    def update(self, keys):
+        """Count an iterable of keys, or a mapping of key to count, like Counter.update"""
+        if not hasattr(keys, 'items'):
+            keys = collections.Counter(keys)
+        if not keys:
+            return
+        keys, counts = zip(*keys.items())
+        counts = np.array(counts, dtype=np.int64)
+        cells = self._cells(keys)
+        rows = np.broadcast_to(self._rows, cells.shape)
+        np.add.at(self.table, (rows, cells), counts[None, :])
+        self.total += int(counts.sum())
+        estimates = self.table[rows, cells].min(axis=0)
+        self._track(keys, estimates)
+
+    def _track(self, keys, estimates):
+        heavy = self._heavy
+        for key, estimate in zip(keys, estimates.tolist()):
+            if key in heavy or estimate > self._floor or len(heavy) < self.top:
+                heavy[key] = estimate
+        # let it grow to twice the size so pruning is amortized
+        if len(heavy) > 2 * self.top:
+            kept = sorted(heavy.items(), key=lambda x:-x[1])[:self.top]
+            self._heavy = dict(kept)
+            self._floor = kept[-1][1]
+
+    def merge(self, other):
+        """Add the counts of a sketch of the same shape"""
+        assert (self.width, self.depth) == (other.width, other.depth), "Can only merge sketches of the same shape"
+        self.table += other.table
+        self.total += other.total
+        keys = list(set(self._heavy) | set(other._heavy))
+        if keys:
+            self._track(keys, self.estimate_many(keys))
+        return self
+
+    def estimate_many(self, keys):
+        """Estimated counts of a list of keys"""
+        cells = self._cells(keys)
+        return self.table[np.broadcast_to(self._rows, cells.shape), cells].min(axis=0)
+
+    def __getitem__(self, key):
+        return int(self.estimate_many([key])[0])
+
+    def __contains__(self, key):
+        return key in self._heavy
+
+    def __len__(self):
+        return len(self._heavy)
+
+    def __iter__(self):
+        return iter(self._heavy)
+
+    def most_common(self, n=None):
+        """The heavy hitters and their current estimates, largest first"""
+        keys = list(self._heavy)
+        if not keys:
+            return []
+        estimates = self.estimate_many(keys).tolist()
+        order = sorted(zip(keys, estimates), key=lambda x:(-x[1], x[0]))
+        return order[:self.top if n is None else min(n, self.top)]
+
+    def items(self):
+        return self.most_common()
+
+    def epsilon(self):
+        return math.e / self.width
+
+    def delta(self):
+        return math.exp(-self.depth)
+
+    def error_bound(self):
+        """Estimates are at most this much above the true counts, with probability 1 - delta()"""
+        return self.epsilon() * self.total
+
+def error_report(sketch, exact, top=None):
+    """Compare a sketch to the exact Counter of the same keys
+
+    Over all keys and over the `top` most common (default the sketch's `top`), the max and mean overestimate,
+    how many are over the theoretical bound and how many of the exact top keys the sketch has as heavy hitters
+    """
+    top = sketch.top if top is None else top
+    keys = list(exact)
+    errors = sketch.estimate_many(keys) - np.array([ exact[key] for key in keys ], dtype=np.int64)
+    true_top = [ key for key, _ in sorted(exact.items(), key=lambda x:(-x[1], x[0]))[:top] ]
+    top_errors = sketch.estimate_many(true_top) - np.array([ exact[key] for key in true_top ], dtype=np.int64)
+    sketch_top = set( key for key, _ in sketch.most_common(top) )
+    return {'types': len(keys),
+            'total': sketch.total,
+            'bound': sketch.error_bound(),
+            'delta': sketch.delta(),
+            'max_error': int(errors.max()),
+            'mean_error': float(errors.mean()),
+            'over_bound': int((errors > sketch.error_bound()).sum()),
+            'top': len(true_top),
+            'top_max_error': int(top_errors.max()),
+            'top_mean_relative_error': float(np.mean(top_errors / np.array([ exact[key] for key in true_top ],
+                                                                             dtype=np.float64))),
+            'top_recall': len(sketch_top.intersection(true_top)) / float(max(len(true_top), 1))}
+
+@click.command()
+@click.option('-i', '--infile', default='data/shuffled.en.tok.txt', help="Tokenized sentences, one per line")
+@click.option('-n', '--num_sentences', default=100000, help="Number of sentences in the sample")
+@click.option('--memory_mb', default=16., help="Size of the sketch table")
+@click.option('--depth', default=4, help="Rows of the sketch")
+@click.option('--top', default=10000, help="Number of heavy hitters to keep and check")
+def main(infile, num_sentences, memory_mb, depth, top):
+    """Count a sample of the corpus exactly and with a sketch and report how far apart they are"""
+    exact = collections.Counter()
+    sketch = SketchCounter.from_memory(memory_mb, depth=depth, top=top)
+    for i, line in enumerate(open(infile, 'r')):
+        if i >= num_sentences:
+            break
+        tokens = line.decode('utf-8').lower().split() if hasattr(line, 'decode') else line.lower().split()
+        exact.update(tokens)
+        sketch.update(tokens)
+    report = error_report(sketch, exact, top=top)
+    print("Sketch %i x %i (%0.1f MB) over %i tokens of %i types"
+          % (sketch.depth, sketch.width, sketch.table.nbytes / 2.**20, report['total'], report['types']))
+    print("Bound: overestimates <= %(bound)0.1f, failing with probability %(delta)0.3g" % report)
+    print("All types: max overestimate %(max_error)i, mean %(mean_error)0.3f, %(over_bound)i over the bound" % report)
+    print("Top %(top)i: max overestimate %(top_max_error)i, mean relative %(top_mean_relative_error)0.5f, "
+          "recall %(top_recall)0.4f" % report)
+
+if __name__ == '__main__':
+    main()
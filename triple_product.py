@@ -0,0 +1,68 @@
+"""
+Tensor triple product scores, score_c(x, y, z) = sum_ijk W_c[i,j,k] x_i y_j z_k, for a batch and every class at once.
+
+The RelEmbed classifiers score a relation by its RNN state x and the two target embeddings y and z.
+Instead of a graph op per (i, j, k), the batch's x (x) y outer products [batch, x_len*y_len] go through one matmul
+with all of the class tensors, and the result is contracted with z.  The graph is a handful of ops whatever the sizes.
+
+A full tensor per class is x_len*y_len*z_len weights, ~27M per class at 300-d (plus the optimizer's copies),
+so `rank` factors each class's tensor into a sum of `rank` outer products a_r (x) b_r (x) c_r,
+score_c = sum_r <x, a_r><y, b_r><z, c_r>, which is rank*(x_len + y_len + z_len) weights per class.
+
+The models use it when their config has 'classifier': 'triple', and 'triple_rank' for the factored tensors.
+"""
+import tensorflow as tf
+
+CLASSIFIERS = ('softmax', 'triple')
+
+def triple_product_scores(W, x, y, z):
+    """Scores of every class for a batch
+
+    Args:
+        W: a 4D tensor with shape[x_len, y_len, z_len, num_classes]
+        x: a 2D tensor with shape[batch_size, x_len]
+        y: a 2D tensor with shape[batch_size, y_len]
+        z: a 2D tensor with shape[batch_size, z_len]
+
+    Returns a 2D tensor with shape[batch_size, num_classes]"""
+    x_len, y_len, z_len, num_classes = W.get_shape().as_list()
+    xy = tf.reshape(tf.expand_dims(x, 2) * tf.expand_dims(y, 1), [-1, x_len*y_len])
+    xyW = tf.reshape(tf.matmul(xy, tf.reshape(W, [x_len*y_len, z_len*num_classes])), [-1, z_len, num_classes])
+    return tf.reduce_sum(xyW * tf.expand_dims(z, 2), 1)
+
+def batch_triple_inner(W, x, y, z):
+    """ Computes the inner product of 3 vectors and a tensor
+
+    Args:
+        W: a 3D tensor with shape[x_len, y_len, z_len]
+        x: a 2D tensor with shape[batch_size, x_len]
+        y: a 2D tensor with shape[batch_size, y_len]
+        z: a 2D tensor with shape[batch_size, z_len]
+
+    Returns a 2D tensor with shape[batch_size, 1]"""
+    return triple_product_scores(tf.expand_dims(W, 3), x, y, z)
+
+def factored_triple_scores(A, B, C, x, y, z):
+    """Scores of every class for a batch, with each class's tensor the sum of `rank` outer products
+
+    A, B and C are the factors of x, y and z with shapes [x_len, rank, num_classes] etc.
+    Returns a 2D tensor with shape[batch_size, num_classes]"""
+    def project(F, v): # <v, f_r> for each rank and class, [batch_size, rank, num_classes]
+        length, rank, num_classes = F.get_shape().as_list()
+        return tf.reshape(tf.matmul(v, tf.reshape(F, [length, rank*num_classes])), [-1, rank, num_classes])
+    return tf.reduce_sum(project(A, x) * project(B, y) * project(C, z), 1)
+
+def triple_product_head(x, y, z, num_classes, rank=None):
+    """Class scores [batch_size, num_classes] from a triple product tensor per class, and the tensor's variables
+
+    A full tensor if `rank` is None, else factored into `rank` outer products"""
+    lengths = [ v.get_shape()[1].value for v in (x, y, z) ]
+    if rank is None:
+        size = lengths[0] * lengths[1] * lengths[2]
+        W = tf.get_variable("triple_w", lengths + [num_classes],
+                            initializer=tf.truncated_normal_initializer(stddev=1. / size ** .5))
+        return triple_product_scores(W, x, y, z), [W]
+    factors = [ tf.get_variable("triple_%s" % name, [length, rank, num_classes],
+                                initializer=tf.truncated_normal_initializer(stddev=1. / length ** .5))
+                for name, length in zip('abc', lengths) ]
+    return factored_triple_scores(*(factors + [x, y, z])), factors
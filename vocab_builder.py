@@ -0,0 +1,205 @@
+"""
+Vocab building.  Counts word, dependency and POS types, keeps the counts on disk and turns them into vocabs.
+
+Counts are plain Counters per kind ('vocab', 'dep', 'pos'), plus an optional 'important' Counter of the words
+of sentences whose vocab must be kept whatever the limits (the SemEval sentences).  A counts file is one json
+object of them, so a shard of the corpus can write its own and any number of them merge by summing,
+in time linear in the number of distinct types rather than the size of the corpus.
+
+min_count, vocab_limit and the important vocab rule are only applied when the vocab is built from the merged counts,
+so a vocab can be rebuilt with new thresholds without touching the corpus:
+
+    python vocab_builder.py -o data/semeval_wiki_sdp_10000 -m 10 data/semeval_wiki_sdp_10000_counts
+"""
+from __future__ import print_function
+import collections
+import json
+import click
+import numpy as np
+
+KINDS = ('vocab', 'dep', 'pos')
+SPECIAL_TOKENS = [u'<OOV>', u'<X>', u'<Y>', u'<NUM>', u'<PUNCT>']
+
+def count_vocab_from_data(sentences, dep=False, pos=False, lower=True,
+                          filter_oov=False, print_oov=False, counts=None):
+    """Count the tokens (or dependencies if `dep`=True, POS tags if `pos`=True) of a list of spacy sentences
+
+    If `counts` is given (a Counter or a sketch_counter.SketchCounter), update it in place
+    instead of starting a new Counter"""
+    if counts is None:
+        counts = collections.Counter()
+    for sentence in sentences:
+        # one update per sentence, so a SketchCounter can hash the sentence's types in a batch
+        keys = []
+        for token in sentence:
+            if dep:
+                keys.append(token.dep_)
+            elif pos:
+                keys.append(token.pos_)
+            else:
+                text = token.text.lower() if lower else token.text
+                if filter_oov and not token.is_oov and token.text not in [u' ', u'\n\n']:
+                    keys.append(text)
+                elif not filter_oov and token.text not in [u' ', u'\n\n']:
+                    keys.append(text)
+                elif print_oov:
+                    print("Token %r is oov" % text)
+        counts.update(keys)
+    return counts
+
+def new_counts(kinds=KINDS):
+    return { kind:collections.Counter() for kind in kinds }
+
+def count_sentences(sentences, counts=None, filter_oov=False, print_oov=False):
+    """Count the words, dependencies and POS tags of a list of spacy sentences into a dict of Counters by kind"""
+    if counts is None:
+        counts = new_counts()
+    for kind in counts:
+        if kind in KINDS:
+            count_vocab_from_data(sentences, dep=(kind == 'dep'), pos=(kind == 'pos'),
+                                  filter_oov=filter_oov, print_oov=print_oov, counts=counts[kind])
+    return counts
+
+def write_counts(filename, counts):
+    """Write a dict of Counters by kind as one json object"""
+    with open(filename, 'w') as f:
+        # a SketchCounter only has its heavy hitters to write
+        json.dump({ kind:dict(kind_counts.items()) for kind, kind_counts in counts.items() }, f)
+
+def read_counts(filename):
+    """Read a counts file written by `write_counts` back into a dict of Counters by kind"""
+    with open(filename, 'r') as f:
+        return { kind:collections.Counter(kind_counts) for kind, kind_counts in json.load(f).items() }
+
+def merge_counts(shards, counts=None):
+    """Sum counts dicts (or counts files) into `counts`, or a new dict if not given"""
+    if counts is None:
+        counts = {}
+    for shard in shards:
+        if not isinstance(shard, dict):
+            shard = read_counts(shard)
+        for kind, kind_counts in shard.items():
+            counts.setdefault(kind, collections.Counter()).update(kind_counts)
+    return counts
+
+def create_vocab_from_counts(counts, important_vocab=None, vocab_limit=None,
+                             min_count=None, oov_count=1, special_tokens=SPECIAL_TOKENS):
+    """Create a vocab index, inverse index, and unigram distribution from a Counter of token types
+
+    Types in `important_vocab` are kept regardless of the vocab limit and min count"""
+    if vocab_limit:
+        vocab_limit = int(vocab_limit) # comes in as a string from the command line
+    # break count ties by type so the order doesn't depend on how the counts were merged
+    counts = sorted(counts.items(), key=lambda x:(-x[1], x[0]))
+    if not (vocab_limit or min_count):
+        vocab_limit = len(counts)
+    elif vocab_limit and vocab_limit > len(counts):
+        print("Your vocab limit %i was bigger than the number of token types, now it's %i"
+              % (vocab_limit, len(counts)))
+        vocab_limit = len(counts)
+    elif min_count:
+        # get first index of an element that doesn't meet the requency constraint
+        vocab_limit = len(counts) # never found something too small
+        for i, count in enumerate(map(lambda x:x[1], counts)):
+            if count < min_count:
+                vocab_limit = i
+                break
+    # now if we have important sentences
+    # we need to add the missing vocabs back to the vocab and increase the size
+    if important_vocab:
+        missing_important = [count for count in counts[vocab_limit:] if count[0] in important_vocab]
+        counts = counts[:vocab_limit] + missing_important
+        vocab_limit = len(counts)
+        print("Kept %i missing important words" % len(missing_important) )
+
+    # create the vocab in most common order
+    # include an <OOV> token and make it's count the sum of all elements that didn't make the cut
+    vocab = [ x[0] for x in counts][:vocab_limit] + list(special_tokens)
+    if not oov_count and vocab_limit < len(vocab): # if we didn't specify a psuedocount, take the real one... probably a bad idea
+        oov_count = sum(map(lambda x:x[1], counts[vocab_limit:]))
+    freqs = [ x[1] for x in counts ][:vocab_limit] + [oov_count]*len(special_tokens)
+    # calculate the empirical distribution
+    unigram_distribution = list(np.array(freqs) / np.sum(freqs, dtype=np.float32))
+    # create index and inverted index
+    vocab2int = { token:i for (i, token) in enumerate(vocab) }
+    int2vocab = { i:token for (token, i) in vocab2int.items() }
+
+    return vocab, vocab2int, int2vocab, unigram_distribution
+
+def create_vocab_from_data(sentences, important_sentences=[], vocab_limit=None,
+                           min_count=None, dep=False, pos=False,
+                           filter_oov=False, print_oov=False,
+                           oov_count=1):
+    """Create a vocab index, inverse index, and unigram distribution over tokens from a list of spacy sentences
+
+    if `dep`=True, return the dependencies instead of the tokens"""
+    counts = count_vocab_from_data(sentences, dep=dep, pos=pos,
+                                   filter_oov=filter_oov, print_oov=print_oov)
+    # if we specify important sentences, vocab limits and min frequencies don't apply
+    # that way we have total vocab coverage over these sentences
+    important_vocab = None
+    if important_sentences:
+        important_counts = count_vocab_from_data(important_sentences,
+                                                 filter_oov=filter_oov, print_oov=print_oov)
+        counts.update(important_counts)
+        important_vocab = set(important_counts)
+    return create_vocab_from_counts(counts, important_vocab=important_vocab,
+                                    vocab_limit=vocab_limit, min_count=min_count,
+                                    oov_count=oov_count)
+
+def build_vocabs(counts, vocab_limit=None, min_count=None, oov_count=1):
+    """Build the vocab of every kind in a (merged) counts dict
+
+    Word counts get the limits, plus every word of the 'important' counts whatever its count.
+    Dependencies and POS tags are all kept.
+
+    Returns:
+        a dict by kind of (vocab, vocab2int, int2vocab, unigram_distribution)
+    """
+    vocabs = {}
+    if 'vocab' in counts:
+        word_counts = counts['vocab']
+        if not isinstance(word_counts, collections.Counter):
+            word_counts = collections.Counter(dict(word_counts.items())) # heavy hitters of a SketchCounter
+        important_vocab = None
+        if counts.get('important'):
+            word_counts = word_counts + counts['important']
+            important_vocab = set(counts['important'])
+        vocabs['vocab'] = create_vocab_from_counts(word_counts, important_vocab=important_vocab,
+                                                   vocab_limit=vocab_limit, min_count=min_count,
+                                                   oov_count=oov_count)
+    for kind in ('dep', 'pos'):
+        if kind in counts:
+            vocabs[kind] = create_vocab_from_counts(counts[kind], vocab_limit=None, min_count=0,
+                                                    oov_count=oov_count)
+    return vocabs
+
+def write_vocab(filename, vocab, distribution):
+    """Write a vocab as json lines of [type, probability], the format DataHandler reads"""
+    with open(filename, 'w') as outfile:
+        for term in zip(vocab, distribution):
+            outfile.write(json.dumps(term)+'\n')
+
+def write_vocabs(prefix, vocabs):
+    """Write every kind of vocab to `prefix` + '_vocab', '_dep' and '_pos'"""
+    for kind, (vocab, _, _, distribution) in vocabs.items():
+        write_vocab(prefix + '_' + kind, vocab, distribution)
+
+@click.command()
+@click.argument('count_files', nargs=-1, required=True)
+@click.option('-o', '--out_prefix', required=True, help="Prefix for the _vocab, _dep and _pos files")
+@click.option('-m', '--min_count', default=5, help="Minimum count of a vocab to keep")
+@click.option('-v', '--vocab_limit', default=None, type=int, help='Number of most common token types to keep')
+@click.option('--merged', default=None, help="Also write the merged counts to this file")
+def main(count_files, out_prefix, min_count, vocab_limit, merged):
+    counts = merge_counts(count_files)
+    if merged:
+        write_counts(merged, counts)
+    vocabs = build_vocabs(counts, vocab_limit=vocab_limit, min_count=min_count)
+    write_vocabs(out_prefix, vocabs)
+    for kind in KINDS:
+        if kind in vocabs:
+            print("%s: %i types from %i counted" % (kind, len(vocabs[kind][0]), len(counts[kind])))
+
+if __name__ == '__main__':
+    main()
@@ -14,263 +14,83 @@ import math
 import collections
 import json
 import click
+import itertools
 from time import time
+from multiprocessing import Pool
 
-from spacy.en import English
-nlp = English()
+from parse_cache import ParseCache, CachedDoc, compact_parse
+from packed_sdp import PackedSDPWriter
+from sketch_counter import SketchCounter
+from vocab_builder import (count_vocab_from_data, create_vocab_from_counts, create_vocab_from_data, 
+                           write_counts, build_vocabs, write_vocabs)
+import sdp_arrays
+import wiki_and_semeval2sdp as w2sdp
+from wiki_and_semeval2sdp import (post_process_sdp, is_ok_sdp, vocab2idx, sec_to_hms, 
+                                  spill_sdps, read_spilled_sdps)
 
-def noun_chunk_to_head_noun(chunk):
-    """Given a chunk, find the noun who's head is outside the chunk. This is the head noun"""
-    chunk_set = set(list(chunk))
-    for token in chunk:
-        if token.head not in chunk_set:
-            return token
-    print("No head noun found in chunk... %r" % chunk.text.lower())
-    return None
-
-def sentence_to_chunk_pairs(sentence):
-    """Iterate over  sentence generating n choose 2 noun phrase heads"""
-    chunk_pairs = []
-    noun_chunks = list(sentence.noun_chunks)
-    for i, chunk1 in enumerate(noun_chunks[:-1]):
-        head1 = noun_chunk_to_head_noun(chunk1)
-        if not head1:
-            continue # don't let bad noun chunks in
-        for chunk2 in noun_chunks[i+1:]:
-            head2 = noun_chunk_to_head_noun(chunk2)
-            if not head2:
-                continue # don't let bad noun chunks in
-            chunk_pairs.append((head1, head2))
-    return chunk_pairs
-
-def smart_token_to_text(token, lower=True):
-    """Convet spacy token to lowercase text and simplify numbers and punctuation"""
-    text = token.text.lower() if lower else token.text
-    if token.is_punct:
-        text = u'<PUNCT>'
-    if token.like_num:
-        text = u'<NUM>'
-    return text
-
-def dependency_path_to_root(token):
-    """Traverse up the dependency tree. Include the token we are tracing"""
-    dep_path = [token]
-    while token.head is not token:
-        dep_path.append(token.head)
-        token = token.head
-    # dep_path.append(token.head) # add the root node
-    return dep_path
-
-def find_common_ancestor(e1_path, e2_path):
-    """Loop through both dep paths and return common ancestor"""
-    for t1 in e1_path:
-        for t2 in e2_path:
-            if t1.idx ==  t2.idx:
-                return t1
-    return None
+import nlp_loader
+from nlp_loader import parse as nlp
 
 def sentence_to_sdps(sentence, min_len=1, max_len=7, verbose=False):
     """Takes sentence and returns all shortest dependency paths (SDP) between pairs of noun phrase heads in a sentence
-    
-    Args:
-        sentence: a spacy Sentence
-        min_len (opt): the minimum number of words along the path (not including endpoints)
-    
-    Returns:
-        sdps: a dict with `path` and `target` fields
-                where `path` is a list of (word, dep) tuples (where dep is the dependency that word is the head of)
-                and `target` is the pair of head nouns at the endpoints of the path
-                
-    Notes:
-        There are three cases of SDPs: 
-        (1) there is not dependency path between X and Y. We obviously skip these
-        (2) one nominal lies on the path to root of the other (wlog X <- ... <- Y <- ...)
-            In this case we will lose one dependency, the one where X is the tail.
-                                                                            | 
-                                                                            v
-        (3) the nominals have common ancestor in the tree (wlog X <- ... <- Z -> ... -> Y)
-            In this case we will lose two dependencies, those involving X and Y.
-    """
-    noun_pairs = sentence_to_chunk_pairs(sentence)
-    for X, Y in noun_pairs:
-        ### INCLUDE X AND Y AT ENDS WITH PLACEHOLDERS ###
-        X_path = dependency_path_to_root(X)
-        Y_path = dependency_path_to_root(Y)
-        common = find_common_ancestor(X_path, Y_path)
-    #     # now we don't want nouns for assembly
-    #     X_path = X_path[1:]
-    #     Y_path = Y_path[1:]
-        # CASE (1)
-        if not common:
-            if verbose:
-                print("Bad SDP for sentence '%r' :: skipping" % sentence)
-            continue
-        # CASE (2)
-        elif X is common:
-            sdp = []
-            for token in Y_path:        # looks like (Y <- ... <- X <-) ...
-                sdp.append((smart_token_to_text(token), token.dep_))
-                if token is common:     # stop after X
-                    break
-            sdp = list(reversed(sdp))   # flip to get ... (-> X -> ... -> Y)
-        elif Y is common:
-            sdp = []
-            for token in X_path:        # looks like (X <- ... <- Y <- ) ...
-                sdp.append((smart_token_to_text(token), token.dep_))
-                if token is common:     # stop after Y
-                      break
-        # CASE (3)
-        else:
-            sdp = []
-            for token in (X_path):      # looks like (X <- ... <- Z <-) ...
-                sdp.append((smart_token_to_text(token), token.dep_))
-                if token is common:     # keep Z this time
-                    break
-            ysdp = []                   # need to keep track of seperate, then will reverse and extend later
-            for token in Y_path:        # looks like (Y <- ... <-) Z <- ... 
-                if token is common:     # don't keep Z from this side
-                    break
-                ysdp.append((smart_token_to_text(token), token.dep_))
-            sdp.extend(list(reversed(ysdp))) # looks like (X <- ... <- Z -> ... ) -> Y)
-        # convert endpoints of the paths to placeholder X and Y tokens
-        sdp[0] = (u'<X>', sdp[0][1])
-        sdp[-1] = (u'<Y>', sdp[-1][1])
-
 
-        ### CASE WHERE WE DONT INCLUDE X AND Y IN PATH.  THIS CAN LEAD TO EMPTY PATHS ###
-        # X_path = dependency_path_to_root(X)
-        # Y_path = dependency_path_to_root(Y)
-        # common = find_common_ancestor(X_path, Y_path) # need nouns to find case (2)
-        # # now we don't want nouns for assembly
-        # X_path = X_path[1:]
-        # Y_path = Y_path[1:]
-        # # CASE (1)
-        # if not common:
-        #     if verbose:
-        #         print("Bad SDP for sentence '%r' :: skipping" % sentence)
-        #     continue
-            
-        # # CASE (2)
-        # elif X is common:
-        #     sdp = []
-        #     for token in Y_path:        # looks like Y <- (...) <- X <- ...
-        #         if token is common:     # stop before X
-        #             break
-        #         sdp.append((token.text.lower(), token.dep_))
-        #     sdp = list(reversed(sdp))   # flip to get -> X -> (...) -> Y
-        # elif Y is common:
-        #     sdp = []
-        #     for token in X_path:        # looks like X <- ... <- Y 
-        #         if token is common:     # stop before Y
-        #               break
-        #         sdp.append((token.text.lower(), token.dep_))
-    
-        # # CASE (3)
-        # else:
-        #     sdp = []
-        #     for token in (X_path):      # looks like X <- (... <- Z <-) ...
-        #         sdp.append((token.text.lower(), token.dep_))
-        #         if token is common:     # keep Z this time
-        #             break
-        #     ysdp = []                   # need to keep track of seperate, then will reverse and extend later
-        #     for token in Y_path:        # looks like (Y <- ... <-) Z <- ... 
-        #         if token is common:
-        #             break
-        #         ysdp.append((token.text.lower(), token.dep_))
-        #     sdp.extend(list(reversed(ysdp))) # looks like X <- (... <- Z -> ... ) -> Y
-            
-        if len(sdp) < min_len or len(sdp) > max_len:
-            continue                    # skip ones that are too short
-        yield {'path': sdp, 'target':(X.text.lower(), Y.text.lower())}
-
-def create_vocab_from_data(sentences, vocab_limit=None, 
-                           min_count=None, dep=False, 
-                           filter_oov=False, print_oov=False,
-                           oov_count=1):
-    """Create a vocab index, inverse index, and unigram distribution over tokens from a list of spacy sentences
-    
-    if `dep`=True, return the dependencies instead of the tokens"""
-    counts = collections.Counter()
-    for sentence in sentences:
-        for token in sentence:
-            if dep:
-                counts[token.dep_] += 1
-            else:
-                if filter_oov and not token.is_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                elif not filter_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                elif print_oov:
-                    print("Token %r is oov" % token.text.lower())
-    
-    counts = counts.most_common()
-    if not (vocab_limit or min_count):
-        vocab_limit = len(counts)
-    elif vocab_limit > len(counts):
-        print("Your vocab limit %i was bigger than the number of token types, now it's %i" 
-              % (vocab_limit, len(counts)))
-        vocab_limit = len(counts)
-    elif min_count:
-        # get first index of an element that doesn't meet the requency constraint
-        vocab_limit = len(counts) # never found something too small
-        for i, count in enumerate(map(lambda x:x[1], counts)):
-            if count < min_count:
-                vocab_limit = i
-                break
-    
-    # create the vocab in most common order
-    # include an <OOV> token and make it's count the sum of all elements that didn't make the cut
-    vocab = [ x[0] for x in counts][:vocab_limit] + [u'<OOV>', u'<X>', u'<Y>', u'<NUM>', u'<PUNCT>']
-    if not oov_count and vocab_limit < len(vocab): # if we didn't specify a psuedocount, take the real one... probably a bad idea
-        oov_count = sum(map(lambda x:x[1], counts[vocab_limit:]))
-    freqs = [ x[1] for x in counts ][:vocab_limit] + [oov_count]*5
-    # calculate the empirical distribution
-    unigram_distribution = list(np.array(freqs) / np.sum(freqs, dtype=np.float32))
-    # create index and inverted index
-    vocab2int = { token:i for (i, token) in enumerate(vocab) }
-    int2vocab = { i:token for (token, i) in vocab2int.items() }
-
-    return vocab, vocab2int, int2vocab, unigram_distribution
-
-def post_process_sdp(sdp):
-    """ Filter out unwanted sdps structure """
-    bad_tokens = set([u'<PUNCT>']) #set([',', '.', '-', '(', ')', '&', '*', '_', '%', '!', '?', '/', '<', '>', '\\', '[', ']', '{', '}', '"', "'"])
-    sdp['path'] = [x for x in sdp['path'] if x[0] not in bad_tokens]
-    return sdp
-
-def is_ok_sdp(sdp, int2vocab, oov_percent=75):
-    """ Helper function to mak sure SDP isn't a poor example.
-
-    Filters used to identify bas data:
-    1. Neither targets may be oov
-    2. The relation itself must be less than `oov_percent` percent number of relations
+    The token walk of `wiki_and_semeval2sdp.sentence_to_sdps`, with (word, dep) path elements and no sentence text
     """
-    oov = int2vocab.keys()[-1]
-    # print(oov, sdp['target'])
-    if sdp['target'][0] == oov or sdp['target'][1] == oov:
-        return False
-    oov_count = len([ t for t in sdp['path'] if t[0] == oov])
-    too_many = int((oov_percent/100.0)*len(sdp['path']))
-    if oov_count > too_many:
-        return False
-    if not sdp['path'] or not sdp['target']:
-        return False
-    return True
-
-def vocab2idx(token, vocab2int):
-    """ Convert a vocab item to it's index accounting for OOV, 
-    which is assumed to be the last element of the vocab
+    for sdp in w2sdp.sentence_to_sdps(sentence, min_len=min_len, max_len=max_len, verbose=verbose):
+        yield {'path': [ (word, dep) for (word, dep, pos) in sdp['path'] ], 'target': sdp['target']}
+
+def extract_sdps(sentence, min_len=1, max_len=7, engine='tokens'):
+    """SDPs of a sentence by walking the tokens (`engine`='tokens') or with one of the head array engines
+    in `sdp_arrays`, pair by pair ('arrays') or all pairs from a shared table ('batched')"""
+    if engine == 'arrays':
+        return sdp_arrays.sentence_to_sdps(sentence, min_len=min_len, max_len=max_len, pos=False)
+    if engine == 'batched':
+        return sdp_arrays.sentence_to_sdps_batched(sentence, min_len=min_len, max_len=max_len, pos=False)
+    return sentence_to_sdps(sentence, min_len=min_len, max_len=max_len)
+
+def parse_worker_init():
+    """Load each parsing pool worker's own spacy pipeline up front"""
+    nlp_loader.get_nlp()
+
+def parse_chunk(args):
+    """Parse a chunk of raw lines inside a pool worker
+
+    `parses` holds the cached compact parse (or None) of each line when a parse cache is in use.
+    Only lines without one get parsed here.
+
+    Returns the token counts, dependency counts and the (string) SDPs of the chunk in input order,
+    which is everything the writer needs to reproduce the serial run, plus the new compact parses to cache
     """
-    if token in vocab2int:
-        return vocab2int[token]
+    lines, parses, min_len, max_len, sdp_engine = args
+    new_parses = []
+    if parses is None:
+        sentences = [ nlp(unicode(line.strip())) for line in lines ]
     else:
-        return vocab2int[u'<OOV>'] # OOV conversion
-
-def sec_to_hms(seconds):
-    """Return triple of (hour,minutes,seconds) from seconds"""
-    m, s = divmod(seconds, 60)
-    h, m = divmod(m, 60)
-    return h, m, s
+        sentences = []
+        for line, parse in zip(lines, parses):
+            if parse is None:
+                text = unicode(line.strip())
+                parse = compact_parse(nlp(text), text=text)
+                new_parses.append(parse)
+            sentences.append(CachedDoc(parse))
+    vocab_counts = count_vocab_from_data(sentences, dep=False)
+    dep_counts = count_vocab_from_data(sentences, dep=True)
+    sdps = [ sdp for sentence in sentences 
+                 for sdp in extract_sdps(sentence, min_len=min_len, max_len=max_len, engine=sdp_engine) ]
+    return vocab_counts, dep_counts, sdps, new_parses
+
+def read_line_chunks(sentence_file, num_sentences, chunk_size):
+    """Read the sentence file in lists of `chunk_size` lines, stopping after `num_sentences`"""
+    chunk = []
+    for i, line in enumerate(open(sentence_file, 'r')):
+        if i > num_sentences:
+            break
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 @click.command()
 @click.option('-n', '--num_sentences', default=10000, help="Number of sentences to use")
@@ -280,7 +100,17 @@ def sec_to_hms(seconds):
 @click.option('-o', '--outfile', default='data/shuffled_wiki_sdp_', help='Outfile prefix')
 @click.option('--minlen', default=1, help="Minimum length of the dependency path not including nominals")
 @click.option('--maxlen', default=7, help="Maximum length of the dependency path not including nominals")
-def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen):
+@click.option('-p', '--procs', default=1, help="Number of parsing processes. More than 1 uses a worker pool")
+@click.option('--chunk_size', default=1000, help="Number of sentences handed to a parsing worker at a time")
+@click.option('--stream', default=False, is_flag=True, help="Spill SDPs to disk and map them in a second pass instead of keeping every parse in memory")
+@click.option('--parse_cache', default=None, help="Parse cache file. Sentences found in it aren't reparsed, new parses are added to it")
+@click.option('--sdp_engine', default='tokens', type=click.Choice(['tokens', 'arrays', 'batched']), 
+              help="Extract SDPs by walking spacy tokens, or with the head array engines in sdp_arrays")
+@click.option('--packed', default=False, is_flag=True, help="Also write the SDPs in the memory mappable packed binary format")
+@click.option('--sketch_mb', default=0., help="Count words approximately in a count-min sketch of this many MB instead of exactly")
+@click.option('--sketch_top', default=200000, help="Number of most common words the sketch keeps, should be more than the vocab")
+def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen, procs, chunk_size, stream, parse_cache, sdp_engine, packed,
+         sketch_mb, sketch_top):
     FLAGS = {
         'num_sentences': num_sentences, # max is 31661479
         'min_count':min_count,        
@@ -295,51 +125,110 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen)
     print("="*80)
 
     print("(%i:%i:%i) Reading Data..." % sec_to_hms(time()-start))
-    sentences = []
-    for i, line in enumerate(open(FLAGS['sentence_file'], 'r')):
-        if i > FLAGS['num_sentences']:
-            break
-        sentences.append(nlp(unicode(line.strip())))
+    if parse_cache:
+        parse_cache = ParseCache(parse_cache, parser=lambda text: nlp(text))
+        parse = parse_cache.parse
+    else:
+        parse = nlp
+    if stream:
+        # pass one only keeps the counts, the SDPs wait on disk for the vocab
+        spill_name = FLAGS['out_prefix'] + str(FLAGS['num_sentences']) + '_spill'
+        spill = open(spill_name, 'w')
+    vocab_counts = collections.Counter()
+    if sketch_mb:
+        # bounded memory however many word types there are, at the price of approximate counts
+        vocab_counts = SketchCounter.from_memory(sketch_mb, top=sketch_top)
+    dep_counts = collections.Counter()
+    if procs > 1:
+        # workers parse and extract SDPs, we just merge their counts in order
+        # a rolling window of 4 chunks per worker is in flight, a new one goes out as soon as the oldest is merged,
+        # so the input isn't all read ahead (as Pool.imap would) and the workers never wait on a whole window
+        # the cache lookups stay here in the main process, next to the puts
+        sdps = []
+        pool = Pool(procs, initializer=parse_worker_init)
+        tasks = ( (chunk, 
+                   [ parse_cache.get(unicode(line.strip())) for line in chunk ] if parse_cache else None,
+                   minlen, maxlen, sdp_engine) 
+                  for chunk in read_line_chunks(FLAGS['sentence_file'], FLAGS['num_sentences'], chunk_size) )
+        in_flight = collections.deque( pool.apply_async(parse_chunk, (task,)) 
+                                       for task in itertools.islice(tasks, 4*procs) )
+        while in_flight:
+            chunk_vocab, chunk_deps, chunk_sdps, chunk_parses = in_flight.popleft().get()
+            for task in itertools.islice(tasks, 1):
+                in_flight.append(pool.apply_async(parse_chunk, (task,)))
+            vocab_counts.update(chunk_vocab)
+            dep_counts.update(chunk_deps)
+            if stream:
+                spill_sdps(chunk_sdps, spill)
+            else:
+                sdps.extend(chunk_sdps)
+            for new_parse in chunk_parses:
+                parse_cache.put(new_parse)
+        pool.close()
+        pool.join()
+    elif stream:
+        for i, line in enumerate(open(FLAGS['sentence_file'], 'r')):
+            if i > FLAGS['num_sentences']:
+                break
+            sentence = parse(unicode(line.strip()))
+            count_vocab_from_data([sentence], dep=False, counts=vocab_counts)
+            count_vocab_from_data([sentence], dep=True, counts=dep_counts)
+            spill_sdps(extract_sdps(sentence, min_len=minlen, max_len=maxlen, engine=sdp_engine), spill)
+    else:
+        sentences = []
+        for i, line in enumerate(open(FLAGS['sentence_file'], 'r')):
+            if i > FLAGS['num_sentences']:
+                break
+            sentences.append(parse(unicode(line.strip())))
+        count_vocab_from_data(sentences, dep=False, counts=vocab_counts)
+        count_vocab_from_data(sentences, dep=True, counts=dep_counts)
+        sdps = ( sdp for sentence in sentences 
+                     for sdp in extract_sdps(sentence, min_len=minlen, max_len=maxlen, engine=sdp_engine) )
+    if parse_cache:
+        parse_cache.close()
+    if stream:
+        spill.close()
+        sdps = read_spilled_sdps(spill_name)
 
     print("(%i:%i:%i) Creating vocab..." % sec_to_hms(time()-start))
-    vocab, vocab2int, int2vocab, vocab_dist = create_vocab_from_data(sentences,
-                                                                 vocab_limit=FLAGS['vocab_limit'],
-                                                                 min_count=FLAGS['min_count'],
-                                                                 dep=False,
-                                                                 oov_count=1)
-    dep_vocab, dep2int, int2dep, dep_dist = create_vocab_from_data(sentences,
-                                                                 vocab_limit=None,
-                                                                 min_count=0,
-                                                                 dep=True,
-                                                                 oov_count=1)
+    if sketch_mb:
+        print("Word counts are overestimated by at most %0.1f (with probability %0.3f)" 
+              % (vocab_counts.error_bound(), 1 - vocab_counts.delta()))
+    counts = {'vocab':vocab_counts, 'dep':dep_counts}
+    write_counts(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_counts', counts)
+    vocabs = build_vocabs(counts, vocab_limit=FLAGS['vocab_limit'], min_count=FLAGS['min_count'])
+    vocab, vocab2int, int2vocab, vocab_dist = vocabs['vocab']
+    dep_vocab, dep2int, int2dep, dep_dist = vocabs['dep']
     # write out the data
     print("(%i:%i:%i) Writing data..." % sec_to_hms(time()-start))
     sdp_count = 0
+    if packed:
+        packed = PackedSDPWriter(FLAGS['out_prefix'] + str(FLAGS['num_sentences']))
     with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences']), 'w') as outfile:
-        for sentence in sentences:
-            for sdp in sentence_to_sdps(sentence, min_len=minlen, max_len=maxlen):
-                # convert from tokens to indices
-                post_process_sdp(sdp)
-                sdp['path'] = [ (vocab2idx(x[0], vocab2int), vocab2idx(x[1], dep2int)) for x in sdp['path'] ]
-                sdp['target'] = [ vocab2idx(sdp['target'][0], vocab2int), vocab2idx(sdp['target'][1], vocab2int) ]
-                if is_ok_sdp(sdp, int2vocab):
-                    sdp_count += 1
-                    # write out the dict as json line
-                    outfile.write(json.dumps(sdp) + '\n')
+        for sdp in sdps:
+            # convert from tokens to indices
+            post_process_sdp(sdp)
+            sdp['path'] = [ (vocab2idx(x[0], vocab2int), vocab2idx(x[1], dep2int)) for x in sdp['path'] ]
+            sdp['target'] = [ vocab2idx(sdp['target'][0], vocab2int), vocab2idx(sdp['target'][1], vocab2int) ]
+            if is_ok_sdp(sdp, vocab2int):
+                sdp_count += 1
+                # write out the dict as json line
+                outfile.write(json.dumps(sdp) + '\n')
+                if packed:
+                    packed.write(sdp)
+    if packed:
+        packed.close()
+    if stream:
+        os.remove(spill_name)
 
     # write out the vocab file
     print("(%i:%i:%i) Writing vocab..." % sec_to_hms(time()-start))
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_vocab', 'w') as outfile:
-        for term in zip(vocab, vocab_dist):
-            outfile.write(json.dumps(term)+'\n')
-
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_dep', 'w') as outfile:
-        for term in zip(dep_vocab, dep_dist):
-            outfile.write(json.dumps(term)+'\n')
+    write_vocabs(FLAGS['out_prefix'] + str(FLAGS['num_sentences']), vocabs)
 
     print("="*80)
     print("DONE: Created %i SDPs from %i sentences with a total vocab size of %i" % (sdp_count, num_sentences, len(vocab)))
     print("Took a total of %i:%i:%i hours" % sec_to_hms(time()-start))
+    nlp_loader.report()
     print("="*80)
 
 if __name__ == '__main__':
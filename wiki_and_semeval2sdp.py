@@ -5,6 +5,10 @@ Data writer script.  Takes Mohamed's tokenized wiki sentences and creates nice d
 (2) a vocab and unigram distribution file for the tokens
 (3) a vocab and unigram distribution file for the dependency labels
 
+With --num_shards the sentences are split into numbered shards that are parsed one at a time.
+Each shard writes its string SDPs and vocab counts into `<outfile>_shards/` with a `_done` marker at the end,
+so a rerun skips finished shards and shards can be run on different machines with --shards and --no_merge.
+Once every shard is done the counts are merged into the global vocab and the outputs are written as usual.
 """
 from __future__ import print_function
 import numpy as np
@@ -14,12 +18,21 @@ import math
 import collections
 import json
 import click
+import itertools
 from time import time
 
 import semeval_data_helper as sdh
-
-from spacy.en import English
-nlp = English()
+from parse_cache import ParseCache
+from packed_sdp import PackedSDPWriter
+from sketch_counter import SketchCounter
+from sdp_dep_structures import ok_dep_trie
+from vocab_builder import (count_vocab_from_data, count_sentences, create_vocab_from_counts, 
+                           create_vocab_from_data, new_counts, write_counts, merge_counts, 
+                           build_vocabs, write_vocabs)
+import sdp_arrays
+
+import nlp_loader
+from nlp_loader import parse as nlp
 
 def noun_chunk_to_head_noun(chunk):
     """Given a chunk, find the noun who's head is outside the chunk. This is the head noun"""
@@ -71,12 +84,34 @@ def find_common_ancestor(e1_path, e2_path):
                 return t1
     return None
 
-def sentence_to_sdps(sentence, include_ends=False, min_len=1, max_len=7, verbose=False):
+def sdp_tokens(X_path, Y_path, common):
+    """Lazily the tokens of the SDP in path order, X <- ... <- common -> ... -> Y"""
+    for token in X_path:
+        yield token
+        if token is common:
+            break
+    down = []
+    for token in Y_path:
+        if token is common:
+            break
+        down.append(token)
+    for token in reversed(down):
+        yield token
+
+def kept_by_post_process(token, X, Y, include_ends=False):
+    """Whether `post_process_sdp` keeps the path element of `token`. It drops <PUNCT>, but the ends are <X> and <Y>"""
+    if not include_ends and (token is X or token is Y):
+        return True
+    return smart_token_to_text(token) != u'<PUNCT>'
+
+def sentence_to_sdps(sentence, include_ends=False, min_len=1, max_len=7, structures=None, verbose=False):
     """Takes sentence and returns all shortest dependency paths (SDP) between pairs of noun phrase heads in a sentence
     
     Args:
         sentence: a spacy Sentence
         min_len (opt): the minimum number of words along the path (not including endpoints)
+        structures (opt): a sdp_dep_structures.DepTrie of dep labels. Paths whose dep structure (after post processing)
+                          isn't in it are dropped as soon as the walk leaves the trie, before the path is built
     
     Returns:
         sdps: a dict with `path` and `target` fields
@@ -107,6 +142,11 @@ def sentence_to_sdps(sentence, include_ends=False, min_len=1, max_len=7, verbose
             if verbose:
                 print("Bad SDP for sentence '%r' :: skipping" % sentence)
             continue
+        # is_ok_sdp would throw it out for its dep structure anyway
+        elif structures is not None and not structures.accepts_path(
+                token.dep_ for token in sdp_tokens(X_path, Y_path, common)
+                if kept_by_post_process(token, X, Y, include_ends)):
+            continue
         # CASE (2)
         elif X is common:
             sdp = []
@@ -186,77 +226,73 @@ def sentence_to_sdps(sentence, include_ends=False, min_len=1, max_len=7, verbose
             continue                    # skip ones that are too short
         yield {'path': sdp, 'target':(X.text.lower(), Y.text.lower()), 'sent':sentence.text}
 
-def create_vocab_from_data(sentences, important_sentences=[], vocab_limit=None, 
-                           min_count=None, dep=False, pos=False,
-                           filter_oov=False, print_oov=False,
-                           oov_count=1):
-    """Create a vocab index, inverse index, and unigram distribution over tokens from a list of spacy sentences
-    
-    if `dep`=True, return the dependencies instead of the tokens"""
-    counts = collections.Counter()
-    for sentence in sentences:
-        for token in sentence:
-            if dep:
-                counts[token.dep_] += 1
-            elif pos:
-                counts[token.pos_] += 1
-            else:
-                if filter_oov and not token.is_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                elif not filter_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                elif print_oov:
-                    print("Token %r is oov" % token.text.lower())
-     # if we specify important sentences, vocab limits and min frequencies don't apply
-    # that way we have total vocab coverage over these sentences
-    if important_sentences:
-        important_vocab = set()
-        for sentence in important_sentences:
-            for token in sentence:
-                if filter_oov and not token.is_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                    important_vocab.add(token.text.lower())
-                elif not filter_oov and token.text not in [u' ', u'\n\n']:
-                    counts[token.text.lower()] += 1
-                    important_vocab.add(token.text.lower())
-                elif print_oov:
-                    print("Token %r is oov" % token.text.lower())
-
-    counts = counts.most_common()
-    if not (vocab_limit or min_count):
-        vocab_limit = len(counts)
-    elif vocab_limit > len(counts):
-        print("Your vocab limit %i was bigger than the number of token types, now it's %i" 
-              % (vocab_limit, len(counts)))
-        vocab_limit = len(counts)
-    elif min_count:
-        # get first index of an element that doesn't meet the requency constraint
-        vocab_limit = len(counts) # never found something too small
-        for i, count in enumerate(map(lambda x:x[1], counts)):
-            if count < min_count:
-                vocab_limit = i
-                break
-    # now if we have important sentences
-    # we need to add the missing vocabs back to the vocab and increase the size
-    if important_sentences:
-        missing_important = [count for count in counts[vocab_limit:] if count[0] in important_vocab]
-        counts = counts[:vocab_limit] + missing_important
-        vocab_limit = len(counts)
-        print("Kept %i missing important words" % len(missing_important) )
-
-    # create the vocab in most common order
-    # include an <OOV> token and make it's count the sum of all elements that didn't make the cut
-    vocab = [ x[0] for x in counts][:vocab_limit] + [u'<OOV>', u'<X>', u'<Y>', u'<NUM>', u'<PUNCT>']
-    if not oov_count and vocab_limit < len(vocab): # if we didn't specify a psuedocount, take the real one... probably a bad idea
-        oov_count = sum(map(lambda x:x[1], counts[vocab_limit:]))
-    freqs = [ x[1] for x in counts ][:vocab_limit] + [oov_count]*5
-    # calculate the empirical distribution
-    unigram_distribution = list(np.array(freqs) / np.sum(freqs, dtype=np.float32))
-    # create index and inverted index
-    vocab2int = { token:i for (i, token) in enumerate(vocab) }
-    int2vocab = { i:token for (token, i) in vocab2int.items() }
-
-    return vocab, vocab2int, int2vocab, unigram_distribution
+def extract_sdps(sentence, include_ends=False, min_len=1, max_len=7, engine='tokens', structures=None):
+    """SDPs of a sentence by walking the tokens (`engine`='tokens') or with one of the head array engines
+    in `sdp_arrays`, pair by pair ('arrays') or all pairs from a shared table ('batched')
+
+    With a dep structure trie `structures`, paths whose structure isn't in it are never built"""
+    if engine == 'arrays':
+        return sdp_arrays.sentence_to_sdps(sentence, include_ends=include_ends, 
+                                           min_len=min_len, max_len=max_len, sent=True, structures=structures)
+    if engine == 'batched':
+        return sdp_arrays.sentence_to_sdps_batched(sentence, include_ends=include_ends, 
+                                                   min_len=min_len, max_len=max_len, sent=True, structures=structures)
+    return sentence_to_sdps(sentence, include_ends=include_ends, min_len=min_len, max_len=max_len,
+                            structures=structures)
+
+def spill_sdps(sdps, spill_file):
+    """Write string SDPs out as json lines so we don't have to hold them (or their parses) in memory"""
+    for sdp in sdps:
+        spill_file.write(json.dumps(sdp) + '\n')
+
+def read_spilled_sdps(spill_name):
+    """Read back the string SDPs written by `spill_sdps`"""
+    with open(spill_name, 'r') as f:
+        for line in f:
+            yield json.loads(line)
+
+def shard_bounds(num_lines, num_shards):
+    """Split the first `num_lines` lines into `num_shards` contiguous (start, stop) ranges of about equal size"""
+    return [ (k*num_lines // num_shards, (k+1)*num_lines // num_shards) for k in range(num_shards) ]
+
+def shard_prefix(shard_dir, shard):
+    return os.path.join(shard_dir, 'shard_%05i' % shard)
+
+def read_shard_marker(shard_dir, shard):
+    """The completion marker of a shard, or None if it hasn't finished"""
+    marker = shard_prefix(shard_dir, shard) + '_done'
+    if not os.path.exists(marker):
+        return None
+    with open(marker, 'r') as f:
+        return json.load(f)
+
+def process_shard(shard_dir, shard, bounds, sentence_file, parse, settings,
+                  include_ends=False, minlen=0, maxlen=10, sdp_engine='tokens', structures=None):
+    """Parse the lines of one shard and write its string SDPs and vocab/dep/pos counts
+
+    The files are written under temporary names and moved into place before the `_done` marker is written,
+    so a shard either has a marker and complete files or gets redone from scratch"""
+    start, stop = bounds
+    prefix = shard_prefix(shard_dir, shard)
+    counts = new_counts()
+    sdp_count = 0
+    shard_start = time()
+    with open(prefix + '_records.tmp', 'w') as records:
+        lines = itertools.islice(open(sentence_file, 'r'), start, stop)
+        for line in lines:
+            sentence = parse(unicode(line.strip()))
+            count_sentences([sentence], counts=counts)
+            for sdp in extract_sdps(sentence, include_ends=include_ends, min_len=minlen, max_len=maxlen,
+                                    engine=sdp_engine, structures=structures):
+                records.write(json.dumps(sdp) + '\n')
+                sdp_count += 1
+    write_counts(prefix + '_counts.tmp', counts)
+    os.rename(prefix + '_records.tmp', prefix + '_records')
+    os.rename(prefix + '_counts.tmp', prefix + '_counts')
+    marker = dict(settings, start=start, stop=stop, num_sdps=sdp_count, seconds=time()-shard_start)
+    with open(prefix + '_done', 'w') as f:
+        json.dump(marker, f)
+    return marker
 
 def post_process_sdp(sdp):
     """ Filter out unwanted sdps structure """
@@ -264,14 +300,14 @@ def post_process_sdp(sdp):
     sdp['path'] = [x for x in sdp['path'] if x[0] not in bad_tokens]
     return sdp
 
-def is_ok_sdp(sdp, vocab2int, ok_dep_structures, oov_percent=75):
+def is_ok_sdp(sdp, vocab2int, ok_dep_structures=None, oov_percent=75):
     """ Helper function to mak sure SDP isn't a poor example.
 
     Filters used to identify bas data:
     1. Neither targets may be oov
     2. The relation itself must be less than `oov_percent` percent number of oovs
     3. It must have a `path` and a `target` (go figure)
-    4. The POS sequence must be in the set of ok structures
+    4. The dep sequence must be one of the ok structures (a sdp_dep_structures.DepTrie over dep ids), if given
     """
     oov = vocab2int[u'<OOV>']
     # print(oov, sdp['target'])
@@ -285,9 +321,8 @@ def is_ok_sdp(sdp, vocab2int, ok_dep_structures, oov_percent=75):
     if not sdp['path'] or not sdp['target']:
         return False
 
-    # get rid of pos structures not in the set
-    dep_structure = tuple([ p[1] for p in sdp['path'] ])
-    if dep_structure not in ok_dep_structures:
+    # get rid of dep structures not in the trie, the walk stops at the first label that's off
+    if ok_dep_structures is not None and not ok_dep_structures.accepts_path(p[1] for p in sdp['path']):
         # print("Bad structure: %r" % list(pos_structure))
         return False 
     return True
@@ -327,7 +362,19 @@ def sec_to_hms(seconds):
 @click.option('--include_ends', default=False, is_flag=True, help="Include the endpoints of the sdps, not <X>,<Y>")
 @click.option('--include_semeval', default=False, is_flag=True, help="Whether to include semeval training instances in data")
 @click.option('--single', default=False, is_flag=True, help="Whether to convert an SDP into two with a single target per")
-def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen, include_ends, include_semeval, single):
+@click.option('--stream', default=False, is_flag=True, help="Spill SDPs to disk and map them in a second pass instead of keeping every parse in memory")
+@click.option('--parse_cache', default=None, help="Parse cache file. Sentences found in it aren't reparsed, new parses are added to it")
+@click.option('--sdp_engine', default='tokens', type=click.Choice(['tokens', 'arrays', 'batched']), 
+              help="Extract SDPs by walking spacy tokens, or with the head array engines in sdp_arrays")
+@click.option('--packed', default=False, is_flag=True, help="Also write the SDPs in the memory mappable packed binary format")
+@click.option('--num_shards', default=0, help="Split the sentences into this many shards that are parsed (and resumed) separately")
+@click.option('--shards', default=None, help="Comma separated shards to run, e.g. to spread them over machines (default all)")
+@click.option('--no_merge', default=False, is_flag=True, help="Only run the shards, don't merge them into the final output")
+@click.option('--sketch_mb', default=0., help="Count words approximately in a count-min sketch of this many MB instead of exactly")
+@click.option('--sketch_top', default=200000, help="Number of most common words the sketch keeps, should be more than the vocab")
+@click.option('--prefilter', default=False, is_flag=True, help="Drop SDPs with a bad dep structure while walking the parse, before they're built (they won't be in the records)")
+def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen, include_ends, include_semeval, single, stream, parse_cache, sdp_engine, packed,
+         num_shards, shards, no_merge, sketch_mb, sketch_top, prefilter):
     if include_ends:
         outfile += 'include_'
     if single:
@@ -346,39 +393,100 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen,
     print("="*80)
 
     print("(%i:%i:%i) Reading Data..." % sec_to_hms(time()-start))
-    wiki_sentences = []
-    for i, line in enumerate(open(FLAGS['sentence_file'], 'r')):
-        if i > FLAGS['num_sentences']:
-            break
-        wiki_sentences.append(nlp(unicode(line.strip())))
+    if parse_cache:
+        parse_cache = ParseCache(parse_cache, parser=lambda text: nlp(text))
+        parse = parse_cache.parse
+    else:
+        parse = nlp
+    # the ok dep structures, over labels while extracting and over dep ids once there's a dep vocab
+    dep_trie = ok_dep_trie()
+    structures = dep_trie if prefilter else None
+    counts = new_counts()
+    if sketch_mb:
+        # bounded memory however many word types there are, at the price of approximate counts
+        counts['vocab'] = SketchCounter.from_memory(sketch_mb, top=sketch_top)
+    if num_shards:
+        # every shard keeps its string SDPs and counts on disk, with a marker once it's complete
+        # so a rerun only redoes unfinished shards, and the merge below builds the vocab from the counts
+        shard_dir = FLAGS['out_prefix'] + str(FLAGS['num_sentences']) + '_shards'
+        if not os.path.isdir(shard_dir):
+            os.makedirs(shard_dir)
+        settings = {'sentence_file':FLAGS['sentence_file'], 'num_sentences':FLAGS['num_sentences'],
+                    'num_shards':num_shards, 'include_ends':include_ends, 
+                    'minlen':minlen, 'maxlen':maxlen, 'sdp_engine':sdp_engine, 'prefilter':prefilter}
+        # the same lines as the unsharded loops read
+        bounds = shard_bounds(FLAGS['num_sentences'] + 1, num_shards)
+        to_run = [ int(k) for k in shards.split(',') ] if shards else range(num_shards)
+        for shard in to_run:
+            marker = read_shard_marker(shard_dir, shard)
+            if marker is not None:
+                marker.setdefault('prefilter', False) # shards from before --prefilter weren't prefiltered
+                if any(marker.get(key) != value for key, value in settings.items()):
+                    raise click.ClickException("Shard %i in %s was made with different settings, "
+                                               "remove it or use another outfile" % (shard, shard_dir))
+                print("(%i:%i:%i) Shard %i already done, skipping" % (sec_to_hms(time()-start) + (shard,)))
+                continue
+            print("(%i:%i:%i) Shard %i: lines %i to %i..." % (sec_to_hms(time()-start) + (shard,) + bounds[shard]))
+            marker = process_shard(shard_dir, shard, bounds[shard], FLAGS['sentence_file'], parse, settings,
+                                   include_ends=include_ends, minlen=minlen, maxlen=maxlen, sdp_engine=sdp_engine,
+                                   structures=structures)
+            print("(%i:%i:%i) Shard %i done, %i SDPs" % (sec_to_hms(time()-start) + (shard, marker['num_sdps'])))
+        missing = [ shard for shard in range(num_shards) if read_shard_marker(shard_dir, shard) is None ]
+        if no_merge or missing:
+            if parse_cache:
+                parse_cache.close()
+            if missing:
+                print("Shards %s still to do, not merging yet" % ','.join(map(str, missing)))
+            return
+        print("(%i:%i:%i) Merging %i shards..." % (sec_to_hms(time()-start) + (num_shards,)))
+        merge_counts([ shard_prefix(shard_dir, shard) + '_counts' for shard in range(num_shards) ], counts=counts)
+        wiki_sdps = ( sdp for shard in range(num_shards) 
+                          for sdp in read_spilled_sdps(shard_prefix(shard_dir, shard) + '_records') )
+    elif stream:
+        # pass one only keeps the counts, the SDPs wait on disk for the vocab
+        spill_name = FLAGS['out_prefix'] + str(FLAGS['num_sentences']) + '_spill'
+        with open(spill_name, 'w') as spill:
+            for i, line in enumerate(open(FLAGS['sentence_file'], 'r')):
+                if i > FLAGS['num_sentences']:
+                    break
+                sentence = parse(unicode(line.strip()))
+                count_sentences([sentence], counts=counts)
+                spill_sdps(extract_sdps(sentence, include_ends=include_ends, min_len=minlen, max_len=maxlen,
+                                        engine=sdp_engine, structures=structures), 
+                           spill)
+        wiki_sdps = read_spilled_sdps(spill_name)
+    else:
+        wiki_sentences = []
+        for i, line in enumerate(open(FLAGS['sentence_file'], 'r')):
+            if i > FLAGS['num_sentences']:
+                break
+            wiki_sentences.append(parse(unicode(line.strip())))
+        count_sentences(wiki_sentences, counts=counts)
+        wiki_sdps = ( sdp for sentence in wiki_sentences 
+                          for sdp in extract_sdps(sentence, include_ends=include_ends, engine=sdp_engine, 
+                                                      min_len=minlen, max_len=maxlen, structures=structures) )
         
-    train, valid, test, label2int, int2label = sdh.load_semeval_data(shuffle_seed=0, include_ends=include_ends, single=single)
+    train, valid, test, label2int, int2label = sdh.load_semeval_data(shuffle_seed=0, include_ends=include_ends, single=single,
+                                                                     parse_cache=parse_cache)
+    if parse_cache:
+        parse_cache.close()
     # semdata = sdh.load_semeval_data(shuffle_seed=0, include_ends=include_ends, single=single)
     # print(semdata)
     sem_sentences = [ sent[0] for sent in train['sents']+valid['sents']+test['sents'] ]
 
     print("(%i:%i:%i) Creating vocab..." % sec_to_hms(time()-start))
-    vocab, vocab2int, int2vocab, vocab_dist = create_vocab_from_data(wiki_sentences,
-                                                                 important_sentences=sem_sentences,
-                                                                 vocab_limit=FLAGS['vocab_limit'],
-                                                                 min_count=FLAGS['min_count'],
-                                                                 dep=False, pos=False,
-                                                                 oov_count=1)
-    dep_vocab, dep2int, int2dep, dep_dist = create_vocab_from_data(wiki_sentences,
-                                                                 important_sentences=None,                                                                 
-                                                                 vocab_limit=None,
-                                                                 min_count=0,
-                                                                 dep=True, pos=False,
-                                                                 oov_count=1)
-    pos_vocab, pos2int, int2pos, pos_dist = create_vocab_from_data(wiki_sentences,
-                                                                 important_sentences=None,
-                                                                 vocab_limit=None,
-                                                                 min_count=0,
-                                                                 dep=False, pos=True,
-                                                                 oov_count=1)
+    if sketch_mb:
+        print("Word counts are overestimated by at most %0.1f (with probability %0.3f)" 
+              % (counts['vocab'].error_bound(), 1 - counts['vocab'].delta()))
+    # the semeval sentences are important, so we keep all of their vocab no matter the limits
+    counts['important'] = count_vocab_from_data(sem_sentences)
+    write_counts(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_counts', counts)
+    vocabs = build_vocabs(counts, vocab_limit=FLAGS['vocab_limit'], min_count=FLAGS['min_count'])
+    vocab, vocab2int, int2vocab, vocab_dist = vocabs['vocab']
+    dep_vocab, dep2int, int2dep, dep_dist = vocabs['dep']
+    pos_vocab, pos2int, int2pos, pos_dist = vocabs['pos']
     # convert the pos_structures to indices under this vocab mapping
-    from sdp_dep_structures import ok_dep_structures
-    ok_dep_structures = set([tuple(dep2int[d] for d in dep) for dep in ok_dep_structures])
+    ok_dep_structures = dep_trie.mapped(dep2int)
     # reformat semeval data to a form amenable with wiki
     sem_data = [{'path':sdp, 'target':target, 'sent':sent[0].text} for (sdp, target, sent)
                 in zip(train['sdps']+valid['sdps'], 
@@ -388,6 +496,8 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen,
     print("(%i:%i:%i) Writing data..." % sec_to_hms(time()-start))
     sdp_count = 0
     bad_sdp_count = 0
+    if packed:
+        packed = PackedSDPWriter(FLAGS['out_prefix'] + str(FLAGS['num_sentences']))
     with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_records', 'w') as records:
         with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences']), 'w') as outfile:
             # semeval
@@ -406,62 +516,64 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen,
                         # write out the dict as json line
                         outfile.write(json.dumps(sdp) + '\n')
                         records.write(" :: GOOD\n")
+                        if packed:
+                            packed.write(sdp)
                     else:
                         bad_sdp_count += 1
                         records.write(" :: BAD\n")
             # wiki
-            for sentence in wiki_sentences:
-                print('*'*80)
-                print("Wiki Sentence:\n%s" % sentence)
-                for sdp in sentence_to_sdps(sentence, include_ends=include_ends, min_len=minlen, max_len=maxlen):
-                    records.write("%s" % json.dumps(sdp))
-                    # convert from tokens to indices
-                    post_process_sdp(sdp)
-                    sdp['path'] = [ (vocab2idx(x[0], vocab2int), vocab2idx(x[1], dep2int), vocab2idx(x[2], pos2int)) 
-                                    for x in sdp['path'] ]
-                    sdp['target'] = [ vocab2idx(t, vocab2int) for t in sdp['target'] ]
-                    sdp['source'] = 'WIKI'
-                    if is_ok_sdp(sdp, vocab2int, ok_dep_structures):
-                        x, y = [idx2vocab(t, int2vocab) for t in sdp['target']]
-                        p = [idx2vocab(t[0], int2vocab) for t in sdp['path']]
-                        print("Extracted SDP: <%s>, %s, <%s>" % (x, " ".join(p), y))
-                        # q = raw_input("<Enter> Continue (q to quit)")
-                        # if q == 'q': quit()
-                        if single:
-                            dup = {k:v[:] for k,v in sdp.items()} # duplicate
-                            dup['path'] = dup['path'][::-1]       # reverse the path
-                            dup['path'][-1] = (vocab2idx(u'<X>', vocab2int), dup['path'][-1][1], dup['path'][-1][2]) # convert last to a directional token
-                            sdp['path'][-1] = (vocab2idx(u'<Y>', vocab2int), sdp['path'][-1][1], sdp['path'][-1][2]) # "
-                            dup['target'] = [dup['target'][0]] # target is just the other entity, predict X|Y
-                            sdp['target'] = [sdp['target'][1]] # Y|X, data handler expects targets as lists
-                            sdp_count += 2
-                            # write out the dict as json line
-                            outfile.write(json.dumps(sdp) + '\n')
-                            outfile.write(json.dumps(dup) + '\n')
-                            records.write(" :: GOOD\n")
-                        else:
-                            sdp_count += 1
-                            # write out the dict as json line
-                            outfile.write(json.dumps(sdp) + '\n')
-                            records.write(" :: GOOD\n")
+            last_sent = None
+            for sdp in wiki_sdps:
+                if sdp['sent'] != last_sent:
+                    last_sent = sdp['sent']
+                    print('*'*80)
+                    print("Wiki Sentence:\n%s" % last_sent)
+                records.write("%s" % json.dumps(sdp))
+                # convert from tokens to indices
+                post_process_sdp(sdp)
+                sdp['path'] = [ (vocab2idx(x[0], vocab2int), vocab2idx(x[1], dep2int), vocab2idx(x[2], pos2int)) 
+                                for x in sdp['path'] ]
+                sdp['target'] = [ vocab2idx(t, vocab2int) for t in sdp['target'] ]
+                sdp['source'] = 'WIKI'
+                if is_ok_sdp(sdp, vocab2int, ok_dep_structures):
+                    x, y = [idx2vocab(t, int2vocab) for t in sdp['target']]
+                    p = [idx2vocab(t[0], int2vocab) for t in sdp['path']]
+                    print("Extracted SDP: <%s>, %s, <%s>" % (x, " ".join(p), y))
+                    # q = raw_input("<Enter> Continue (q to quit)")
+                    # if q == 'q': quit()
+                    if single:
+                        dup = {k:v[:] for k,v in sdp.items()} # duplicate
+                        dup['path'] = dup['path'][::-1]       # reverse the path
+                        dup['path'][-1] = (vocab2idx(u'<X>', vocab2int), dup['path'][-1][1], dup['path'][-1][2]) # convert last to a directional token
+                        sdp['path'][-1] = (vocab2idx(u'<Y>', vocab2int), sdp['path'][-1][1], sdp['path'][-1][2]) # "
+                        dup['target'] = [dup['target'][0]] # target is just the other entity, predict X|Y
+                        sdp['target'] = [sdp['target'][1]] # Y|X, data handler expects targets as lists
+                        sdp_count += 2
+                        # write out the dict as json line
+                        outfile.write(json.dumps(sdp) + '\n')
+                        outfile.write(json.dumps(dup) + '\n')
+                        records.write(" :: GOOD\n")
+                        if packed:
+                            packed.write(sdp)
+                            packed.write(dup)
                     else:
-                        bad_sdp_count += 1
-                        records.write(" :: BAD\n")
-
+                        sdp_count += 1
+                        # write out the dict as json line
+                        outfile.write(json.dumps(sdp) + '\n')
+                        records.write(" :: GOOD\n")
+                        if packed:
+                            packed.write(sdp)
+                else:
+                    bad_sdp_count += 1
+                    records.write(" :: BAD\n")
+    if packed:
+        packed.close()
+    if stream:
+        os.remove(spill_name)
 
     # write out the vocab file
     print("(%i:%i:%i) Writing vocab..." % sec_to_hms(time()-start))
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_vocab', 'w') as outfile:
-        for term in zip(vocab, vocab_dist):
-            outfile.write(json.dumps(term)+'\n')
-
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_dep', 'w') as outfile:
-        for term in zip(dep_vocab, dep_dist):
-            outfile.write(json.dumps(term)+'\n')
-
-    with open(FLAGS['out_prefix'] + str(FLAGS['num_sentences'])+'_pos', 'w') as outfile:
-        for term in zip(pos_vocab, pos_dist):
-            outfile.write(json.dumps(term)+'\n')
+    write_vocabs(FLAGS['out_prefix'] + str(FLAGS['num_sentences']), vocabs)
 
     if include_semeval:
         num_sentences += len(sem_data)
@@ -471,6 +583,7 @@ def main(num_sentences, min_count, vocab_limit, infile, outfile, minlen, maxlen,
           % (sdp_count, num_sentences, len(vocab)))
     print("Filtered out %i bad SDPs " % bad_sdp_count)
     print("Took a total of %i:%i:%i hours" % sec_to_hms(time()-start))
+    nlp_loader.report()
     print("="*80)
 
 if __name__ == '__main__':